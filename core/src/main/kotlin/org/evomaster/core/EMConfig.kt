@@ -472,6 +472,18 @@ class EMConfig {
             throw ConfigProblemException("Python output is used only for black-box testing")
         }
 
+        if (fastJsonInPythonTests && !outputFormat.isPython()) {
+            throw ConfigProblemException("Fast JSON handling in the generated tests is supported only for Python output")
+        }
+
+        if (cacheLoginInTests && outputFormat.isJavaScript()) {
+            throw ConfigProblemException("Caching of login credentials in the generated tests is not supported for JavaScript")
+        }
+
+        if (recordLatencyInPythonTests && !outputFormat.isPython()) {
+            throw ConfigProblemException("Recording latency of HTTP calls in the generated tests is supported only for Python output")
+        }
+
         when (stoppingCriterion) {
             StoppingCriterion.TIME -> if (maxActionEvaluations != defaultMaxActionEvaluations) {
                 throw ConfigProblemException("Changing number of max actions, but stopping criterion is time")
@@ -1096,11 +1108,22 @@ class EMConfig {
 
     enum class TestSuiteSplitType {
         NONE,
-        FAULTS
+        FAULTS,
+        /**
+         * Based on the class of the highest HTTP status code in each test, eg 2xx or 5xx
+         */
+        STATUS_CODE,
+        /**
+         * Based on the endpoint called in the last action of each test, which is usually the one under test
+         */
+        ENDPOINT
         //CODE //This was never properly implemented
     }
 
-    @Cfg("Instead of generating a single test file, it could be split in several files, according to different strategies")
+    @Cfg("Instead of generating a single test file, it could be split in several files, according to different strategies." +
+            " Smaller files can be run in parallel, and, when splitting by ENDPOINT, only the files related to" +
+            " a changed endpoint need to be re-run." +
+            " Splitting by STATUS_CODE and ENDPOINT is applicable only to HTTP-based APIs, ie REST and GraphQL")
     var testSuiteSplitType = TestSuiteSplitType.FAULTS
 
     @Experimental
@@ -2287,6 +2310,27 @@ class EMConfig {
     @Cfg("Apply more advanced coverage criteria for black-box testing. This can result in larger generated test suites.")
     var advancedBlackBoxCoverage = false
 
+    @Experimental
+    @Cfg("In generated Python tests, record method, path template, status code and latency of each HTTP call." +
+            " When a test class is torn down, a report with latency percentiles per endpoint is saved as JSON and CSV" +
+            " files, in the folder specified by the EM_LATENCY_REPORT_DIR environment variable (if any).")
+    var recordLatencyInPythonTests = false
+
+    @Experimental
+    @Cfg("In the generated tests, do each login (eg, to get auth tokens or cookies) only once per test class," +
+            " and reuse the obtained credentials in all of its tests, instead of doing a new login in each test." +
+            " Credentials are kept even when the state of the SUT is reset before each test. If a call done with" +
+            " cached credentials gets a 401 response (eg, as the users were deleted by the reset), login is done again" +
+            " and the call is repeated." +
+            " Not supported for JavaScript.")
+    var cacheLoginInTests = false
+
+    @Experimental
+    @Cfg("In generated Python tests, encode JSON request bodies into bytes constants only once, when the test module" +
+            " is loaded, and parse each JSON response only once, no matter how many assertions are done on it." +
+            " If the orjson library is installed, it is used to parse responses.")
+    var fastJsonInPythonTests = false
+
     fun timeLimitInSeconds(): Int {
         if (maxTimeInSeconds > 0) {
             return maxTimeInSeconds
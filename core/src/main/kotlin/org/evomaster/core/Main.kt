@@ -715,9 +715,10 @@ class Main {
                     EMConfig.TestSuiteSplitType.NONE -> writer.writeTests(solution, controllerInfoDto?.fullName, controllerInfoDto?.executableFullPath)
                     /*
                         for RPC, just simple split based on whether there exist any exception in a test
-                        TODD need to check with Andrea whether we use cluster or other type
+                        TODD need to check with Andrea whether we use cluster or other type.
+                        Splits based on HTTP (ie, STATUS_CODE and ENDPOINT) do not apply here, so same split is used
                      */
-                    EMConfig.TestSuiteSplitType.FAULTS -> {
+                    else -> {
                         val splitResult = TestSuiteSplitter.splitRPCByException(solution as Solution<RPCIndividual>)
                         splitResult.splitOutcome
                             .filter { !it.individuals.isNullOrEmpty() }
@@ -104,6 +104,8 @@ object TestSuiteSplitter {
 //                    }
 //                }
             }
+            EMConfig.TestSuiteSplitType.STATUS_CODE -> splitResult.splitOutcome = splitByStatusCode(sol)
+            EMConfig.TestSuiteSplitType.ENDPOINT -> splitResult.splitOutcome = splitByEndpoint(sol)
         }
 
         // no test should be lost, or duplicated, after the split
@@ -291,6 +293,51 @@ object TestSuiteSplitter {
         )
     }
 
+    /**
+     * [splitByStatusCode] splits the Solution based on the class of the highest HTTP status code
+     * returned in each test, eg all tests with at least one 5xx response go together, then all the remaining
+     * ones with at least one 4xx, and so on.
+     * Tests with no status code at all (eg, due to timeouts) are put in their own subset.
+     */
+    private fun <T : Individual> splitByStatusCode(solution: Solution<T>): List<Solution<T>> {
+
+        val groups = solution.individuals.groupBy { ind ->
+            val code = ind.evaluatedMainActions()
+                .mapNotNull { (it.result as HttpWsCallResult).getStatusCode() }
+                .maxOrNull()
+            if (code == null) "noStatus" else "${code / 100}xx"
+        }
+
+        return groups.toSortedMap().map { (key, individuals) -> subset(solution, key, individuals) }
+    }
+
+    /**
+     * [splitByEndpoint] splits the Solution based on the endpoint called in the last action of each test.
+     * Previous actions are typically there just to set up the state of the SUT (eg, creating resources
+     * with POST), so the last one is the endpoint the test is about.
+     */
+    private fun <T : Individual> splitByEndpoint(solution: Solution<T>): List<Solution<T>> {
+
+        val groups = solution.individuals.groupBy { ind ->
+            val name = ind.evaluatedMainActions().lastOrNull()?.action?.getName() ?: "noAction"
+            TestWriterUtils.safeVariableName(name)
+                .replace(Regex("_+"), "_")
+                .trim('_')
+        }
+
+        return groups.toSortedMap().map { (key, individuals) -> subset(solution, key, individuals) }
+    }
+
+    private fun <T : Individual> subset(solution: Solution<T>, name: String, individuals: List<EvaluatedIndividual<T>>) =
+        Solution(
+            individuals.toMutableList(),
+            "${solution.testSuiteNamePrefix}_$name",
+            solution.testSuiteNameSuffix,
+            Termination.NONE,
+            listOf(),
+            listOf()
+        )
+
     /***
      * A [GraphQlCallResult] is considered to be "failed" (and thus a potential fault)
      * if it contains the field "errors" in its body.
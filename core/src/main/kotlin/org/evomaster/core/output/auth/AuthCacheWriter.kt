@@ -0,0 +1,110 @@
+package org.evomaster.core.output.auth
+
+import org.evomaster.core.output.Lines
+import org.evomaster.core.output.OutputFormat
+import org.evomaster.core.output.service.HttpWsTestCaseWriter
+import org.evomaster.core.problem.httpws.auth.EndpointCallLogin
+import org.evomaster.core.search.Solution
+
+/**
+ * When login calls are cached, credentials (ie, tokens and cookies) are obtained only once
+ * per test class, and then shared among all of its tests.
+ * If a call with cached credentials gets a 401, the login is done again, and the call repeated.
+ * This requires class-level declarations, which depend on all the logins used in the test suite.
+ */
+object AuthCacheWriter {
+
+    /**
+     * Name of the class variable holding the cached credentials, in Python
+     */
+    const val authCache = "auth_cache"
+
+    private fun getLogins(solution: Solution<*>): Pair<List<EndpointCallLogin>, List<EndpointCallLogin>> {
+        val individuals = solution.individuals.map { it.individual }
+        val tokens = individuals.flatMap { TokenWriter.getTokenLoginAuth(it) }.distinctBy { it.name }
+        val cookies = individuals.flatMap { CookieWriter.getCookieLoginAuth(it) }.distinctBy { it.name }
+        return Pair(tokens, cookies)
+    }
+
+    fun needsCache(solution: Solution<*>): Boolean {
+        val (tokens, cookies) = getLogins(solution)
+        return tokens.isNotEmpty() || cookies.isNotEmpty()
+    }
+
+    /**
+     * Static fields for the cached credentials, in JVM languages
+     */
+    fun declareCachedCredentials(format: OutputFormat, solution: Solution<*>, lines: Lines) {
+        val (tokens, cookies) = getLogins(solution)
+        tokens.forEach { TokenWriter.declareCachedToken(format, it, lines) }
+        cookies.forEach { CookieWriter.declareCachedCookies(format, it, lines) }
+    }
+
+    /**
+     * Statement doing the login for [info] and storing the obtained credentials in their
+     * class-level variable, in JVM languages
+     */
+    fun login(info: EndpointCallLogin): String =
+        if (info.expectsCookie()) "${CookieWriter.cookiesName(info)} = ${CookieWriter.loginMethodName(info)}()"
+        else "${TokenWriter.tokenName(info)} = ${TokenWriter.loginMethodName(info)}()"
+
+    /**
+     * In JVM languages, all logins are done once when the class is initialized.
+     * Resetting the SUT before each test might invalidate the credentials (eg, if the users were deleted),
+     * but then the calls getting a 401 do the login again, and are repeated with the new credentials
+     */
+    fun writeJvmInitLogins(solution: Solution<*>, lines: Lines) {
+        val (tokens, cookies) = getLogins(solution)
+        (tokens + cookies).forEach { lines.addStatement(login(it)) }
+    }
+
+    /**
+     * Class-level methods doing the logins, in JVM languages
+     */
+    fun writeJvmLoginMethods(
+        format: OutputFormat,
+        solution: Solution<*>,
+        lines: Lines,
+        baseUrlOfSut: String,
+        testCaseWriter: HttpWsTestCaseWriter
+    ) {
+        val (tokens, cookies) = getLogins(solution)
+
+        tokens.forEach {
+            lines.addEmpty(2)
+            TokenWriter.writeJvmLoginMethod(format, it, lines, baseUrlOfSut, testCaseWriter)
+        }
+        cookies.forEach {
+            lines.addEmpty(2)
+            CookieWriter.writeJvmLoginMethod(format, it, lines, baseUrlOfSut, testCaseWriter)
+        }
+    }
+
+    /**
+     * In Python, the cache is created when the class is set up, whereas each login is done in its
+     * own class method, which is called the first time its credentials are needed
+     */
+    fun writePythonSetUpClass(
+        solution: Solution<*>,
+        lines: Lines,
+        baseUrlOfSut: String,
+        testCaseWriter: HttpWsTestCaseWriter
+    ) {
+        val (tokens, cookies) = getLogins(solution)
+
+        lines.add("@classmethod")
+        lines.add("def setUpClass(cls):")
+        lines.indented {
+            lines.add("cls.$authCache = AuthCache()")
+        }
+
+        tokens.forEach {
+            lines.addEmpty(2)
+            TokenWriter.writePythonLoginMethod(it, lines, baseUrlOfSut, testCaseWriter)
+        }
+        cookies.forEach {
+            lines.addEmpty(2)
+            CookieWriter.writePythonLoginMethod(it, lines, baseUrlOfSut, testCaseWriter)
+        }
+    }
+}
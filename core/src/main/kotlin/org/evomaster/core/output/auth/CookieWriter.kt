@@ -31,12 +31,20 @@ object CookieWriter {
         .map { it.auth.endpointCallLogin!! }
 
 
+    /**
+     * Name of the class-level method that does the login for [info],
+     * when login results are cached
+     */
+    fun loginMethodName(info: EndpointCallLogin): String = "login_${cookiesName(info)}"
+
+
     fun handleGettingCookies(
         format: OutputFormat,
         ind: EvaluatedIndividual<*>,
         lines: Lines,
         baseUrlOfSut: String,
-        testCaseWriter: HttpWsTestCaseWriter
+        testCaseWriter: HttpWsTestCaseWriter,
+        cached: Boolean = false
     ) {
 
         val cookiesInfo = getCookieLoginAuth(ind.individual)
@@ -47,46 +55,125 @@ object CookieWriter {
 
         for (k in cookiesInfo) {
 
+            if (cached && format.isJavaOrKotlin()) {
+                /*
+                    cookies are in a static field, fetched when the class is initialized,
+                    and fetched again only if a call using them gets a 401
+                 */
+                continue
+            }
+
+            if (cached && format.isPython()) {
+                lines.add("${cookiesName(k)} = self.${AuthCacheWriter.authCache}" +
+                        ".get(\"${cookiesName(k)}\", self.${loginMethodName(k)})")
+                continue
+            }
+
             when {
                 format.isJava() -> lines.add("final Map<String,String> ${cookiesName(k)} = ")
                 format.isKotlin() -> lines.add("val ${cookiesName(k)} : Map<String,String> = ")
                 format.isJavaScript() -> lines.add("const ${cookiesName(k)} = (")
             }
 
-            if (!format.isPython()) {
-                testCaseWriter.startRequest(lines)
-                lines.indent()
-            }
+            addLoginCall(format, k, lines, baseUrlOfSut, testCaseWriter)
+            lines.addEmpty()
+        }
+    }
 
-            val targetCookieVariable = when {
-                /*
-                 In python, cookies are returned in a CookieJar object which we will name cookies_foo_jar for example.
-                 The CookieJar will then be converted to a dictionary that is passed on to the next request
-                 in cookies=cookies_foo. Passing on the CookieJar to the next request did not seem to work.
-                 */
-                format.isPython() -> "${cookiesName(k)}_jar"
-                else -> cookiesName(k)
-            }
+    /**
+     * Declaration of the class-level variable used to cache the cookies, in JVM languages
+     */
+    fun declareCachedCookies(format: OutputFormat, info: EndpointCallLogin, lines: Lines) {
+        when {
+            format.isJava() -> lines.addStatement("private static Map<String,String> ${cookiesName(info)}")
+            format.isKotlin() -> lines.add("private var ${cookiesName(info)} : Map<String,String>? = null")
+        }
+    }
+
+    /**
+     * Class-level method in JVM languages doing the login, and returning the obtained cookies
+     */
+    fun writeJvmLoginMethod(
+        format: OutputFormat,
+        info: EndpointCallLogin,
+        lines: Lines,
+        baseUrlOfSut: String,
+        testCaseWriter: HttpWsTestCaseWriter
+    ) {
+        when {
+            format.isJava() -> lines.add("private static Map<String,String> ${loginMethodName(info)}()")
+            format.isKotlin() -> lines.add("private fun ${loginMethodName(info)}() : Map<String,String>")
+        }
+        lines.block {
+            lines.add("return ")
+            addLoginCall(format, info, lines, baseUrlOfSut, testCaseWriter)
+        }
+    }
 
-            addCallCommand(lines, k, testCaseWriter, format, baseUrlOfSut, targetCookieVariable)
+    /**
+     * Class-level method in Python doing the login, and returning the obtained cookies
+     */
+    fun writePythonLoginMethod(
+        info: EndpointCallLogin,
+        lines: Lines,
+        baseUrlOfSut: String,
+        testCaseWriter: HttpWsTestCaseWriter
+    ) {
+        val format = OutputFormat.PYTHON_UNITTEST
+        lines.add("@classmethod")
+        lines.add("def ${loginMethodName(info)}(cls):")
+        lines.indented {
+            addLoginCall(format, info, lines, baseUrlOfSut, testCaseWriter, "cls")
+            lines.add("return ${cookiesName(info)}")
+        }
+    }
 
-            when {
-                format.isJavaOrKotlin() -> lines.add(".then().extract().cookies()")
-                format.isJavaScript() -> lines.add(").header['set-cookie'][0].split(';')[0]")
-                format.isPython() -> lines.append(".cookies")
-            }
+    /**
+     * Code to make the login call and extract the cookies from its response.
+     * Apart from Python, this assumes the cookie variable has already been opened
+     * on the current line, eg "cookies = "
+     */
+    private fun addLoginCall(
+        format: OutputFormat,
+        k: EndpointCallLogin,
+        lines: Lines,
+        baseUrlOfSut: String,
+        testCaseWriter: HttpWsTestCaseWriter,
+        pythonReceiver: String = "self"
+    ) {
 
-            if (format.isPython()) {
-                lines.add("${cookiesName(k)} = requests.utils.dict_from_cookiejar($targetCookieVariable)")
-            }
-            //TODO check response status and cookie headers?
+        if (!format.isPython()) {
+            testCaseWriter.startRequest(lines)
+            lines.indent()
+        }
 
-            lines.appendSemicolon()
-            lines.addEmpty()
+        val targetCookieVariable = when {
+            /*
+             In python, cookies are returned in a CookieJar object which we will name cookies_foo_jar for example.
+             The CookieJar will then be converted to a dictionary that is passed on to the next request
+             in cookies=cookies_foo. Passing on the CookieJar to the next request did not seem to work.
+             */
+            format.isPython() -> "${cookiesName(k)}_jar"
+            else -> cookiesName(k)
+        }
 
-            if (!format.isPython()) {
-                lines.deindent()
-            }
+        addCallCommand(lines, k, testCaseWriter, format, baseUrlOfSut, targetCookieVariable, pythonReceiver)
+
+        when {
+            format.isJavaOrKotlin() -> lines.add(".then().extract().cookies()")
+            format.isJavaScript() -> lines.add(").header['set-cookie'][0].split(';')[0]")
+            format.isPython() -> lines.append(".cookies")
+        }
+
+        if (format.isPython()) {
+            lines.add("${cookiesName(k)} = requests.utils.dict_from_cookiejar($targetCookieVariable)")
+        }
+        //TODO check response status and cookie headers?
+
+        lines.appendSemicolon()
+
+        if (!format.isPython()) {
+            lines.deindent()
         }
     }
 
@@ -98,11 +185,12 @@ object CookieWriter {
         testCaseWriter: HttpWsTestCaseWriter,
         format: OutputFormat,
         baseUrlOfSut: String,
-        targetVariable: String
+        targetVariable: String,
+        pythonReceiver: String = "self"
     ) {
 
         if(format.isJavaScript()) {
-            callPost(lines, k, format, baseUrlOfSut)
+            callPost(lines, k, format, baseUrlOfSut, pythonReceiver)
         }
 
         when {
@@ -135,7 +223,7 @@ object CookieWriter {
             needed in used libraries for Python and JS
          */
         if(format.isJavaOrKotlin()) {
-            callPost(lines, k, format, baseUrlOfSut)
+            callPost(lines, k, format, baseUrlOfSut, pythonReceiver)
         }
 
 
@@ -143,7 +231,7 @@ object CookieWriter {
         if (format.isPython()) {
             lines.add("$targetVariable = requests \\")
             lines.indent(2)
-            callPost(lines, k, format, baseUrlOfSut)
+            callPost(lines, k, format, baseUrlOfSut, pythonReceiver)
             lines.append(", ")
             lines.indented {
                 lines.add("headers=headers, data=body)")
@@ -156,7 +244,8 @@ object CookieWriter {
         lines: Lines,
         k: EndpointCallLogin,
         format: OutputFormat,
-        baseUrlOfSut: String
+        baseUrlOfSut: String,
+        pythonReceiver: String
     ) {
         lines.add(".post(")
         if (k.externalEndpointURL != null) {
@@ -164,7 +253,7 @@ object CookieWriter {
         } else {
             when {
                 format.isJava() || format.isJavaScript() -> lines.append("$baseUrlOfSut + \"")
-                format.isPython() -> lines.append("self.$baseUrlOfSut + \"")
+                format.isPython() -> lines.append("$pythonReceiver.$baseUrlOfSut + \"")
                 else -> lines.append("\"\${$baseUrlOfSut}")
             }
             lines.append("${k.endpoint}\"")
@@ -29,11 +29,19 @@ object TokenWriter {
             .map { it.auth.endpointCallLogin!! }
 
 
+    /**
+     * Name of the class-level method that does the login for [info],
+     * when login results are cached
+     */
+    fun loginMethodName(info: EndpointCallLogin): String = "login_${tokenName(info)}"
+
+
     fun handleGettingTokens(format: OutputFormat,
                             ind: EvaluatedIndividual<*>,
                             lines: Lines,
                             baseUrlOfSut: String,
-                            testCaseWriter: HttpWsTestCaseWriter
+                            testCaseWriter: HttpWsTestCaseWriter,
+                            cached: Boolean = false
     ) {
 
         val tokensInfo = getTokenLoginAuth(ind.individual)
@@ -44,6 +52,20 @@ object TokenWriter {
 
         for (k in tokensInfo) {
 
+            if (cached && format.isJavaOrKotlin()) {
+                /*
+                    token is a static field, fetched when the class is initialized,
+                    and fetched again only if a call using it gets a 401
+                 */
+                continue
+            }
+
+            if (cached && format.isPython()) {
+                lines.add("${tokenName(k)} = self.${AuthCacheWriter.authCache}" +
+                        ".get(\"${tokenName(k)}\", self.${loginMethodName(k)})")
+                continue
+            }
+
             when {
                 format.isJava() -> lines.add("final String ${tokenName(k)} = ")
                 format.isKotlin() -> lines.add("val ${tokenName(k)} : String = ")
@@ -51,62 +73,126 @@ object TokenWriter {
                 format.isPython() -> lines.add("${tokenName(k)} = ")
             }
 
-            if(k.token!!.headerPrefix.isNotEmpty()) {
-                lines.append("\"${k.token!!.headerPrefix}\"")
-            }else{
-                if (format.isJavaScript() || format.isPython())
-                    lines.append("\"\"")
-            }
+            addLoginCall(format, k, lines, baseUrlOfSut, testCaseWriter)
+            lines.addEmpty()
+        }
+    }
 
-            if (!format.isPython()) {
-                if (format.isJavaScript()){
-                    lines.appendSemicolon()
-                }else{
-                    lines.append(" + ")
-                }
-            }
+    /**
+     * Declaration of the class-level variable used to cache the token, in JVM languages
+     */
+    fun declareCachedToken(format: OutputFormat, info: EndpointCallLogin, lines: Lines) {
+        when {
+            format.isJava() -> lines.addStatement("private static String ${tokenName(info)}")
+            format.isKotlin() -> lines.add("private var ${tokenName(info)} : String? = null")
+        }
+    }
+
+    /**
+     * Class-level method in JVM languages doing the login, and returning the obtained token
+     */
+    fun writeJvmLoginMethod(
+        format: OutputFormat,
+        info: EndpointCallLogin,
+        lines: Lines,
+        baseUrlOfSut: String,
+        testCaseWriter: HttpWsTestCaseWriter
+    ) {
+        when {
+            format.isJava() -> lines.add("private static String ${loginMethodName(info)}()")
+            format.isKotlin() -> lines.add("private fun ${loginMethodName(info)}() : String")
+        }
+        lines.block {
+            lines.add("return ")
+            addLoginCall(format, info, lines, baseUrlOfSut, testCaseWriter)
+        }
+    }
 
+    /**
+     * Class-level method in Python doing the login, and returning the obtained token
+     */
+    fun writePythonLoginMethod(
+        info: EndpointCallLogin,
+        lines: Lines,
+        baseUrlOfSut: String,
+        testCaseWriter: HttpWsTestCaseWriter
+    ) {
+        val format = OutputFormat.PYTHON_UNITTEST
+        lines.add("@classmethod")
+        lines.add("def ${loginMethodName(info)}(cls):")
+        lines.indented {
+            lines.add("${tokenName(info)} = ")
+            addLoginCall(format, info, lines, baseUrlOfSut, testCaseWriter, "cls")
+            lines.add("return ${tokenName(info)}")
+        }
+    }
 
-            when{
-                format.isJavaOrKotlin() -> lines.append("given()")
-                format.isJavaScript() -> {
-                    lines.addEmpty()
-                    lines.append("await superagent")
-                }
-            }
+    /**
+     * Code to make the login call and extract the token from its response, assuming
+     * the token variable has already been opened on the current line, eg "token = "
+     */
+    private fun addLoginCall(
+        format: OutputFormat,
+        k: EndpointCallLogin,
+        lines: Lines,
+        baseUrlOfSut: String,
+        testCaseWriter: HttpWsTestCaseWriter,
+        pythonReceiver: String = "self"
+    ) {
 
-            if (!format.isPython()) {
-                lines.indent(2)
+        if(k.token!!.headerPrefix.isNotEmpty()) {
+            lines.append("\"${k.token!!.headerPrefix}\"")
+        }else{
+            if (format.isJavaScript() || format.isPython())
+                lines.append("\"\"")
+        }
+
+        if (!format.isPython()) {
+            if (format.isJavaScript()){
+                lines.appendSemicolon()
+            }else{
+                lines.append(" + ")
             }
+        }
 
-            CookieWriter.addCallCommand(lines,k,testCaseWriter,format,baseUrlOfSut, responseName(k))
 
-            var path = k.token!!.extractFromField.substring(1).replace("/",".")
-            if (format.isPython()) {
-                var endPath = ""
-                path.split(".").forEach {
-                    if (!it.startsWith("[")) {
-                        endPath += "[\"$it\"]"
-                    }
-                }
-                path = endPath
+        when{
+            format.isJavaOrKotlin() -> lines.append("given()")
+            format.isJavaScript() -> {
+                lines.addEmpty()
+                lines.append("await superagent")
             }
+        }
 
-            if (format.isJavaScript()) {
-                lines.add(".then(res => {${tokenName(k)} += res.body.$path;},")
-                lines.indented { lines.add("error => {console.log(error.response.body); throw Error(\"Auth failed.\")});") }
-            } else if (format.isPython()) {
-                lines.add("${tokenName(k)} = ${tokenName(k)} + ${responseName(k)}.json()$path")
-            }else
-                lines.add(".then().extract().response().path(\"$path\")")
+        if (!format.isPython()) {
+            lines.indent(2)
+        }
 
-            lines.appendSemicolon()
-            lines.addEmpty()
+        CookieWriter.addCallCommand(lines,k,testCaseWriter,format,baseUrlOfSut, responseName(k), pythonReceiver)
 
-            if (!format.isPython()) {
-                lines.deindent(2)
+        var path = k.token!!.extractFromField.substring(1).replace("/",".")
+        if (format.isPython()) {
+            var endPath = ""
+            path.split(".").forEach {
+                if (!it.startsWith("[")) {
+                    endPath += "[\"$it\"]"
+                }
             }
+            path = endPath
+        }
+
+        if (format.isJavaScript()) {
+            lines.add(".then(res => {${tokenName(k)} += res.body.$path;},")
+            lines.indented { lines.add("error => {console.log(error.response.body); throw Error(\"Auth failed.\")});") }
+        } else if (format.isPython()) {
+            lines.add("${tokenName(k)} = ${tokenName(k)} + ${responseName(k)}.json()$path")
+        }else
+            lines.add(".then().extract().response().path(\"$path\")")
+
+        lines.appendSemicolon()
 
+        if (!format.isPython()) {
+            lines.deindent(2)
         }
     }
 }
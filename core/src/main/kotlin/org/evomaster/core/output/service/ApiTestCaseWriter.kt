@@ -16,6 +16,15 @@ import org.evomaster.core.utils.StringUtils
 
 abstract class ApiTestCaseWriter : TestCaseWriter() {
 
+    /**
+     * Python expression to get the parsed JSON body of the response in the given variable.
+     * With [EMConfig.fastJsonInPythonTests], a body is parsed only once, no matter how many assertions are on it
+     */
+    protected fun pythonJson(responseVariableName: String): String {
+        return if (config.fastJsonInPythonTests) "response_json($responseVariableName)"
+        else "$responseVariableName.json()"
+    }
+
     protected fun createUniqueResponseVariableName(): String {
         val name = "res_$counter"
         counter++
@@ -196,7 +205,7 @@ abstract class ApiTestCaseWriter : TestCaseWriter() {
                 format.isKotlin() -> ".body(\"${k}isEmpty()\", `is`(true))" //'is' is a keyword in Kotlin
                 format.isJavaScript() -> "expect(Object.keys($responseVariableName.body${k}).length).toBe(0);"
                 format.isCsharp() -> "Assert.True($responseVariableName${k}.ToString() == \"{}\");"
-                format.isPython() -> "assert len($responseVariableName.json()${k}) == 0"
+                format.isPython() -> "assert len(${pythonJson(responseVariableName)}${k}) == 0"
                 else -> throw IllegalStateException("Format not supported yet: $format")
             }
 
@@ -256,7 +265,7 @@ abstract class ApiTestCaseWriter : TestCaseWriter() {
                 format.isJavaOrKotlin() -> ".body(\"${fieldPath}\", nullValue())"
                 format.isJavaScript() -> "expect($responseVariableName.body$fieldPath).toBe(null);"
                 format.isCsharp() -> "Assert.True($responseVariableName$fieldPath == null);"
-                format.isPython() -> "assert $responseVariableName.json()$fieldPath is None"
+                format.isPython() -> "assert ${pythonJson(responseVariableName)}$fieldPath is None"
                 else -> throw IllegalStateException("Format not supported yet: $format")
             }
             lines.add(instruction)
@@ -302,7 +311,7 @@ abstract class ApiTestCaseWriter : TestCaseWriter() {
                 if (format.isJavaScript()) {
                     lines.add("expect($responseVariableName.body$fieldPath).toBe($toPrint);")
                 } else if (format.isPython()){
-                    lines.add("assert $responseVariableName.json()$fieldPath == $toPrint")
+                    lines.add("assert ${pythonJson(responseVariableName)}$fieldPath == $toPrint")
                 } else {
                     assert(format.isCsharp())
                     if (fieldPath != ".traceId" || !lines.toString().contains("status == 400"))
@@ -404,7 +413,7 @@ abstract class ApiTestCaseWriter : TestCaseWriter() {
             format.isCsharp() ->
                 "Assert.True($responseVariableName$fieldPath.Count == $expectedSize);"
             format.isPython() ->
-                "assert len($responseVariableName.json()$fieldPath) == $expectedSize"
+                "assert len(${pythonJson(responseVariableName)}$fieldPath) == $expectedSize"
             else -> throw IllegalStateException("Not supported format $format")
         }
 
@@ -75,6 +75,15 @@ class GraphQLTestCaseWriter : HttpWsTestCaseWriter() {
         return result
     }
 
+    override fun getVerbAndPathTemplate(call: HttpWsAction): Pair<String, String> {
+        /*
+            all calls go to the same GraphQL endpoint, so we rather distinguish them
+            based on the called query/mutation
+         */
+        val gql = call as GraphQLAction
+        return Pair("POST", "${gql.methodType} ${gql.methodName}")
+    }
+
 
     override fun handleLastStatementComment(res: HttpWsCallResult, lines: Lines){
 
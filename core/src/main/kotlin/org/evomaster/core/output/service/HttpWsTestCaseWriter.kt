@@ -6,12 +6,14 @@ import org.evomaster.core.output.Lines
 import org.evomaster.core.output.OutputFormat
 import org.evomaster.core.output.TestWriterUtils
 import org.evomaster.core.output.TestWriterUtils.formatJsonWithEscapes
+import org.evomaster.core.output.auth.AuthCacheWriter
 import org.evomaster.core.output.auth.CookieWriter
 import org.evomaster.core.output.auth.TokenWriter
 import org.evomaster.core.problem.enterprise.EnterpriseActionGroup
 import org.evomaster.core.problem.externalservice.httpws.HttpExternalServiceAction
 import org.evomaster.core.problem.httpws.HttpWsAction
 import org.evomaster.core.problem.httpws.HttpWsCallResult
+import org.evomaster.core.problem.httpws.auth.EndpointCallLogin
 import org.evomaster.core.problem.rest.param.BodyParam
 import org.evomaster.core.problem.rest.param.HeaderParam
 import org.evomaster.core.search.EvaluatedIndividual
@@ -32,6 +34,17 @@ abstract class HttpWsTestCaseWriter : ApiTestCaseWriter() {
 
     abstract fun getAcceptHeader(call: HttpWsAction, res: HttpWsCallResult): String
 
+    /**
+     * @return the HTTP verb and the path template (ie, before resolving any path parameter)
+     * of the endpoint called by [call], used to aggregate data per endpoint in the generated tests
+     */
+    abstract fun getVerbAndPathTemplate(call: HttpWsAction): Pair<String, String>
+
+    /**
+     * Body literal -> name of its constant, for the Python test suite currently being written
+     */
+    private val pythonBodyConstants = linkedMapOf<String, String>()
+
 
     override fun shouldFailIfExceptionNotThrown(result: ActionResult): Boolean {
         /*
@@ -58,8 +71,8 @@ abstract class HttpWsTestCaseWriter : ApiTestCaseWriter() {
     ) {
         super.handleTestInitialization(lines, baseUrlOfSut, ind, insertionVars)
 
-        CookieWriter.handleGettingCookies(format, ind, lines, baseUrlOfSut, this)
-        TokenWriter.handleGettingTokens(format, ind, lines, baseUrlOfSut, this)
+        CookieWriter.handleGettingCookies(format, ind, lines, baseUrlOfSut, this, config.cacheLoginInTests)
+        TokenWriter.handleGettingTokens(format, ind, lines, baseUrlOfSut, this, config.cacheLoginInTests)
     }
 
     protected fun handlePreCallSetup(call: HttpWsAction, lines: Lines, res: HttpWsCallResult) {
@@ -92,6 +105,12 @@ abstract class HttpWsTestCaseWriter : ApiTestCaseWriter() {
             }
         }
 
+        if (format.isPython() && config.recordLatencyInPythonTests) {
+            val (verb, path) = getVerbAndPathTemplate(call)
+            val template = GeneUtils.applyEscapes(path, GeneUtils.EscapeMode.BODY, format)
+            lines.append("record_latency(\"$verb\", \"$template\", ")
+        }
+
         when {
             format.isJavaOrKotlin() -> lines.append("given()")
             format.isJavaScript() -> lines.append("await superagent")
@@ -244,6 +263,27 @@ abstract class HttpWsTestCaseWriter : ApiTestCaseWriter() {
             }
 
             format.isPython() -> {
+                val elc = call.auth.endpointCallLogin
+                if (config.cacheLoginInTests && elc != null && code != 401) {
+                    /*
+                        cached credentials might have expired, eg, if the SUT was restarted.
+                        if so, login is done again, and the call is repeated with the new credentials,
+                        which are then used in the following calls of the test
+                     */
+                    val cache = "self.${AuthCacheWriter.authCache}"
+                    if (elc.expectsCookie()) {
+                        val name = CookieWriter.cookiesName(elc)
+                        val login = "self.${CookieWriter.loginMethodName(elc)}"
+                        lines.add("$responseVariableName = $cache.check($responseVariableName, \"$name\", $login)")
+                        lines.add("$name = $cache.get(\"$name\", $login)")
+                    } else {
+                        val name = TokenWriter.tokenName(elc)
+                        val login = "self.${TokenWriter.loginMethodName(elc)}"
+                        val header = elc.token!!.httpHeaderName
+                        lines.add("$responseVariableName = $cache.check($responseVariableName, \"$name\", $login, \"$header\")")
+                        lines.add("$name = $cache.get(\"$name\", $login)")
+                    }
+                }
                 lines.add("assert $responseVariableName.status_code == $code")
             }
 
@@ -332,6 +372,13 @@ abstract class HttpWsTestCaseWriter : ApiTestCaseWriter() {
             lines.add(getAcceptHeader(call, res))
         }
 
+        val elc = call.auth.endpointCallLogin
+        if (format.isJavaOrKotlin() && config.cacheLoginInTests && elc != null
+            && !res.failedCall() && res.getStatusCode() != 401) {
+            makeHttpCallWithCachedLogin(call, lines, res, baseUrlOfSut, responseVariableName, elc)
+            return responseVariableName
+        }
+
         handleFirstLine(call, lines, res, responseVariableName)
 
         when {
@@ -371,6 +418,67 @@ abstract class HttpWsTestCaseWriter : ApiTestCaseWriter() {
     }
 
 
+    /**
+     * In JVM languages, cached credentials might have expired, eg, if the SUT was reset.
+     * So, the response is first checked for a 401, in which case the login is done again,
+     * and the call repeated with the new credentials, which are then kept for the following calls.
+     * Only then the usual assertions are made on the response
+     */
+    private fun makeHttpCallWithCachedLogin(
+        call: HttpWsAction,
+        lines: Lines,
+        res: HttpWsCallResult,
+        baseUrlOfSut: String,
+        responseVariableName: String,
+        elc: EndpointCallLogin
+    ) {
+        val callVariableName = "${responseVariableName}_call"
+
+        lines.addEmpty()
+        handlePreCallSetup(call, lines, res)
+
+        when {
+            format.isKotlin() -> lines.append("var $callVariableName: Response = ")
+            format.isJava() -> lines.append("Response $callVariableName = ")
+        }
+        handleRequest(call, lines, res, baseUrlOfSut)
+
+        lines.add("if ($callVariableName.statusCode() == 401)")
+        lines.block {
+            lines.addStatement(AuthCacheWriter.login(elc))
+            lines.add("$callVariableName = ")
+            handleRequest(call, lines, res, baseUrlOfSut)
+        }
+
+        if (needsResponseVariable(call, res)) {
+            when {
+                format.isKotlin() -> lines.add("val $responseVariableName: ValidatableResponse = ")
+                format.isJava() -> lines.add("ValidatableResponse $responseVariableName = ")
+            }
+            lines.append(callVariableName)
+        } else {
+            lines.add(callVariableName)
+        }
+
+        lines.indent(2)
+        handleResponseDirectlyInTheCall(call, res, lines)
+        handleLastLine(call, res, lines, responseVariableName)
+    }
+
+    /**
+     * The RestAssured call, up to the HTTP verb, without any check on its response
+     */
+    private fun handleRequest(call: HttpWsAction, lines: Lines, res: HttpWsCallResult, baseUrlOfSut: String) {
+        startRequest(lines)
+        lines.append(getAcceptHeader(call, res))
+        lines.indented(2) {
+            handleHeaders(call, lines)
+            handleBody(call, lines)
+            handleVerbEndpoint(baseUrlOfSut, call, lines)
+            lines.appendSemicolon()
+        }
+    }
+
     abstract fun handleVerbEndpoint(baseUrlOfSut: String, _call: HttpWsAction, lines: Lines)
 
     fun sendBodyCommand(): String {
@@ -472,6 +580,11 @@ abstract class HttpWsTestCaseWriter : ApiTestCaseWriter() {
 
         val bodyLines = formatJsonWithEscapes(json, format)
 
+        if (format.isPython() && config.fastJsonInPythonTests) {
+            lines.add("body = ${pythonBodyConstant(bodyLines)}")
+            return
+        }
+
         if (bodyLines.size == 1) {
             when {
                 format.isCsharp() -> {
@@ -517,6 +630,49 @@ abstract class HttpWsTestCaseWriter : ApiTestCaseWriter() {
         }
     }
 
+    /**
+     * Name of the module-level constant in Python holding the encoded bytes of the given body literal.
+     * Same bodies share the same constant
+     */
+    private fun pythonBodyConstant(bodyLines: List<String>): String {
+        val key = bodyLines.joinToString("\n")
+        return pythonBodyConstants.getOrPut(key) { "BODY_${pythonBodyConstants.size}" }
+    }
+
+    /**
+     * Start collecting the Python body constants of a new test suite
+     */
+    fun clearPythonBodyConstants() {
+        pythonBodyConstants.clear()
+    }
+
+    /**
+     * Declare the Python body constants used in the tests written so far.
+     * As they are only used once tests are run, these can be declared after the test class
+     */
+    fun writePythonBodyConstants(lines: Lines) {
+        if (pythonBodyConstants.isEmpty()) {
+            return
+        }
+
+        lines.addEmpty(2)
+        lines.addSingleCommentLine("Request bodies, encoded only once when this module is loaded")
+        pythonBodyConstants.forEach { (key, name) ->
+            val bodyLines = key.split("\n")
+            if (bodyLines.size == 1) {
+                lines.add("$name = encode_json_body(${bodyLines.first()})")
+            } else {
+                lines.add("$name = encode_json_body(${bodyLines.first()} + \\")
+                lines.indented {
+                    (1 until bodyLines.lastIndex).forEach { i ->
+                        lines.add("${bodyLines[i]} + \\")
+                    }
+                    lines.add("${bodyLines.last()})")
+                }
+            }
+        }
+    }
+
     /**
      * This is done mainly for RestAssured
      */
@@ -660,6 +816,11 @@ abstract class HttpWsTestCaseWriter : ApiTestCaseWriter() {
             lines.add(".ok(res => res.status)")
         }
 
+        if (format.isPython() && config.recordLatencyInPythonTests) {
+            // closing record_latency(
+            lines.append(")")
+        }
+
 
         if (lines.shouldUseSemicolon()) {
             /*
@@ -701,7 +862,7 @@ abstract class HttpWsTestCaseWriter : ApiTestCaseWriter() {
         val jsonPath = JsonUtils.fromPointerToPath(jsonPointer)
 
         return when {
-            format.isPython() -> "str($resVarName.json()${JsonUtils.fromPointerToDictionaryAccess(jsonPointer)})"
+            format.isPython() -> "str(${pythonJson(resVarName)}${JsonUtils.fromPointerToDictionaryAccess(jsonPointer)})"
             format.isJavaScript() -> "$resVarName.body.$jsonPath.toString()"
             format.isJavaOrKotlin() -> "$resVarName.extract().body().path$extraTypeInfo(\"$jsonPath\").toString()"
             else -> throw IllegalStateException("Unsupported format $format")
@@ -368,6 +368,11 @@ class RestTestCaseWriter : HttpWsTestCaseWriter {
         return getRestAcceptHeader(call as RestCallAction, res as RestCallResult)
     }
 
+    override fun getVerbAndPathTemplate(call: HttpWsAction): Pair<String, String> {
+        val k = call as RestCallAction
+        return Pair(k.verb.name, k.path.toString())
+    }
+
     private fun getRestAcceptHeader(call: RestCallAction, res: RestCallResult): String {
         /*
          *  Note: using the type in result body is wrong:
@@ -461,7 +466,7 @@ class RestTestCaseWriter : HttpWsTestCaseWriter {
                 //TODO code here should use same algorithm as in res.getResourceId()
                 //TODO this is quite limited, would need proper refactoring
                 val extract = when {
-                    format.isPython() -> "str($resVarName.json()['${res.getResourceIdName()}'])"
+                    format.isPython() -> "str(${pythonJson(resVarName)}['${res.getResourceIdName()}'])"
                     else -> "$resVarName.extract().body().path$extraTypeInfo(\"${res.getResourceIdName()}\").toString()"
                 }
 
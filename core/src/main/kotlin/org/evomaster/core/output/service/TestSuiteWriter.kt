@@ -8,6 +8,7 @@ import org.evomaster.core.EMConfig
 import org.evomaster.core.output.*
 import org.evomaster.core.output.TestWriterUtils.getWireMockVariableName
 import org.evomaster.core.output.TestWriterUtils.handleDefaultStubForAsJavaOrKotlin
+import org.evomaster.core.output.auth.AuthCacheWriter
 import org.evomaster.core.problem.api.ApiWsIndividual
 import org.evomaster.core.problem.externalservice.httpws.HttpWsExternalService
 import org.evomaster.core.problem.externalservice.httpws.HttpExternalServiceAction
@@ -124,6 +125,10 @@ class TestSuiteWriter {
         val lines = Lines(config.outputFormat)
         val testSuiteOrganizer = TestSuiteOrganizer()
 
+        val pythonBodies = if (config.outputFormat.isPython() && config.fastJsonInPythonTests)
+            testCaseWriter as HttpWsTestCaseWriter else null
+        pythonBodies?.clearPythonBodyConstants()
+
        // activePartialOracles = partialOracles.activeOracles(solution.individuals)
 
         header(solution, testSuiteFileName, lines, timestamp, controllerName)
@@ -183,6 +188,8 @@ class TestSuiteWriter {
             lines.deindent()
         }
 
+        pythonBodies?.writePythonBodyConstants(lines)
+
         footer(lines)
 
         // additional handling on generated tests
@@ -394,6 +401,9 @@ class TestSuiteWriter {
                 addImport("io.restassured.RestAssured", lines)
                 addImport("io.restassured.RestAssured.given", lines, true)
                 addImport("io.restassured.response.ValidatableResponse", lines)
+                if (config.cacheLoginInTests) {
+                    addImport("io.restassured.response.Response", lines)
+                }
             }
 
             if (config.isEnabledExternalServiceMocking() && solution.needWireMockServers()) {
@@ -643,6 +653,10 @@ class TestSuiteWriter {
             }
         }
 
+        if (config.cacheLoginInTests && config.outputFormat.isJavaOrKotlin()) {
+            AuthCacheWriter.declareCachedCredentials(config.outputFormat, solution, lines)
+        }
+
         testCaseWriter.addExtraStaticVariables(lines)
 
 //        if (config.expectationsActive) {
@@ -674,6 +688,11 @@ class TestSuiteWriter {
 
         val format = config.outputFormat
 
+        if (format.isPython()) {
+            pythonSetUpClassMethod(solution, lines)
+            return
+        }
+
         when {
             format.isJUnit4() -> lines.add("@BeforeClass")
             format.isJUnit5() -> lines.add("@BeforeAll")
@@ -788,6 +807,10 @@ class TestSuiteWriter {
                 }
             }
 
+            if (config.cacheLoginInTests && format.isJavaOrKotlin()) {
+                AuthCacheWriter.writeJvmInitLogins(solution, lines)
+            }
+
             testCaseWriter.addExtraInitStatement(lines)
         }
 
@@ -798,6 +821,11 @@ class TestSuiteWriter {
 
     private fun tearDownMethod(lines: Lines, solution: Solution<*>) {
 
+        if (config.outputFormat.isPython()) {
+            pythonTearDownClassMethod(lines)
+            return
+        }
+
         if (config.blackBox) {
             return
         }
@@ -850,6 +878,36 @@ class TestSuiteWriter {
         }
     }
 
+    /**
+     * Python output is only for black-box testing, so there is no SUT to stop.
+     * But there can still be some class-level resources to handle
+     */
+    private fun pythonTearDownClassMethod(lines: Lines) {
+
+        if (!config.recordLatencyInPythonTests) {
+            return
+        }
+
+        lines.add("@classmethod")
+        lines.add("def tearDownClass(cls):")
+        lines.indented {
+            lines.add("write_latency_report(cls.__name__)")
+        }
+    }
+
+    /**
+     * As Python output is only for black-box testing, class set up is needed only for
+     * class-level resources, like cached login credentials
+     */
+    private fun pythonSetUpClassMethod(solution: Solution<*>, lines: Lines) {
+
+        if (!config.cacheLoginInTests || !AuthCacheWriter.needsCache(solution)) {
+            return
+        }
+
+        AuthCacheWriter.writePythonSetUpClass(solution, lines, baseUrlOfSut, testCaseWriter as HttpWsTestCaseWriter)
+    }
+
     private fun initTestMethod(solution: Solution<*>, lines: Lines, name: TestSuiteFileName) {
 
         if (config.blackBox) {
@@ -939,6 +997,10 @@ class TestSuiteWriter {
                 lines.addEmpty(2)
 
                 tearDownMethod(lines, solution)
+
+                if (config.cacheLoginInTests && format.isJavaOrKotlin() && AuthCacheWriter.needsCache(solution)) {
+                    AuthCacheWriter.writeJvmLoginMethods(format, solution, lines, baseUrlOfSut, testCaseWriter as HttpWsTestCaseWriter)
+                }
             }
         }
 
@@ -5,12 +5,17 @@ import org.evomaster.core.TestUtils
 import org.evomaster.core.sql.SqlAction
 import org.evomaster.core.sql.SqlActionResult
 import org.evomaster.core.output.EvaluatedIndividualBuilder.Companion.buildResourceEvaluatedIndividual
+import org.evomaster.core.output.auth.AuthCacheWriter
 import org.evomaster.core.output.service.PartialOracles
 import org.evomaster.core.output.service.RestTestCaseWriter
 import org.evomaster.core.problem.enterprise.SampleType
+import org.evomaster.core.problem.httpws.auth.EndpointCallLogin
+import org.evomaster.core.problem.httpws.auth.HttpWsAuthenticationInfo
+import org.evomaster.core.problem.httpws.auth.TokenHandling
 import org.evomaster.core.problem.rest.*
 import org.evomaster.core.search.EvaluatedIndividual
 import org.evomaster.core.search.FitnessValue
+import org.evomaster.core.search.Solution
 import org.junit.jupiter.api.Assertions.*
 import org.junit.jupiter.api.Test
 import javax.ws.rs.core.MediaType
@@ -318,4 +323,179 @@ class PythonTestCaseWriterTest {
         assertEquals(expectedLines, lines.toString())
     }
 
+    @Test
+    fun testRecordLatency(){
+        val fooAction = RestCallAction("1", HttpVerb.GET, RestPath("/foo"), mutableListOf())
+
+        val (format, baseUrlOfSut, ei) = buildResourceEvaluatedIndividual(
+            dbInitialization = mutableListOf(),
+            groups = mutableListOf(
+                (mutableListOf<SqlAction>() to mutableListOf(fooAction))
+            ),
+            format = OutputFormat.PYTHON_UNITTEST
+        )
+
+        val fooResult = ei.seeResult(fooAction.getLocalId()) as RestCallResult
+        fooResult.setTimedout(false)
+        fooResult.setStatusCode(200)
+
+        val config = getConfig(format)
+        config.recordLatencyInPythonTests = true
+
+        val test = TestCase(test = ei, name = "test")
+
+        val writer = RestTestCaseWriter(config, PartialOracles())
+        val lines = writer.convertToCompilableTestCode( test, baseUrlOfSut)
+
+        val expectedLines = """
+            def test(self):
+                
+                headers = {}
+                headers['Accept'] = "*/*"
+                res_0 = record_latency("GET", "/foo", requests \
+                        .get(self.baseUrlOfSut + "/foo",
+                            headers=headers))
+                
+                assert res_0.status_code == 200
+                assert res_0.text == ''
+
+""".trimIndent()
+        assertEquals(expectedLines, lines.toString())
+    }
+
+    @Test
+    fun testCacheLoginToken(){
+        val login = EndpointCallLogin("foo", "/login", null, "username=foo", HttpVerb.POST,
+            ContentType.X_WWW_FORM_URLENCODED, TokenHandling("/token", "Authorization", "Bearer "))
+        val auth = HttpWsAuthenticationInfo("foo", listOf(), login, false)
+        val fooAction = RestCallAction("1", HttpVerb.GET, RestPath("/foo"), mutableListOf(), auth)
+
+        val (format, baseUrlOfSut, ei) = buildResourceEvaluatedIndividual(
+            dbInitialization = mutableListOf(),
+            groups = mutableListOf(
+                (mutableListOf<SqlAction>() to mutableListOf(fooAction))
+            ),
+            format = OutputFormat.PYTHON_UNITTEST
+        )
+
+        val fooResult = ei.seeResult(fooAction.getLocalId()) as RestCallResult
+        fooResult.setTimedout(false)
+        fooResult.setStatusCode(200)
+
+        val config = getConfig(format)
+        config.cacheLoginInTests = true
+
+        val test = TestCase(test = ei, name = "test")
+
+        val writer = RestTestCaseWriter(config, PartialOracles())
+        val lines = writer.convertToCompilableTestCode( test, baseUrlOfSut).toString()
+
+        //login is not done in the test itself, but delegated to the class-level cache
+        assertTrue(lines.contains("token_foo = self.auth_cache.get(\"token_foo\", self.login_token_foo)"))
+        assertFalse(lines.contains("/login"))
+        assertTrue(lines.contains("headers[\"Authorization\"] = token_foo # foo"))
+        //on a 401, login is done again and the call repeated, before asserting on its status
+        assertTrue(lines.contains("res_0 = self.auth_cache.check(res_0, \"token_foo\", self.login_token_foo, \"Authorization\")"))
+        assertTrue(lines.indexOf("self.auth_cache.check(res_0") < lines.indexOf("assert res_0.status_code == 200"))
+    }
+
+    @Test
+    fun testCacheLoginCookies(){
+        val login = EndpointCallLogin("foo", "/login", null, "username=foo", HttpVerb.POST,
+            ContentType.X_WWW_FORM_URLENCODED)
+        val auth = HttpWsAuthenticationInfo("foo", listOf(), login, false)
+        val fooAction = RestCallAction("1", HttpVerb.GET, RestPath("/foo"), mutableListOf(), auth)
+
+        val (format, baseUrlOfSut, ei) = buildResourceEvaluatedIndividual(
+            dbInitialization = mutableListOf(),
+            groups = mutableListOf(
+                (mutableListOf<SqlAction>() to mutableListOf(fooAction))
+            ),
+            format = OutputFormat.PYTHON_UNITTEST
+        )
+
+        val fooResult = ei.seeResult(fooAction.getLocalId()) as RestCallResult
+        fooResult.setTimedout(false)
+        fooResult.setStatusCode(200)
+
+        val config = getConfig(format)
+        config.cacheLoginInTests = true
+
+        val test = TestCase(test = ei, name = "test")
+
+        val writer = RestTestCaseWriter(config, PartialOracles())
+        val lines = writer.convertToCompilableTestCode( test, baseUrlOfSut).toString()
+
+        assertTrue(lines.contains("cookies_foo = self.auth_cache.get(\"cookies_foo\", self.login_cookies_foo)"))
+        assertFalse(lines.contains("/login"))
+        assertTrue(lines.contains("headers=headers, cookies=cookies_foo"))
+        //no header, as cookies are sent
+        assertTrue(lines.contains("res_0 = self.auth_cache.check(res_0, \"cookies_foo\", self.login_cookies_foo)\n"))
+        //following calls use the new cookies, if any
+        assertTrue(lines.indexOf("self.auth_cache.check(res_0") < lines.lastIndexOf("cookies_foo = self.auth_cache.get("))
+    }
+
+    @Test
+    fun testCacheLoginSetUpClass(){
+        val tokenLogin = EndpointCallLogin("foo", "/login", null, "username=foo", HttpVerb.POST,
+            ContentType.X_WWW_FORM_URLENCODED, TokenHandling("/token", "Authorization", "Bearer "))
+        val cookieLogin = EndpointCallLogin("bar", "/signin", null, "username=bar", HttpVerb.POST,
+            ContentType.X_WWW_FORM_URLENCODED)
+        val fooAction = RestCallAction("1", HttpVerb.GET, RestPath("/foo"), mutableListOf(),
+            HttpWsAuthenticationInfo("foo", listOf(), tokenLogin, false))
+        val barAction = RestCallAction("2", HttpVerb.GET, RestPath("/bar"), mutableListOf(),
+            HttpWsAuthenticationInfo("bar", listOf(), cookieLogin, false))
+
+        val (format, baseUrlOfSut, ei) = buildResourceEvaluatedIndividual(
+            dbInitialization = mutableListOf(),
+            groups = mutableListOf(
+                (mutableListOf<SqlAction>() to mutableListOf(fooAction, barAction))
+            ),
+            format = OutputFormat.PYTHON_UNITTEST
+        )
+        val solution = Solution(mutableListOf(ei), "", "", Termination.NONE, listOf(), listOf())
+
+        val config = getConfig(format)
+        config.cacheLoginInTests = true
+        val writer = RestTestCaseWriter(config, PartialOracles())
+
+        assertTrue(AuthCacheWriter.needsCache(solution))
+        val lines = Lines(format)
+        AuthCacheWriter.writePythonSetUpClass(solution, lines, baseUrlOfSut, writer)
+        val code = lines.toString()
+
+        assertTrue(code.startsWith("@classmethod\ndef setUpClass(cls):\n    cls.auth_cache = AuthCache()\n"))
+        //a class method for each login, doing the call on the class
+        assertTrue(code.contains("@classmethod\ndef login_token_foo(cls):\n"))
+        assertTrue(code.contains("@classmethod\ndef login_cookies_bar(cls):\n"))
+        assertTrue(code.contains("cls.$baseUrlOfSut + \"/login\""))
+        assertTrue(code.contains("cls.$baseUrlOfSut + \"/signin\""))
+        assertTrue(code.contains("    return token_foo\n"))
+        assertTrue(code.contains("    return cookies_bar"))
+        assertFalse(code.contains("self."))
+    }
+
+    @Test
+    fun testFastJsonBodyConstants(){
+        val config = getConfig(OutputFormat.PYTHON_UNITTEST)
+        config.fastJsonInPythonTests = true
+
+        val writer = RestTestCaseWriter(config, PartialOracles())
+        val lines = Lines(OutputFormat.PYTHON_UNITTEST)
+        writer.clearPythonBodyConstants()
+        writer.printSendJsonBody("{\"a\":1}", lines)
+        writer.printSendJsonBody("{\"b\":2}", lines)
+        writer.printSendJsonBody("{\"a\":1}", lines)
+
+        //same bodies share same constant
+        assertEquals(listOf("body = BODY_0", "body = BODY_1", "body = BODY_0"), lines.toString().split("\n"))
+
+        val constants = Lines(OutputFormat.PYTHON_UNITTEST)
+        writer.writePythonBodyConstants(constants)
+        val module = constants.toString()
+        assertTrue(module.contains("BODY_0 = encode_json_body("))
+        assertTrue(module.contains("BODY_1 = encode_json_body("))
+        assertFalse(module.contains("BODY_2"))
+    }
+
 }
@@ -11,12 +11,17 @@ import org.evomaster.core.sql.schema.ColumnDataType.*
 import org.evomaster.core.sql.schema.ForeignKey
 import org.evomaster.core.sql.schema.Table
 import org.evomaster.core.output.EvaluatedIndividualBuilder.Companion.buildResourceEvaluatedIndividual
+import org.evomaster.core.output.auth.AuthCacheWriter
 import org.evomaster.core.output.service.PartialOracles
 import org.evomaster.core.output.service.RestTestCaseWriter
 import org.evomaster.core.problem.enterprise.SampleType
+import org.evomaster.core.problem.httpws.auth.EndpointCallLogin
+import org.evomaster.core.problem.httpws.auth.HttpWsAuthenticationInfo
+import org.evomaster.core.problem.httpws.auth.TokenHandling
 import org.evomaster.core.problem.rest.*
 import org.evomaster.core.search.EvaluatedIndividual
 import org.evomaster.core.search.FitnessValue
+import org.evomaster.core.search.Solution
 import org.evomaster.core.search.gene.*
 import org.evomaster.core.search.gene.datetime.DateGene
 import org.evomaster.core.search.gene.sql.SqlAutoIncrementGene
@@ -1398,4 +1403,139 @@ public void test() throws Exception {
         assertEquals(expectedLines, lines.toString())
     }
 
+
+    private fun buildLoginSolution(format: OutputFormat): Triple<String, EvaluatedIndividual<RestIndividual>, Solution<RestIndividual>> {
+        val tokenLogin = EndpointCallLogin("foo", "/login", null, "username=foo", HttpVerb.POST,
+            ContentType.X_WWW_FORM_URLENCODED, TokenHandling("/token", "Authorization", "Bearer "))
+        val cookieLogin = EndpointCallLogin("bar", "/signin", null, "username=bar", HttpVerb.POST,
+            ContentType.X_WWW_FORM_URLENCODED)
+        val fooAction = RestCallAction("1", HttpVerb.GET, RestPath("/foo"), mutableListOf(),
+            HttpWsAuthenticationInfo("foo", listOf(), tokenLogin, false))
+        val barAction = RestCallAction("2", HttpVerb.GET, RestPath("/bar"), mutableListOf(),
+            HttpWsAuthenticationInfo("bar", listOf(), cookieLogin, false))
+
+        val (_, baseUrlOfSut, ei) = buildResourceEvaluatedIndividual(
+            dbInitialization = mutableListOf(),
+            groups = mutableListOf(
+                (mutableListOf<SqlAction>() to mutableListOf(fooAction, barAction))
+            ),
+            format = format
+        )
+        listOf(fooAction, barAction).forEach {
+            val result = ei.seeResult(it.getLocalId()) as RestCallResult
+            result.setTimedout(false)
+            result.setStatusCode(200)
+        }
+        val solution = Solution(mutableListOf(ei), "", "", Termination.NONE, listOf(), listOf())
+        return Triple(baseUrlOfSut, ei, solution)
+    }
+
+    @Test
+    fun testCacheLoginJava(){
+        val format = OutputFormat.JAVA_JUNIT_4
+        val (baseUrlOfSut, ei, solution) = buildLoginSolution(format)
+
+        val config = getConfig(format)
+        config.cacheLoginInTests = true
+
+        val test = TestCase(test = ei, name = "test")
+        val writer = RestTestCaseWriter(config, PartialOracles())
+        val lines = writer.convertToCompilableTestCode(test, baseUrlOfSut).toString()
+
+        //login is not done in the test, but when the class is initialized
+        assertFalse(lines.contains("== null"))
+        assertFalse(lines.contains("final String token_foo"))
+        assertFalse(lines.contains("final Map<String,String> cookies_bar"))
+        assertTrue(lines.contains(".header(\"Authorization\", token_foo) // foo"))
+        assertTrue(lines.contains(".cookies(cookies_bar)"))
+
+        //on a 401, login is done again, and the call repeated
+        assertTrue(lines.contains("Response res_0_call = given()"))
+        assertTrue(lines.contains("if (res_0_call.statusCode() == 401) {\n"))
+        assertTrue(lines.contains("token_foo = login_token_foo();\n"))
+        assertTrue(lines.contains("cookies_bar = login_cookies_bar();\n"))
+        assertEquals(2, Regex("\\.get\\(baseUrlOfSut \\+ \"/foo\"\\);").findAll(lines).count())
+        assertTrue(lines.contains("res_0_call\n"))
+
+        val fields = Lines(format)
+        AuthCacheWriter.declareCachedCredentials(format, solution, fields)
+        assertEquals("private static String token_foo;\nprivate static Map<String,String> cookies_bar;\n", fields.toString())
+
+        val init = Lines(format)
+        AuthCacheWriter.writeJvmInitLogins(solution, init)
+        assertEquals("token_foo = login_token_foo();\ncookies_bar = login_cookies_bar();\n", init.toString())
+
+        val methods = Lines(format)
+        AuthCacheWriter.writeJvmLoginMethods(format, solution, methods, baseUrlOfSut, writer)
+        assertTrue(methods.toString().contains("private static String login_token_foo() {\n"))
+        assertTrue(methods.toString().contains("return \"Bearer \" + given()"))
+        assertTrue(methods.toString().contains("private static Map<String,String> login_cookies_bar() {\n"))
+        assertTrue(methods.toString().contains("return given()"))
+    }
+
+    @Test
+    fun testCacheLoginNoRetryWhenExpecting401(){
+        val format = OutputFormat.JAVA_JUNIT_4
+        val (baseUrlOfSut, ei, _) = buildLoginSolution(format)
+        ei.seeResults().filterIsInstance<RestCallResult>().forEach { it.setStatusCode(401) }
+
+        val config = getConfig(format)
+        config.cacheLoginInTests = true
+
+        val test = TestCase(test = ei, name = "test")
+        val writer = RestTestCaseWriter(config, PartialOracles())
+        val lines = writer.convertToCompilableTestCode(test, baseUrlOfSut).toString()
+
+        assertFalse(lines.contains("login_"))
+        assertFalse(lines.contains("Response res_"))
+        assertTrue(lines.contains(".statusCode(401)"))
+    }
+
+    @Test
+    fun testCacheLoginKotlin(){
+        val format = OutputFormat.KOTLIN_JUNIT_5
+        val (baseUrlOfSut, ei, solution) = buildLoginSolution(format)
+
+        val config = getConfig(format)
+        config.cacheLoginInTests = true
+
+        val test = TestCase(test = ei, name = "test")
+        val writer = RestTestCaseWriter(config, PartialOracles())
+        val lines = writer.convertToCompilableTestCode(test, baseUrlOfSut).toString()
+
+        assertFalse(lines.contains("== null"))
+        assertFalse(lines.contains("val token_foo"))
+        assertFalse(lines.contains("val cookies_bar"))
+        assertTrue(lines.contains("var res_0_call: Response = given()"))
+        assertTrue(lines.contains("if (res_0_call.statusCode() == 401) {\n"))
+        assertTrue(lines.contains("token_foo = login_token_foo()\n"))
+
+        val fields = Lines(format)
+        AuthCacheWriter.declareCachedCredentials(format, solution, fields)
+        assertEquals("private var token_foo : String? = null\nprivate var cookies_bar : Map<String,String>? = null\n", fields.toString())
+
+        val init = Lines(format)
+        AuthCacheWriter.writeJvmInitLogins(solution, init)
+        assertEquals("token_foo = login_token_foo()\ncookies_bar = login_cookies_bar()\n", init.toString())
+
+        val methods = Lines(format)
+        AuthCacheWriter.writeJvmLoginMethods(format, solution, methods, baseUrlOfSut, writer)
+        assertTrue(methods.toString().contains("private fun login_token_foo() : String {\n"))
+        assertTrue(methods.toString().contains("private fun login_cookies_bar() : Map<String,String> {\n"))
+    }
+
+    @Test
+    fun testNoCacheLoginByDefault(){
+        val format = OutputFormat.JAVA_JUNIT_4
+        val (baseUrlOfSut, ei, _) = buildLoginSolution(format)
+
+        val test = TestCase(test = ei, name = "test")
+        val writer = RestTestCaseWriter(getConfig(format), PartialOracles())
+        val lines = writer.convertToCompilableTestCode(test, baseUrlOfSut).toString()
+
+        assertTrue(lines.contains("final String token_foo = \"Bearer \" + given()"))
+        assertTrue(lines.contains("final Map<String,String> cookies_bar = given()"))
+        assertFalse(lines.contains("== null"))
+    }
+
 }
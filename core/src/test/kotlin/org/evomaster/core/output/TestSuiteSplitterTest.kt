@@ -0,0 +1,80 @@
+package org.evomaster.core.output
+
+import org.evomaster.core.EMConfig
+import org.evomaster.core.output.EvaluatedIndividualBuilder.Companion.buildResourceEvaluatedIndividual
+import org.evomaster.core.problem.rest.*
+import org.evomaster.core.search.EvaluatedIndividual
+import org.evomaster.core.search.Solution
+import org.evomaster.core.sql.SqlAction
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Test
+
+class TestSuiteSplitterTest {
+
+    private fun individual(vararg calls: Pair<RestCallAction, Int?>): EvaluatedIndividual<RestIndividual> {
+
+        val (_, _, ei) = buildResourceEvaluatedIndividual(
+            dbInitialization = mutableListOf(),
+            groups = mutableListOf(
+                (mutableListOf<SqlAction>() to calls.map { it.first }.toMutableList())
+            ),
+            format = OutputFormat.PYTHON_UNITTEST
+        )
+
+        calls.forEach { (action, code) ->
+            val result = ei.seeResult(action.getLocalId()) as RestCallResult
+            if (code != null) {
+                result.setTimedout(false)
+                result.setStatusCode(code)
+            }
+        }
+        return ei
+    }
+
+    private fun solution(individuals: List<EvaluatedIndividual<RestIndividual>>) =
+        Solution(individuals.toMutableList(), "EM", "Test", Termination.NONE, listOf(), listOf())
+
+    private fun getFoo() = RestCallAction("getFoo", HttpVerb.GET, RestPath("/foo/{id}"), mutableListOf())
+
+    private fun postFoo() = RestCallAction("postFoo", HttpVerb.POST, RestPath("/foo"), mutableListOf())
+
+
+    @Test
+    fun testSplitByStatusCode() {
+
+        val config = EMConfig()
+        config.testSuiteSplitType = EMConfig.TestSuiteSplitType.STATUS_CODE
+
+        val sol = solution(listOf(
+            individual(postFoo() to 201, getFoo() to 200),
+            individual(postFoo() to 201, getFoo() to 500),
+            individual(getFoo() to 404),
+            individual(postFoo() to 400, getFoo() to 200),
+            individual(getFoo() to null)
+        ))
+
+        val split = TestSuiteSplitter.split(sol, config).splitOutcome
+
+        assertEquals(listOf("EM_2xx_Test", "EM_4xx_Test", "EM_5xx_Test", "EM_noStatus_Test"), split.map { it.getFileName() })
+        assertEquals(listOf(1, 2, 1, 1), split.map { it.individuals.size })
+    }
+
+    @Test
+    fun testSplitByEndpoint() {
+
+        val config = EMConfig()
+        config.testSuiteSplitType = EMConfig.TestSuiteSplitType.ENDPOINT
+
+        val sol = solution(listOf(
+            individual(postFoo() to 201, getFoo() to 200),
+            individual(getFoo() to 404),
+            individual(postFoo() to 201),
+            individual(getFoo() to 200, postFoo() to 400)
+        ))
+
+        val split = TestSuiteSplitter.split(sol, config).splitOutcome
+
+        assertEquals(listOf("EM_GET_foo_id_Test", "EM_POST_foo_Test"), split.map { it.getFileName() })
+        assertEquals(listOf(2, 2), split.map { it.individuals.size })
+    }
+}
@@ -133,6 +133,33 @@ class TestSuiteWriterTest{
         assertTrue(generatedUtils == PyLoader::class.java.getResource("/${TestSuiteWriter.pythonUtilsFilename}").readText())
     }
 
+    @Test
+    fun testPythonLatencyReportInTearDownClass(){
+
+        val injector = LifecycleInjector.builder()
+            .withModules(BaseModule(), ReducedModule())
+            .build().createInjector()
+
+        val config = injector.getInstance(EMConfig::class.java)
+        config.createTests = true
+        config.outputFormat = OutputFormat.PYTHON_UNITTEST
+        config.outputFolder = "$baseTargetFolder/python_latency"
+        config.outputFilePrefix = "Foo_testPythonLatency"
+        config.outputFileSuffix = ""
+        config.recordLatencyInPythonTests = true
+
+        val solution = getEmptySolution(config)
+
+        val srcFolder = File(config.outputFolder)
+        srcFolder.deleteRecursively()
+
+        val writer = injector.getInstance(TestSuiteWriter::class.java)
+        writer.writeTests(solution, FakeController::class.qualifiedName!!, null)
+
+        val generated = String(Files.readAllBytes(Paths.get("${config.outputFolder}/${config.outputFilePrefix}.py")))
+        assertTrue(generated.contains("    @classmethod\n    def tearDownClass(cls):\n        write_latency_report(cls.__name__)\n"))
+    }
+
     private fun getEmptySolution(config: EMConfig): Solution<RestIndividual> {
         return Solution<RestIndividual>(
             mutableListOf(),
@@ -1,5 +1,7 @@
 #!/usr/bin/env python
+import hashlib
 import math
+import subprocess
 import sys
 import os
 import shutil
@@ -287,6 +289,45 @@ SCHEMATHESIS_CMD = "schemathesis run"
 BB_EXP_UTIL = "$BASE/util/bb-exp-util.jar"
 TIMEOUT_RUN_CMD_SCRIPT="util/run_cmd.sh"
 
+############################################################################
+### schema cache
+###     the handling of the schemas above is the same for all seeds of a SUT,
+###     and it can be done once when generating the scripts, instead of in each script
+###     (each time starting a JVM, and waiting for it).
+###     if SCHEMA_CACHE is set, the processed schemas are saved in such folder, based on hash
+###     of their content, with a placeholder for the port of the SUT.
+###     the actual port is then set when the schema is copied into the result folder of each run.
+###     this is done only for schemas which are available when generating the scripts,
+###     ie, local ones, or the ones saved in SCHEMA_CACHE/raw/<sut> once downloaded in the scripts
+###     of a previous experiment using the same SCHEMA_CACHE.
+###     for all the others, the schemas are handled in the scripts as usual.
+############################################################################
+SCHEMA_CACHE = os.environ.get("SCHEMA_CACHE", "")
+SCHEMA_PLACEHOLDER_PORT = "65534"
+
+############################################################################
+### warm SUTs
+###     starting a SUT can take as long as a few minutes. if WARM_SUTS is true,
+###     all tools are run with the same seed on the same instance of a JVM SUT, in a single script,
+###     one after the other, instead of starting a new SUT for each one of them.
+###     between runs, the state of the SUT is reset with <sut>_reset.sh <port>, which must be
+###     in the same folder of the script starting the SUT (eg, to restore a snapshot of its database),
+###     and the JaCoCo coverage of the run is dumped and reset.
+###     as tools are always run in the same order, a SUT without such script would bias the comparison
+###     of the tools, so generation fails, unless WARM_SUTS_WITHOUT_RESET is true (eg, for stateless SUTs).
+###     before each run, if the SUT does not respond anymore (eg, it crashed or hanged in a previous run),
+###     it is restarted.
+###     this requires jacococli.jar in the tools folder, and that the script starting the SUT
+###     appends its 3rd input to the options of the JaCoCo agent (ie, -javaagent:<agent>=destfile=<input>).
+###     NodeJS SUTs are always started for each run, as coverage with c8 is saved only once the SUT is stopped.
+############################################################################
+WARM_SUTS = os.environ.get("WARM_SUTS", "false").lower() in ("yes", "true", "t")
+WARM_SUTS_WITHOUT_RESET = os.environ.get("WARM_SUTS_WITHOUT_RESET", "false").lower() in ("yes", "true", "t")
+WARM_TOOL = "warm"
+JACOCO_CLI = "$BASE/tools/jacococli.jar"
+# port of JaCoCo agent, for each run, to dump coverage, ie, the last one of the 10 ports reserved for each run
+JACOCO_PORT_OFFSET = 9
+
 BB_TOOLS = [BB_EVOMASTER, BB_RESTLER, BB_RESTCT, #BB_RESTTESTGEN,
             BB_RESTTESTGENV2, BB_RESTEST, BB_BBOXRT, BB_SCHEMATHESIS]
 
@@ -324,19 +365,31 @@ def getScriptHead(port,tool,sut):
     s += 'SCRIPT_DIR=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd ) \n'
     s += "BASE=$SCRIPT_DIR/../.. \n"
     s += "PORT=" + str(port) + " \n"
-    label = sut.name+"__"+tool+"__\"$PORT\""
 
     if ENABLE_TIMEOUT_RUM_CMD:
         s += "\nsource $BASE/util/run_cmd.sh\n\n"
 
+    s += startSut(sut, tool, False)
+
+    return s
+
+# commands to start the SUT, appending to its log if append is true (eg, when restarting it)
+def startSut(sut, tool, append):
+    s = ""
+    label = sut.name+"__"+tool+"__\"$PORT\""
+
     sut_dir = findSutScriptDir(sut.runtime)
     command = "bash $BASE/"+sut_dir+"/"+sut.name+".sh"
-    redirection = "> \""+LOGS+"/sut__"+sut.name+"__"+tool+"__$PORT.txt\" 2>&1 & \n"
+    redirection = (">> " if append else "> ") + "\""+LOGS+"/sut__"+sut.name+"__"+tool+"__$PORT.txt\" 2>&1 & \n"
 
     if sut.runtime == JVM:
         s += "# JaCoCo does not like full paths or exec in Windows/GitBash format... but relative path seems working \n"
         # strange it does not want  ./"+sys.argv[2] before the exec
         inputs =  " $PORT $BASE/tools/jacocoagent.jar  ./exec/"+label+"__jacoco.exec "
+        if tool == WARM_TOOL:
+            # coverage is dumped after each run, see WARM_SUTS
+            inputs = " $PORT $BASE/tools/jacocoagent.jar  ./exec/"+label+"__jacoco.exec,output=tcpserver,address=127.0.0.1,port=$((PORT+" \
+                     + str(JACOCO_PORT_OFFSET) + ")) "
     else :
         inputs = " $PORT $SCRIPT_DIR/../c8/"+label
     s += command + inputs + redirection
@@ -353,6 +406,51 @@ def getScriptHead(port,tool,sut):
 
     return s
 
+def isWarm(sut):
+    return WARM_SUTS and sut.runtime == JVM
+
+def nextPort(sut, port):
+    # runs on a warm SUT share its port
+    if isWarm(sut):
+        return port
+    return port + 10
+
+# runs to do on the same warm SUT, ie, (tool, command)
+WARM_RUNS = []
+
+def writeRun(port, tool, sut, command):
+    if isWarm(sut):
+        WARM_RUNS.append((tool, command))
+        return
+    code = getScriptHead(port, tool, sut) + command + getScriptFooter(port, tool, sut)
+    writeScript(code, port, tool, sut)
+
+def writeWarmScript(sut, port):
+    sut_dir = findSutScriptDir(sut.runtime)
+    sut_log = "\""+LOGS+"/sut__"+sut.name+"__"+WARM_TOOL+"__$PORT.txt\""
+    code = getScriptHead(port, WARM_TOOL, sut)
+    for i, (tool, command) in enumerate(WARM_RUNS):
+        code += "\n############ " + tool + " ############\n"
+        # any HTTP response (even an error) means the SUT is still alive
+        code += "if ! curl -s -o /dev/null --max-time 60 http://localhost:$PORT ; then\n"
+        code += "echo \"SUT not responding before running " + tool + ", restarting it\" >> " + sut_log + "\n"
+        code += "kill -n 2 $CHILD > /dev/null 2>&1\n"
+        code += "sleep 10\n"
+        code += "kill -9 $PID $CHILD > /dev/null 2>&1\n"
+        code += startSut(sut, WARM_TOOL, True)
+        code += "fi\n"
+        if i > 0:
+            code += "RESET=\"$BASE/" + sut_dir + "/" + sut.name + "_reset.sh\"\n"
+            code += "if [ -f \"$RESET\" ]; then bash \"$RESET\" $PORT >> " + sut_log + " 2>&1; " \
+                    + "else echo \"WARNING: no $RESET, state of the SUT is not reset\" >> " + sut_log + "; fi\n"
+        code += command
+        code += "\n# coverage of this run only\n"
+        code += JAVA_8_COMMAND + " -jar " + JACOCO_CLI + " dump --address 127.0.0.1 --port $((PORT+" + str(JACOCO_PORT_OFFSET) + "))" \
+                + " --destfile ./exec/" + sut.name + "__" + tool + "__\"$PORT\"__jacoco.exec --reset >> " + sut_log + " 2>&1\n"
+    code += getScriptFooter(port, WARM_TOOL, sut)
+    writeScript(code, port, WARM_TOOL, sut)
+    WARM_RUNS.clear()
+
 ## find a dir where save sut scripts based on the specified platform
 def findSutScriptDir(platform):
     found = list(filter(lambda x: x.platform.lower() == platform.lower(), SUTS_SETUP))
@@ -384,11 +482,7 @@ def createScriptForEvoMaster(sut, port, seed):
 
     result_folder = createResultDir(sut.name, seed, port, tool)
 
-    openapi_path = pathlib.PurePath(os.path.join(result_folder, sut.openapiName)).as_posix()
-
-    command = downloadOpenApi(sut.endpointPath, openapi_path, evomaster_bb_log)
-    if FIX_BASIC_SCHEMA_ISSUE:
-        command = command + updateURLAndPort(openapi_path, port, evomaster_bb_log)
+    command, openapi_path = prepareOpenApi(sut, port, result_folder, evomaster_bb_log)
 
     ## start_tool
     start_tool_command = JAVA_8_COMMAND+" -Xms1G -Xmx4G -jar $BASE/tools/evomaster.jar"
@@ -426,8 +520,7 @@ def createScriptForEvoMaster(sut, port, seed):
     else:
         command += start_tool_command
 
-    code = getScriptHead(port, tool, sut) + command + getScriptFooter(port, tool, sut)
-    writeScript(code, port, tool, sut)
+    writeRun(port, tool, sut, command)
 
 ######################## baseline tools start ########################################
 def createScriptForRestler(sut, port, seed):
@@ -441,12 +534,7 @@ def createScriptForRestler(sut, port, seed):
     result_folder = createResultDir(sut.name, seed, port, tool)
     # restler employ hour as the unit
     time_budget = math.ceil(MAX_TIME_SECONDS / 36) / 100
-    openapi_path = pathlib.PurePath(os.path.join(result_folder, sut.openapiName)).as_posix()
-
-    command = downloadOpenApi(sut.endpointPath, openapi_path, restler_log)
-
-    if FIX_BASIC_SCHEMA_ISSUE:
-        command = command + updateURLAndPort(openapi_path, port, restler_log)
+    command, openapi_path = prepareOpenApi(sut, port, result_folder, restler_log)
 
     start_tool_command = PYTHON_COMMAND + " " + RESTLER_START_SCRIPT
     start_tool_command +=  " --api_spec_path " + openapi_path
@@ -465,8 +553,7 @@ def createScriptForRestler(sut, port, seed):
     else:
         command += start_tool_command
 
-    code = getScriptHead(port, tool, sut) + command + getScriptFooter(port, tool, sut)
-    writeScript(code, port, tool, sut)
+    writeRun(port, tool, sut, command)
 
 def createScriptForRestCT(sut, port, seed):
     tool = BB_RESTCT
@@ -482,17 +569,10 @@ def createScriptForRestCT(sut, port, seed):
 
     # restCT use seconds as well
     time_budget = MAX_TIME_SECONDS
-    default_openapi_path = pathlib.PurePath(os.path.join(default_folder, sut.openapiName)).as_posix()
-    openapi_actual_path = default_openapi_path
-    openapi_path = default_openapi_path
+    command, openapi_path = prepareOpenApi(sut, port, result_actual_folder, restct_log)
     if IS_WINDOWS:
-        openapi_actual_path = result_actual_folder + "/" + sut.openapiName
         openapi_path = result_folder + "/" +sut.openapiName
 
-    command = downloadOpenApi(sut.endpointPath, openapi_actual_path, restct_log)
-    if FIX_BASIC_SCHEMA_ISSUE:
-        command = command + updateURLAndPort(openapi_actual_path, port, restct_log)
-
     output_label = ""
     if ENABLE_TIMEOUT_RUM_CMD:
         output_label = "_R\"$" + ENABLE_TIMEOUT_RUM_CMD_VAR + "\""
@@ -517,8 +597,7 @@ def createScriptForRestCT(sut, port, seed):
     else:
         command += start_tool_command
 
-    code = getScriptHead(port, tool, sut) + command + getScriptFooter(port, tool, sut)
-    writeScript(code, port, tool, sut)
+    writeRun(port, tool, sut, command)
 
 
 # RestTestGen
@@ -533,12 +612,8 @@ def createScriptForRestTestGen(sut, port, seed):
 
     result_folder = createResultDir(sut.name, seed, port, tool)
     client_code_path = str(pathlib.PurePath(result_folder+"/output/codegen").as_posix())
-    openapi_path = pathlib.PurePath(os.path.join(result_folder, sut.openapiName)).as_posix()
 
-
-    command = downloadOpenApi(sut.endpointPath, openapi_path, swagger_client_log)
-    if FIX_BASIC_SCHEMA_ISSUE:
-        command = command + updateURLAndPort(openapi_path, port, swagger_client_log)
+    command, openapi_path = prepareOpenApi(sut, port, result_folder, swagger_client_log)
 
     output_label = ""
     if ENABLE_TIMEOUT_RUM_CMD:
@@ -577,8 +652,7 @@ def createScriptForRestTestGen(sut, port, seed):
     else:
         command += start_tool_command
 
-    code = getScriptHead(port, tool, sut) + command + getScriptFooter(port, tool, sut)
-    writeScript(code, port, tool, sut)
+    writeRun(port, tool, sut, command)
 
 # RestTestGen v2 from https://github.com/SeUniVr/RestTestGen
 def createScriptForRestTestGenV2(sut, port, seed):
@@ -592,16 +666,8 @@ def createScriptForRestTestGenV2(sut, port, seed):
 
     # copy tool to result dir
     shutil.copy(pathlib.PurePath(os.path.join(RESTTESTGEN_V2_DIR, RESTTESTGEN_V2_JAR)), result_folder)
-    # a path where the schema will be saved
-    openapi_path = pathlib.PurePath(os.path.join(result_folder, sut.openapiName)).as_posix()
-
-    command = downloadOpenApi(sut.endpointPath, openapi_path, resttestgen_log)
-
-    if FIX_BASIC_SCHEMA_ISSUE:
-        command = command + updateURLAndPort(openapi_path, port, resttestgen_log, True, "json")
-        is_yaml = sut.openapiName.endswith('.yaml')
-        if is_yaml:
-            openapi_path = pathlib.PurePath(os.path.join(result_folder, sut.openapiName.replace(".yaml",".json"))).as_posix()
+    # the schema is converted to json, if needed
+    command, openapi_path = prepareOpenApi(sut, port, result_folder, resttestgen_log, True, "json")
 
     # update the schema
     config_file = createConfigFileForRestTestGenV2(result_folder, openapi_path)
@@ -620,8 +686,7 @@ def createScriptForRestTestGenV2(sut, port, seed):
     else:
         command += start_tool_command
 
-    code = getScriptHead(port, tool, sut) + command + getScriptFooter(port, tool, sut)
-    writeScript(code, port, tool, sut)
+    writeRun(port, tool, sut, command)
 
 
 def createScriptForRestTest(sut, port, seed):
@@ -631,11 +696,7 @@ def createScriptForRestTest(sut, port, seed):
 
     result_folder = createResultDir(sut.name, seed, port, tool)
 
-    openapi_path = pathlib.PurePath(os.path.join(result_folder, sut.openapiName)).as_posix()
-
-    command = downloadOpenApi(sut.endpointPath, openapi_path, resttest_log)
-    if FIX_BASIC_SCHEMA_ISSUE:
-        command = command + updateURLAndPort(openapi_path, port, resttest_log)
+    command, openapi_path = prepareOpenApi(sut, port, result_folder, resttest_log)
 
     ## the file and path cannot be configured with command line, unless modify the source code
     testconfig_path = pathlib.PurePath(os.path.join(result_folder, "testConf.yaml")).as_posix()
@@ -668,8 +729,7 @@ def createScriptForRestTest(sut, port, seed):
     else:
         command += start_tool_command
 
-    code = getScriptHead(port, tool, sut) + command + getScriptFooter(port, tool, sut)
-    writeScript(code, port, tool, sut)
+    writeRun(port, tool, sut, command)
 
 def createScriptForbBOXRT(sut, port, seed):
     tool = BB_BBOXRT
@@ -680,17 +740,8 @@ def createScriptForbBOXRT(sut, port, seed):
 
     time_budget = MAX_TIME_SECONDS
 
-    openapi_path = pathlib.PurePath(os.path.join(result_folder, sut.openapiName)).as_posix()
-
     ## bBOXRT only supports schema with json, then we need to convert json to yaml in order to use it
-    command = downloadOpenApi(sut.endpointPath, openapi_path, bboxrt_log)
-
-    if FIX_BASIC_SCHEMA_ISSUE:
-        command = command + updateURLAndPort(openapi_path, port, bboxrt_log)
-        is_json = sut.openapiName.endswith('.json')
-        if is_json:
-            command = command + jsonToYaml(openapi_path, bboxrt_log)
-            openapi_path = pathlib.PurePath(os.path.join(result_folder, sut.openapiName.replace(".json",".yaml"))).as_posix()
+    command, openapi_path = prepareOpenApi(sut, port, result_folder, bboxrt_log, toYaml=True)
 
     java_api_config = createbBOXRTApiConfigJavaFile(result_folder, sut, openapi_path)
 
@@ -719,8 +770,7 @@ def createScriptForbBOXRT(sut, port, seed):
     else:
         command += start_tool_command
 
-    code = getScriptHead(port, tool, sut) + command + getScriptFooter(port, tool, sut)
-    writeScript(code, port, tool, sut)
+    writeRun(port, tool, sut, command)
 
 ## based on doc https://schemathesis.readthedocs.io/en/stable/
 def createScriptForSchemathesis(sut, port, seed):
@@ -729,12 +779,7 @@ def createScriptForSchemathesis(sut, port, seed):
     schemathesis_log = pathlib.PurePath(LOGS + "/tool__" + sut.name + "__" + tool + "__" +str(port) + ".txt").as_posix()
     result_folder = createResultDir(sut.name, seed, port, tool)
 
-    openapi_path = pathlib.PurePath(os.path.join(result_folder, sut.openapiName)).as_posix()
-
-
-    command = downloadOpenApi(sut.endpointPath, openapi_path, schemathesis_log)
-    if FIX_BASIC_SCHEMA_ISSUE:
-        command = command + updateURLAndPort(openapi_path, port, schemathesis_log)
+    command, openapi_path = prepareOpenApi(sut, port, result_folder, schemathesis_log)
 
     start_tool_command = ""
     output_label=""
@@ -773,8 +818,7 @@ def createScriptForSchemathesis(sut, port, seed):
     else:
         command += start_tool_command
 
-    code = getScriptHead(port, tool, sut) + command + getScriptFooter(port, tool, sut)
-    writeScript(code, port, tool, sut)
+    writeRun(port, tool, sut, command)
 
 ###################### utility #############################
 
@@ -838,7 +882,7 @@ def authForResTest(testconfig_path, key, value, log):
     return command + "\n\n"
 
 ## download openapi
-def downloadOpenApi(endpointPath, openapiName, log):
+def downloadOpenApi(endpointPath, openapiName, log, sut=None):
     command = "\n# save open api to local\n"
     if endpointPath.startswith(LOCAL_SCHEMA_PREFIX):
         local_path = endpointPath.split(LOCAL_SCHEMA_PREFIX)[1]
@@ -846,11 +890,103 @@ def downloadOpenApi(endpointPath, openapiName, log):
     else:
         command = command + "curl http://localhost:$PORT"+endpointPath + " --output "+openapiName
         command = command + " >> " + log + " 2>&1 "
+        if SCHEMA_CACHE != "" and sut is not None:
+            # keep it for the next experiments, see SCHEMA_CACHE
+            raw = pathlib.PurePath(rawSchemaPath(sut)).as_posix()
+            command = command + "\nif [ -s " + openapiName + " ] && [ ! -f \"" + raw + "\" ]; then mkdir -p \"" + os.path.dirname(raw) \
+                      + "\" && cp " + openapiName + " \"" + raw + ".$$\" && mv \"" + raw + ".$$\" \"" + raw + "\"; fi"
 
     command = command + "\nsleep 5"
     return command + "\n\n"
 
 
+## path on this machine of the original schema of the sut, see SCHEMA_CACHE
+def rawSchemaPath(sut):
+    if sut.endpointPath.startswith(LOCAL_SCHEMA_PREFIX):
+        return sut.endpointPath.split(LOCAL_SCHEMA_PREFIX)[1].replace("$BASE", os.path.dirname(BASE_DIR))
+    return os.path.join(SCHEMA_CACHE, "raw", sut.name, sut.openapiName)
+
+## name of the schema file once handled for the tool
+def processedSchemaName(sut, convertToV3, format, toYaml):
+    name = sut.openapiName
+    if FIX_BASIC_SCHEMA_ISSUE:
+        if format == "json" and name.endswith(".yaml"):
+            name = name.replace(".yaml", ".json")
+        if toYaml and name.endswith(".json"):
+            name = name.replace(".json", ".yaml")
+    return name
+
+def runExpUtil(args):
+    util = BB_EXP_UTIL.replace("$BASE", os.path.dirname(BASE_DIR))
+    if not os.path.isfile(util):
+        return False
+    java = os.path.join(JAVA_HOME_8, "bin", "java")
+    return subprocess.run([java, "-jar", util] + args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+
+## content of the handled schema of the sut, with placeholder for the port, or None if cannot be handled here
+def processedSchema(sut, convertToV3, format, toYaml):
+    raw = rawSchemaPath(sut)
+    if SCHEMA_CACHE == "" or not FIX_BASIC_SCHEMA_ISSUE or not os.path.isfile(raw):
+        return None
+    with open(raw, "rb") as f:
+        data = f.read()
+    # changes in the utility might lead to different schemas
+    util = BB_EXP_UTIL.replace("$BASE", os.path.dirname(BASE_DIR))
+    util_hash = ""
+    if os.path.isfile(util):
+        with open(util, "rb") as f:
+            util_hash = hashlib.sha256(f.read()).hexdigest()
+    spec = json.dumps({"name": sut.openapiName, "convertToV3": convertToV3, "format": format, "toYaml": toYaml, "util": util_hash})
+    key = hashlib.sha256(data + spec.encode("utf-8")).hexdigest()
+    folder = os.path.join(SCHEMA_CACHE, "processed", key)
+    name = processedSchemaName(sut, convertToV3, format, toYaml)
+
+    if not os.path.isdir(folder):
+        tmp = folder + "." + str(os.getpid())
+        os.makedirs(tmp)
+        openapi_path = os.path.join(tmp, sut.openapiName)
+        shutil.copy(raw, openapi_path)
+        args = ["updateURLAndPort", openapi_path, SCHEMA_PLACEHOLDER_PORT]
+        if convertToV3:
+            args.append("true")
+        if format is not None:
+            args.append(format)
+        ok = runExpUtil(args)
+        if ok and toYaml and sut.openapiName.endswith(".json"):
+            ok = runExpUtil(["jsonToYaml", openapi_path])
+        if not ok or not os.path.isfile(os.path.join(tmp, name)):
+            print("WARNING: cannot handle schema of " + sut.name + " when generating the scripts")
+            shutil.rmtree(tmp, ignore_errors=True)
+            return None
+        try:
+            os.rename(tmp, folder)
+        except OSError:
+            # done at the same time by someone else
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    with open(os.path.join(folder, name)) as f:
+        return f.read()
+
+## save the schema in the result folder, ready to use for the tool,
+## returning the commands needed in the script to do it (if any), and the path of the schema
+def prepareOpenApi(sut, port, result_folder, log, convertToV3=False, format=None, toYaml=False):
+    openapi_path = pathlib.PurePath(os.path.join(result_folder, sut.openapiName)).as_posix()
+    processed_path = pathlib.PurePath(os.path.join(result_folder, processedSchemaName(sut, convertToV3, format, toYaml))).as_posix()
+
+    content = processedSchema(sut, convertToV3, format, toYaml)
+    if content is not None:
+        with open(processed_path, "w") as f:
+            f.write(content.replace(":" + SCHEMA_PLACEHOLDER_PORT, ":" + str(port)))
+        return "\n# schema already handled when generating this script, see SCHEMA_CACHE\n\n", processed_path
+
+    command = downloadOpenApi(sut.endpointPath, openapi_path, log, sut)
+    if FIX_BASIC_SCHEMA_ISSUE:
+        command = command + updateURLAndPort(openapi_path, port, log, convertToV3, format)
+        if toYaml and sut.openapiName.endswith('.json'):
+            command = command + jsonToYaml(openapi_path, log)
+    return command, processed_path
+
+
 ## create folder to save the results
 def createResultDir(sut_name, seed, port, tool_name, folder=TESTS):
     dir = folder + "/"+resultDir(sut_name, seed, port, tool_name)
@@ -980,45 +1116,58 @@ def createJobs():
 
             if BB_EVOMASTER in BB_TOOLS:
                 createScriptForEvoMaster(sut, port, seed)
-                port = port + 10
+                port = nextPort(sut, port)
 
             if BB_RESTLER in BB_TOOLS:
                 # Restler
                 createScriptForRestler(sut, port, seed)
-                port = port + 10
+                port = nextPort(sut, port)
 
             if BB_RESTCT in BB_TOOLS:
                 # RestCT
                 createScriptForRestCT(sut, port, seed)
-                port = port + 10
+                port = nextPort(sut, port)
 
             if BB_RESTTESTGEN in BB_TOOLS:
                 # RestTestGen
                 createScriptForRestTestGen(sut, port, seed)
-                port = port + 10
+                port = nextPort(sut, port)
 
             if BB_RESTTESTGENV2 in BB_TOOLS:
                 # RestTestGen V2
                 createScriptForRestTestGenV2(sut, port, seed)
-                port = port + 10
+                port = nextPort(sut, port)
 
             if BB_RESTEST in BB_TOOLS:
                 # RestTest
                 createScriptForRestTest(sut, port, seed)
-                port = port + 10
+                port = nextPort(sut, port)
 
             if BB_BBOXRT in BB_TOOLS:
                 # bBOXRT
                 createScriptForbBOXRT(sut, port, seed)
-                port = port + 10
+                port = nextPort(sut, port)
 
             if BB_SCHEMATHESIS in BB_TOOLS:
                 # Schemathesis
                 createScriptForSchemathesis(sut, port, seed)
+                port = nextPort(sut, port)
+
+            if isWarm(sut):
+                writeWarmScript(sut, port)
                 port = port + 10
 
 
 
+# see WARM_SUTS, $BASE in the scripts is the parent of BASE_DIR
+if WARM_SUTS and not WARM_SUTS_WITHOUT_RESET:
+    noReset = [sut.name for sut in SUTS if isWarm(sut) and not os.path.isfile(
+        os.path.join(os.path.dirname(BASE_DIR), findSutScriptDir(sut.runtime), sut.name + "_reset.sh"))]
+    if len(noReset) > 0:
+        print("ERROR: no <sut>_reset.sh to reset the state of warm SUTs between tools, for: " + ", ".join(noReset)
+              + ". Set WARM_SUTS_WITHOUT_RESET=true to run them anyway, eg, if they are stateless")
+        exit(1)
+
 shutil.rmtree(TMP, ignore_errors=True)
 os.makedirs(TMP)
 os.makedirs(LOGS)
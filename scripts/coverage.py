@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+
+# Compute code coverage from the JaCoCo exec files of an experiment folder (FOLDER), ie, the ones created
+# by exp.py with jacoco=true, or by the black-box experiment scripts in docs/exp, in FOLDER/exec.
+# Exec files are named <sut>__<config>__<port>__jacoco.exec, one per run, and they are grouped by SUT and config.
+# For each group, all its exec files are merged and reported with a single jacococli call (ie, a single JVM),
+# and groups are handled in parallel. Results are written in a single CSV file, with one row per group.
+#
+# Besides the coverage of the merged runs (instructions, branches, lines and methods), for each group the
+# distribution of the coverage of its single runs is reported as well, in terms of JaCoCo probes.
+# Those are read directly from the exec files, without starting any JVM.
+#
+# EMB jars are fat jars, bundling all the libraries of the SUT, so only the classes of the SUT itself are counted,
+# both in the reports and in the probes. Those are the classes in the given packages (see packages), or else, for
+# Spring Boot jars, the packages of the classes in BOOT-INF/classes. Otherwise, all classes are counted, with a warning.
+#
+# Reports are cached in FOLDER/coverage_cache, based on the content of the exec files, of the SUT jar
+# and of jacococli, so running this script again (eg, when more runs are completed) only reports the groups that changed.
+#
+# Usage:
+#
+#   coverage.py <FOLDER> named_param=? ... named_param=?
+#
+# Named parameters:
+#
+#   classes=<dir>       folder with the SUT jar files, named <sut>-sut.jar or <sut>.jar, as in EMB. Default is FOLDER,
+#                       where exp.py copies them when running locally.
+#   jacococli=<file>    location of jacococli.jar. Default is in JACOCO_LOCATION env variable (as for exp.py),
+#                       or else FOLDER/tools/jacococli.jar (as for the black-box experiments).
+#   njobs=<N>           how many jacococli to run in parallel. Default is the number of CPUs.
+#   output=<file>       where to write the results. Default is FOLDER/coverage.csv.
+#   packages=<sut>:<package>,...,<sut>:<package>
+#                       packages of the classes of each SUT (subpackages included), eg,
+#                       packages=features-service:org.javiermf.features,catwatch:org.zalando.catwatch
+
+import concurrent.futures
+import csv
+import hashlib
+import os
+import statistics
+import struct
+import subprocess
+import sys
+import zipfile
+
+# Settings, see main()
+FOLDER = None
+CLASSES = None
+JACOCO_CLI = None
+NJOBS = os.cpu_count() or 1
+OUTPUT = None
+# SUT name -> packages of its classes, in the form used in the class files, eg, org/foo
+PACKAGES = {}
+JAVA = os.path.join(os.environ["JAVA_HOME"], "bin", "java") if os.environ.get("JAVA_HOME", "") != "" else "java"
+EXEC_DIR = None
+CACHE_DIR = None
+
+EXEC_POSTFIX = "__jacoco.exec"
+
+# counters in the CSV reports of JaCoCo
+COUNTERS = ["INSTRUCTION", "BRANCH", "LINE", "METHOD"]
+
+COLUMNS = ["sut", "config", "runs", "meanProbeCoverage", "minProbeCoverage", "maxProbeCoverage"] \
+          + [c.lower() + s for c in COUNTERS for s in ["Covered", "Missed", "Coverage"]]
+
+# folder with the classes of the SUT in Spring Boot jars, where the libraries are in BOOT-INF/lib
+BOOT_CLASSES = "BOOT-INF/classes/"
+
+# block types in exec files, see org.jacoco.core.data.ExecutionDataWriter
+BLOCK_HEADER = 0x01
+BLOCK_SESSIONINFO = 0x10
+BLOCK_EXECUTIONDATA = 0x11
+
+
+def fileHash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ExecReader:
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def read(self, n):
+        if self.offset + n > len(self.data):
+            raise EOFError()
+        b = self.data[self.offset:self.offset + n]
+        self.offset += n
+        return b
+
+    def varInt(self):
+        value = 0
+        shift = 0
+        while True:
+            b = self.read(1)[0]
+            value |= (b & 0x7F) << shift
+            if b & 0x80 == 0:
+                return value
+            shift += 7
+
+    def utf(self):
+        n = struct.unpack(">H", self.read(2))[0]
+        return self.read(n).decode("utf-8", "replace")
+
+    def probes(self):
+        n = self.varInt()
+        packed = self.read((n + 7) // 8)
+        return [(packed[i // 8] >> (i % 8)) & 1 == 1 for i in range(n)]
+
+
+def readProbes(path, include=None):
+    # class id -> probes, merging all the dumps in the file, only for the classes whose package is included, if given
+    with open(path, "rb") as f:
+        reader = ExecReader(f.read())
+    classes = {}
+    try:
+        while reader.offset < len(reader.data):
+            block = reader.read(1)[0]
+            if block == BLOCK_HEADER:
+                reader.read(4)
+            elif block == BLOCK_SESSIONINFO:
+                reader.utf()
+                reader.read(16)
+            elif block == BLOCK_EXECUTIONDATA:
+                classId = struct.unpack(">q", reader.read(8))[0]
+                name = reader.utf()
+                probes = reader.probes()
+                if include is not None and not include(name.rpartition("/")[0]):
+                    continue
+                old = classes.get(classId)
+                classes[classId] = probes if old is None or len(old) != len(probes) else [a or b for a, b in zip(old, probes)]
+            else:
+                print("WARN: unrecognized block " + str(block) + " in " + path + ", ignoring the rest of it")
+                break
+    except EOFError:
+        # eg, the SUT was killed while writing it
+        print("WARN: truncated exec file " + path)
+    return classes
+
+
+def probeCoverages(files, include):
+    # coverage of each run, among all the probes of all classes loaded in any of the runs of the group
+    runs = [readProbes(f, include) for f in files]
+    sizes = {}
+    for run in runs:
+        for classId, probes in run.items():
+            sizes[classId] = len(probes)
+    total = sum(sizes.values())
+    if total == 0:
+        return [0] * len(runs)
+    return [sum(sum(probes) for probes in run.values()) / total for run in runs]
+
+
+def findJar(sut):
+    for name in [sut + "-sut.jar", sut + ".jar"]:
+        if os.path.exists(os.path.join(CLASSES, name)):
+            return os.path.join(CLASSES, name)
+    return None
+
+
+def ownPackages(sut, jar):
+    # predicate on the packages (eg, org/foo) of the classes of the SUT, or None if they are unknown
+    if sut in PACKAGES:
+        prefixes = PACKAGES[sut]
+        return lambda package: any(package == p or package.startswith(p + "/") for p in prefixes)
+    if jar is None:
+        return None
+    with zipfile.ZipFile(jar) as z:
+        packages = {n[len(BOOT_CLASSES):].rpartition("/")[0] for n in z.namelist()
+                    if n.startswith(BOOT_CLASSES) and n.endswith(".class")}
+    if len(packages) == 0:
+        return None
+    return lambda package: package in packages
+
+
+def report(jar, files, include):
+    # merge and report all exec files with a single JVM, returning the total of the counters of the included packages
+    key = hashlib.sha256((fileHash(jar) + fileHash(JACOCO_CLI) + "".join(sorted(fileHash(f) for f in files))).encode()).hexdigest()
+    cached = os.path.join(CACHE_DIR, key + ".csv")
+    if not os.path.exists(cached):
+        tmp = cached + "." + str(os.getpid()) + "." + str(id(files))
+        command = [JAVA, "-jar", JACOCO_CLI, "report"] + files + ["--classfiles", jar, "--csv", tmp, "--quiet"]
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        if result.returncode != 0:
+            raise Exception("jacococli failed: " + result.stdout.decode("utf-8", "replace"))
+        os.replace(tmp, cached)
+
+    totals = {}
+    with open(cached, newline="") as f:
+        for row in csv.DictReader(f):
+            if include is not None and not include(row["PACKAGE"].replace(".", "/")):
+                continue
+            for c in COUNTERS:
+                for s in ["COVERED", "MISSED"]:
+                    totals[c + "_" + s] = totals.get(c + "_" + s, 0) + int(row[c + "_" + s])
+    return totals
+
+
+def ratio(covered, missed):
+    return "" if covered + missed == 0 else "{:.4f}".format(covered / (covered + missed))
+
+
+def handleGroup(sut, config, files):
+    jar = findJar(sut)
+    include = ownPackages(sut, jar)
+    if include is None:
+        print("WARN: unknown packages of " + sut + ", counting all classes, including the ones of its libraries")
+    coverages = probeCoverages(files, include)
+    row = [sut, config, str(len(files)), "{:.4f}".format(statistics.mean(coverages)),
+           "{:.4f}".format(min(coverages)), "{:.4f}".format(max(coverages))]
+    if jar is None:
+        print("WARN: no jar for " + sut + " in " + CLASSES + ", reporting only probes")
+        return row + [""] * (3 * len(COUNTERS))
+    totals = report(jar, files, include)
+    for c in COUNTERS:
+        covered = totals.get(c + "_COVERED", 0)
+        missed = totals.get(c + "_MISSED", 0)
+        row += [str(covered), str(missed), ratio(covered, missed)]
+    return row
+
+
+def groupExecFiles():
+    # (sut, config) -> exec files
+    groups = {}
+    for name in sorted(os.listdir(EXEC_DIR)):
+        if not name.endswith(EXEC_POSTFIX):
+            continue
+        tokens = name[:-len(EXEC_POSTFIX)].split("__")
+        if len(tokens) != 3:
+            print("WARN: ignoring exec file with unexpected name: " + name)
+            continue
+        path = os.path.join(EXEC_DIR, name)
+        if os.path.getsize(path) == 0:
+            continue
+        groups.setdefault((tokens[0], tokens[1]), []).append(path)
+    return groups
+
+
+def main():
+    global FOLDER, CLASSES, JACOCO_CLI, NJOBS, OUTPUT, EXEC_DIR, CACHE_DIR
+
+    if len(sys.argv) < 2:
+        print("Usage:\ncoverage.py <FOLDER> named_param=? ... named_param=?")
+        exit(1)
+
+    # Location of experiment folder
+    FOLDER = os.path.abspath(sys.argv[1])
+
+    CLASSES = FOLDER
+    JACOCO_CLI = os.path.join(os.environ.get("JACOCO_LOCATION", ""), "jacococli.jar") \
+        if os.environ.get("JACOCO_LOCATION", "") != "" else os.path.join(FOLDER, "tools", "jacococli.jar")
+    OUTPUT = os.path.join(FOLDER, "coverage.csv")
+
+    kv = dict(x.split("=", 1) for x in sys.argv[2:])
+    for k in kv:
+        if k not in ["classes", "jacococli", "njobs", "output", "packages"]:
+            print("Unrecognized named parameter: " + k)
+            exit(1)
+
+    if "classes" in kv:
+        CLASSES = os.path.abspath(kv["classes"])
+    if "jacococli" in kv:
+        JACOCO_CLI = os.path.abspath(kv["jacococli"])
+    if "njobs" in kv:
+        NJOBS = int(kv["njobs"])
+    if "output" in kv:
+        OUTPUT = kv["output"]
+    if "packages" in kv:
+        for entry in kv["packages"].split(","):
+            if ":" not in entry:
+                print("Invalid package, expected <sut>:<package>: " + entry)
+                exit(1)
+            sut, package = entry.split(":", 1)
+            PACKAGES.setdefault(sut, []).append(package.replace(".", "/"))
+
+    if not os.path.exists(JACOCO_CLI):
+        print("ERROR: jacococli.jar not existing at location: " + JACOCO_CLI)
+        exit(1)
+
+    EXEC_DIR = os.path.join(FOLDER, "exec")
+    CACHE_DIR = os.path.join(FOLDER, "coverage_cache")
+
+    if not os.path.isdir(EXEC_DIR):
+        print("ERROR: no exec folder in " + FOLDER)
+        exit(1)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    groups = groupExecFiles()
+    print("Exec files: " + str(sum(len(f) for f in groups.values())) + ", groups: " + str(len(groups)), flush=True)
+
+    rows = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=NJOBS) as executor:
+        futures = {executor.submit(handleGroup, sut, config, files): (sut, config) for (sut, config), files in groups.items()}
+        for future in concurrent.futures.as_completed(futures):
+            sut, config = futures[future]
+            try:
+                rows.append(future.result())
+                print("Reported " + sut + " " + config, flush=True)
+            except Exception as e:
+                print("ERROR: failed to report " + sut + " " + config + ": " + str(e), flush=True)
+
+    rows.sort(key=lambda r: (r[0], r[1]))
+    with open(OUTPUT, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+
+    print("Coverage written to " + OUTPUT, flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -25,6 +25,10 @@
 #  for s in `ls *.sh`; do sbatch $s; done
 #
 #  For local experiments, better to use schedule.py
+#  To estimate how long running the scripts would take (eg, with how many in parallel), use simulate.py
+#  To check the set up with a few short runs before running all scripts, see canary
+#  To compute code coverage from the JaCoCo exec files of the runs (see jacoco), use coverage.py
+#  To benchmark the generation and the scheduling of the scripts without any JDK nor SUT, see fake
 #
 #  Currently, for 100k budget, use 300 minutes as timeout on cluster
 
@@ -70,9 +74,14 @@
 #       export LANG=en_US.UTF-8
 #       export LC_ALL=en_US.UTF-8
 
+import collections
+import csv
+import hashlib
 import io
+import json
 import os
 import pathlib
+import re
 import random
 import shutil
 import stat
@@ -93,7 +102,25 @@ LABEL_njobs = "njobs"
 LABEL_configfilter = "configfilter"
 LABEL_sutfilter = "sutfilter"
 LABEL_jacoco = "jacoco"
-LABELS = [LABEL_cluster,LABEL_seed,LABEL_timeout,LABEL_njobs,LABEL_configfilter,LABEL_sutfilter,LABEL_jacoco]
+LABEL_testsplit = "testsplit"
+LABEL_artifactcache = "artifactcache"
+LABEL_staging = "staging"
+LABEL_resultstore = "resultstore"
+LABEL_race = "race"
+LABEL_racekeep = "racekeep"
+LABEL_usage = "usage"
+LABEL_heapfrom = "heapfrom"
+LABEL_canary = "canary"
+LABEL_extend = "extend"
+LABEL_baseline = "baseline"
+LABEL_profile = "profile"
+LABEL_fake = "fake"
+LABEL_fakecpu = "fakecpu"
+LABEL_fakememory = "fakememory"
+LABEL_fakefail = "fakefail"
+LABELS = [LABEL_cluster,LABEL_seed,LABEL_timeout,LABEL_njobs,LABEL_configfilter,LABEL_sutfilter,LABEL_jacoco,LABEL_testsplit,
+          LABEL_artifactcache,LABEL_staging,LABEL_resultstore,LABEL_race,LABEL_racekeep,LABEL_usage,LABEL_heapfrom,
+          LABEL_canary,LABEL_extend,LABEL_baseline,LABEL_profile,LABEL_fake,LABEL_fakecpu,LABEL_fakememory,LABEL_fakefail]
 
 
 if len(sys.argv) < 5:
@@ -176,6 +203,137 @@ SUTFILTER = None
 # jar files of JaCoCo are located on local machine.
 JACOCO = False
 
+# How generated tests are split into several files (see --testSuiteSplitType), ie one of
+# NONE, FAULTS, STATUS_CODE or ENDPOINT.
+# By default, each run generates a single file. Splitting makes sense when the generated tests
+# are going to be run afterwards, eg, for Python tests, each file is a module with its own setUpClass,
+# so different modules can be run in parallel on different CI runners.
+TESTSPLIT = "NONE"
+TESTSPLIT_TYPES = ["NONE", "FAULTS", "STATUS_CODE", "ENDPOINT"]
+
+# Folder of the content-addressed cache of the JAR files needed by the experiments (ie, evomaster.jar, the agent,
+# and the runner and SUT jars of each SUT), where each file is saved based on the SHA-256 of its content.
+# Instead of a new copy in each experiment folder, those get a reflink (ie, a copy-on-write clone, if supported by
+# the file system) or a hardlink to the cached file, falling back to a copy only if neither is possible
+# (eg, when on a different file system). Cached files are read-only, so they cannot be modified through a link.
+# Use "none" to rather copy the files as done before.
+# On cluster, this is where file hashes are cached, whereas the jar files are rather copied only once on each node,
+# in the folder specified by the EM_NODE_CACHE env variable (default /tmp/evomaster-artifacts-$USER), and then
+# linked from $SCRATCH by each job, after checking their hash.
+ARTIFACT_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "evomaster-exp", "artifacts")
+
+# Optional node-local folder (eg, on a local disk or tmpfs) where each run writes its generated tests and
+# its statistics/snapshot/covered target files, instead of writing directly into the experiment folder.
+# When the run is completed, its outputs are moved into the experiment folder in a single batch: those are first
+# copied with a single recursive copy into a temporary folder in the experiment folder, and then each file is
+# renamed into its final location, ie, no partially written file is ever seen there.
+# This avoids thousands of small concurrent writes on shared/network file systems.
+# The value is used as it is in the Bash scripts, so it can refer to env variables, eg, staging='$TMPDIR'
+# (note the quotes, to avoid the variable being resolved when running this script).
+# None means no staging.
+STAGING = None
+
+# Optional folder where the results of completed runs (ie, their statistics, snapshot and covered target files)
+# are stored across different experiments, keyed by a hash of everything that determines a run: the content
+# of evomaster.jar and of the SUT jars, the EM parameters of the run (excluding ports and output paths),
+# the budget and the seed.
+# When a run is already in the store, its files are just copied into the reports folder, and no job is created for it.
+# Each completed job adds its results to the store.
+# Reused runs are still listed in runs.csv, marked as reused, but they have no generated tests nor logs.
+# This is applied only to JVM SUTs, as there is no single artifact to hash for the others.
+# Note: as no JaCoCo exec nor usage file is stored, this cannot be used together with jacoco nor usage.
+# None means no store.
+RESULT_STORE = None
+
+# Racing of the parameter settings, when tuning EM. Rather than running all seeds for all settings, experiments
+# are done in rounds, each one with its own folder and range of seeds. This is a comma-separated list
+# of the folders of the previous rounds, the last one being the latest round.
+# The settings still in the race (ie, the survivors) are the ones run in the latest round, as saved in its
+# RACE_SURVIVORS_FILE (or, if missing, all the settings with results in it, eg, for a first round run without racing).
+# The statistics files of all previous rounds are used to rank the survivors, based on the covered targets
+# (and then the potential faults) in each run for the same SUT and seed.
+# If a Friedman test shows that their ranks are significantly different, only the best survivors are kept for
+# the new round (ie, successive halving). Otherwise all of them are kept, so that a few noisy runs cannot eliminate
+# a setting. Survivors without any result are dropped.
+# None means all settings are run.
+RACE = None
+
+# Fraction of the survivors to keep in a new round, when racing
+RACE_KEEP = 0.5
+
+# Significance level of the Friedman test on the ranks of the survivors, when racing
+RACE_ALPHA = 0.05
+
+# File in the folder of each round with the settings run in it, ie, the survivors of the previous rounds
+RACE_SURVIVORS_FILE = "race_survivors.csv"
+
+# Whether to record the resources (CPU time, peak memory, disk I/O and GC time) used in each run, by both EM and
+# the driver/SUT, with usage.py. This is saved in a usage<identifier>.csv file next to each statistics file.
+# Note: this requires python3 on the machine running the scripts, and it works only on Linux
+USAGE = False
+
+# Comma-separated list of folders of previous experiments run with usage=true. The peak heap used by EM in
+# those runs (with same SUT and budget) is used to choose its -Xmx, instead of the default one, which is large
+# enough for all SUTs. This allows running more jobs in parallel on the same machine.
+# If EM runs out of memory anyway, the run is repeated with the default heap (on a cluster, only for the time
+# left of the timeout of the run).
+# The driver keeps its default heap, as an out of memory there would fail all the runs of its script.
+# None means default heaps for all SUTs.
+HEAP_FROM = None
+
+# Budget (same format as BUDGET, eg, 30s) of short canary runs, to check that the experiments are properly set up
+# before running all of them, eg, that all SUTs start, and that EM accepts all the parameter settings.
+# There is one canary run for each SUT and config (with the first of its settings), each one in its own script
+# in BASE_DIR/canary/scripts. Use the canary mode of schedule.py to run those first, and then all other scripts
+# only if no canary run failed.
+# Note: canary runs do not use JaCoCo, staging nor the result store.
+# None means no canary runs.
+CANARY = None
+
+# Whether to add runs to an already existing experiment folder, eg, with more seeds, configs or SUTs, instead of
+# creating a new one. Runs already in the folder (see runs.csv) are skipped, and scripts are generated only for
+# the new ones, using ports and IPs not used so far. Those scripts are saved in a new BASE_DIR/extend<K> folder,
+# together with their own runall.sh and manifest.csv (eg, to run them with schedule.py <N> BASE_DIR/extend<K>),
+# whereas their results are saved in the same folders as the other runs (eg, reports), so that they can be
+# analyzed together. Jar files already in the folder are kept as they are.
+EXTEND = False
+
+# Path of another evomaster.jar (eg, the previous release), to check for performance regressions of the one
+# in EVOMASTER_DIR. Each run is done with both builds, one after the other in the same script (on the same SUT
+# and seed, alternating which one goes first), where the runs of this baseline build have "_baseline" appended
+# to their config label (ie, labelForExperimentConfigs). This requires time as stopping criterion.
+# Use regression.py to compare the two builds once the runs are completed, eg, together with usage=true to
+# compare the resources they use as well.
+# None means no comparison.
+BASELINE = None
+
+# Which JVMs to profile, ie, one of "em" (EvoMaster), "driver" (the EM driver, with the embedded SUT if any) or "all".
+# These are run with Java Flight Recorder and GC logging, saving their files in BASE_DIR/profiles, bounded in size
+# (see PROFILE_JFR_MAX_MB and PROFILE_GC_LOG_MB). A summary of hot methods, allocations and GC pauses of each SUT
+# can then be computed with hotspots.py.
+# Note: JFR requires JDK 8u262 or later, and the SUT started by an external driver is not profiled.
+# None means no profiling.
+PROFILE = None
+PROFILE_TYPES = ["em", "driver", "all"]
+
+# Mean duration (in seconds, for a SUT with weight 1) of synthetic runs, to benchmark the generation and the
+# scheduling of the scripts (eg, with schedule.py) without any JDK, SUT nor EMB_DIR.
+# The scripts then call fake.py (copied into BASE_DIR) instead of EM and of the driver: the fake EM runs for a
+# duration sampled around this mean (based on the seed), and writes statistics, snapshot and covered target files
+# in the same format as EM, whereas the fake driver just waits to be killed.
+# Note: this works only locally, and not together with jacoco, resultstore, baseline nor profile.
+# None means real runs.
+FAKE = None
+
+# Fraction of a CPU that each fake EM keeps busy while running, in [0,1]
+FAKE_CPU = 0.1
+
+# How much memory (in MB) each fake EM and fake driver allocate
+FAKE_MEMORY = 50
+
+# Probability that a fake EM run fails (ie, with an [ERROR] in its log and no statistics file), eg, to check retries
+FAKE_FAIL = 0
+
 ### Derived named variables ###
 if len(sys.argv) > 5:
     # There might be better ways to build such map in Python...
@@ -206,6 +364,79 @@ if len(sys.argv) > 5:
     if LABEL_jacoco in kv:
         JACOCO = kv[LABEL_jacoco].lower() in ("yes", "true", "t")
 
+    if LABEL_testsplit in kv:
+        TESTSPLIT = kv[LABEL_testsplit].upper()
+        if TESTSPLIT not in TESTSPLIT_TYPES:
+            print("Invalid value for " + LABEL_testsplit + ": " + TESTSPLIT + ". Valid values: " + str(TESTSPLIT_TYPES))
+            exit(1)
+
+    if LABEL_staging in kv:
+        STAGING = kv[LABEL_staging]
+
+    if LABEL_resultstore in kv:
+        RESULT_STORE = os.path.abspath(kv[LABEL_resultstore])
+
+    if LABEL_race in kv:
+        RACE = [os.path.abspath(f) for f in kv[LABEL_race].split(",")]
+
+    if LABEL_racekeep in kv:
+        RACE_KEEP = float(kv[LABEL_racekeep])
+        if RACE_KEEP <= 0 or RACE_KEEP > 1:
+            print("ERROR: " + LABEL_racekeep + " must be in (0,1]. Wrong value: " + str(RACE_KEEP))
+            exit(1)
+
+    if LABEL_usage in kv:
+        USAGE = kv[LABEL_usage].lower() in ("yes", "true", "t")
+
+    if LABEL_heapfrom in kv:
+        HEAP_FROM = [os.path.abspath(f) for f in kv[LABEL_heapfrom].split(",")]
+
+    if LABEL_canary in kv:
+        CANARY = kv[LABEL_canary]
+
+    if LABEL_extend in kv:
+        EXTEND = kv[LABEL_extend].lower() in ("yes", "true", "t")
+
+    if LABEL_baseline in kv:
+        BASELINE = os.path.abspath(kv[LABEL_baseline])
+        if not os.path.exists(BASELINE):
+            print("ERROR: baseline jar not existing at location: " + BASELINE)
+            exit(1)
+        if not (("s" in BUDGET) or ("m" in BUDGET) or ("h" in BUDGET)):
+            print("ERROR: comparing with a " + LABEL_baseline + " build requires time as budget, not " + BUDGET)
+            exit(1)
+
+    if LABEL_profile in kv:
+        PROFILE = kv[LABEL_profile].lower()
+        if PROFILE not in PROFILE_TYPES:
+            print("Invalid value for " + LABEL_profile + ": " + PROFILE + ". Valid values: " + str(PROFILE_TYPES))
+            exit(1)
+
+    if LABEL_fake in kv:
+        FAKE = float(kv[LABEL_fake])
+
+    if LABEL_fakecpu in kv:
+        FAKE_CPU = float(kv[LABEL_fakecpu])
+        if FAKE_CPU < 0 or FAKE_CPU > 1:
+            print("ERROR: " + LABEL_fakecpu + " must be in [0,1]. Wrong value: " + str(FAKE_CPU))
+            exit(1)
+
+    if LABEL_fakememory in kv:
+        FAKE_MEMORY = int(kv[LABEL_fakememory])
+
+    if LABEL_fakefail in kv:
+        FAKE_FAIL = float(kv[LABEL_fakefail])
+        if FAKE_FAIL < 0 or FAKE_FAIL > 1:
+            print("ERROR: " + LABEL_fakefail + " must be in [0,1]. Wrong value: " + str(FAKE_FAIL))
+            exit(1)
+
+    if LABEL_artifactcache in kv:
+        ARTIFACT_CACHE = kv[LABEL_artifactcache]
+        if ARTIFACT_CACHE.lower() == "none":
+            ARTIFACT_CACHE = None
+        else:
+            ARTIFACT_CACHE = os.path.abspath(ARTIFACT_CACHE)
+
     for key in kv:
         if key not in LABELS:
             print("Undefined option: '" + key +"'. Available options: ")
@@ -224,15 +455,57 @@ print(LABEL_timeout + ": " + str(TIMEOUT_MINUTES))
 print(LABEL_configfilter + ": " + str(CONFIGFILTER))
 print(LABEL_sutfilter + ": " + str(SUTFILTER))
 print(LABEL_jacoco + ":" + str(JACOCO))
+print(LABEL_testsplit + ": " + str(TESTSPLIT))
+print(LABEL_artifactcache + ": " + str(ARTIFACT_CACHE))
+print(LABEL_staging + ": " + str(STAGING))
+print(LABEL_resultstore + ": " + str(RESULT_STORE))
+print(LABEL_race + ": " + str(RACE))
+print(LABEL_racekeep + ": " + str(RACE_KEEP))
+print(LABEL_usage + ": " + str(USAGE))
+print(LABEL_heapfrom + ": " + str(HEAP_FROM))
+print(LABEL_canary + ": " + str(CANARY))
+print(LABEL_extend + ": " + str(EXTEND))
+print(LABEL_baseline + ": " + str(BASELINE))
+print(LABEL_profile + ": " + str(PROFILE))
+print(LABEL_fake + ": " + str(FAKE))
+print(LABEL_fakecpu + ": " + str(FAKE_CPU))
+print(LABEL_fakememory + ": " + str(FAKE_MEMORY))
+print(LABEL_fakefail + ": " + str(FAKE_FAIL))
+
+if BASELINE is not None and RESULT_STORE is not None:
+    print("ERROR: cannot use " + LABEL_resultstore + " when comparing with a " + LABEL_baseline + " build")
+    exit(1)
+
+if RESULT_STORE is not None and (JACOCO or USAGE):
+    print("ERROR: cannot use " + LABEL_resultstore + " together with " + LABEL_jacoco + " nor " + LABEL_usage
+          + ", as their files are not stored")
+    exit(1)
+
+if FAKE is not None and (CLUSTER or JACOCO or RESULT_STORE is not None or BASELINE is not None or PROFILE is not None):
+    print("ERROR: synthetic runs (" + LABEL_fake + ") cannot be used together with " + ", ".join(
+        [LABEL_cluster, LABEL_jacoco, LABEL_resultstore, LABEL_baseline, LABEL_profile]))
+    exit(1)
 
 
 if not os.path.isdir(BASE_DIR):
+    if EXTEND:
+        print("ERROR: no folder to extend: " + BASE_DIR)
+        exit(1)
     print("creating folder: " + BASE_DIR)
     os.makedirs(BASE_DIR)
-else:
+elif not EXTEND:
     print("ERROR: target folder already exists")
     exit(1)
 
+# Folder where to save the scripts generated now, together with their runall.sh and manifest.csv
+CAMPAIGN_DIR = BASE_DIR
+if EXTEND:
+    k = 1
+    while os.path.exists(BASE_DIR + "/extend" + str(k)):
+        k += 1
+    CAMPAIGN_DIR = BASE_DIR + "/extend" + str(k)
+    print("creating folder: " + CAMPAIGN_DIR)
+
 
 JDK_8 = "JDK_8"
 JDK_11 = "JDK_11"
@@ -340,6 +613,17 @@ if CLUSTER:
     LOGS_DIR = HOME + "/nobackup"
 
 
+## Synthetic runs, see FAKE. No JDK, EM nor SUT is needed
+elif FAKE is not None:
+
+    EVOMASTER_DIR = ""
+    CASESTUDY_DIR = ""
+    LOGS_DIR = BASE_DIR
+    JAVA_HOME_8 = ""
+    JAVA_HOME_11 = ""
+    JAVA_HOME_17 = ""
+
+
 ## Local configurations
 else:
 
@@ -402,7 +686,93 @@ if JACOCO:
 
 # How to run EvoMaster
 EVOMASTER_JAVA_OPTIONS = " -Xms2G -Xmx8G  -jar evomaster.jar "
+
+# How to run the driver. Note: the Xmx settings of the SUTs will need to be specified directly
+# in the Java/Kotlin code of the External Driver, under getJVMParameters(), if the default is not enough.
+DRIVER_HEAP_OPTIONS = " -Xms1G -Xmx2G"
+
+
+### Heap sizing, based on previous experiments ###
+
+# how much more heap to give than the peak measured in previous runs
+HEAP_MARGIN = 1.5
+# bounds on the chosen heaps (in MB), where the max are the default ones
+EM_HEAP_MIN = 1024
+EM_HEAP_MAX = 8192
+# exit code of the JVM with -XX:+ExitOnOutOfMemoryError
+OOM_EXIT_CODE = 3
+
+
+def readPeakHeaps():
+    # SUT name -> max peak heap (in MB) of EM, in all previous runs with the same budget
+    peaks = {}
+    for folder in HEAP_FROM:
+        reports = os.path.join(folder, "reports")
+        if not os.path.isdir(reports):
+            print("ERROR: no reports folder in " + folder)
+            exit(1)
+        for name in os.listdir(reports):
+            if not (name.startswith("usage") and name.endswith(".csv")):
+                continue
+            with open(os.path.join(reports, name), newline="") as f:
+                for row in csv.DictReader(f):
+                    if row.get("budget") != BUDGET:
+                        continue
+                    if row["emPeakHeapMB"] != "":
+                        peaks[row["id"]] = max(peaks.get(row["id"], 0), float(row["emPeakHeapMB"]))
+    return peaks
+
+
+PEAK_HEAPS = {}
+if HEAP_FROM is not None:
+    PEAK_HEAPS = readPeakHeaps()
+
+
+def sizedHeap(peak, low, high):
+    if peak is None:
+        return None
+    return min(high, max(low, int(math.ceil(peak * HEAP_MARGIN))))
+
+
+# Java options to run EM for the given SUT, or None if no measured heap to size it
+def sizedEvoMasterJavaOptions(sut):
+    heap = sizedHeap(PEAK_HEAPS.get(sut.name), EM_HEAP_MIN, EM_HEAP_MAX)
+    if heap is None or heap == EM_HEAP_MAX:
+        return None
+    return " -Xms" + str(min(heap, 2048)) + "m -Xmx" + str(heap) + "m -XX:+ExitOnOutOfMemoryError  -jar evomaster.jar "
+
+
+### Profiling ###
+
+# Max size of each JFR recording, where the oldest data is discarded once reached
+PROFILE_JFR_MAX_MB = 100
+# GC logs are rotated among this number of files, each with this max size
+PROFILE_GC_LOG_FILES = 5
+PROFILE_GC_LOG_MB = 10
+
+
+# JVM options to profile a process, saving its files with the given name, eg, em__<sut>__<run>
+def profileOptions(sut, process, name):
+    if PROFILE is None or PROFILE not in [process, "all"]:
+        return ""
+    jfr = PROFILE_DIR + "/" + name + ".jfr"
+    gc = PROFILE_DIR + "/gc__" + name + ".log"
+    options = " -XX:StartFlightRecording=filename=" + jfr + ",maxsize=" + str(PROFILE_JFR_MAX_MB) + "m,settings=profile,dumponexit=true"
+    if sut.platform == JDK_8:
+        # no unified logging in JDK 8
+        options += " -XX:+PrintGCDetails -XX:+PrintGCDateStamps -Xloggc:" + gc + " -XX:+UseGCLogFileRotation" \
+                   + " -XX:NumberOfGCLogFiles=" + str(PROFILE_GC_LOG_FILES) + " -XX:GCLogFileSize=" + str(PROFILE_GC_LOG_MB) + "M"
+    else:
+        options += " -Xlog:gc*:file=" + gc + ":uptime,level,tags:filecount=" + str(PROFILE_GC_LOG_FILES) \
+                   + ",filesize=" + str(PROFILE_GC_LOG_MB) + "m"
+    return options + " "
+
+
 AGENT = "evomaster-agent.jar"
+# name of the baseline evomaster.jar in the experiment folder, see BASELINE
+BASELINE_JAR = "evomaster-baseline.jar"
+# appended to the config name of the runs of the baseline build
+BASELINE_SUFFIX = "_baseline"
 EM_POSTFIX = "-evomaster-runner.jar"
 EM_POSTFIX_DOTNET = "-evomaster-runner.dll"
 SUT_POSTFIX = "-sut.jar"
@@ -413,19 +783,24 @@ if NJOBS < len(SUTS):
 
 # Where to put stuff (default in subdirs of BASEDIR)
 REPORT_DIR = BASE_DIR + "/reports"
-os.makedirs(REPORT_DIR)
+os.makedirs(REPORT_DIR, exist_ok=EXTEND)
 
-SCRIPT_DIR = BASE_DIR + "/scripts"
+SCRIPT_DIR = CAMPAIGN_DIR + "/scripts"
 os.makedirs(SCRIPT_DIR)
 
 TEST_DIR = BASE_DIR + "/tests"
-os.makedirs(TEST_DIR)
+os.makedirs(TEST_DIR, exist_ok=EXTEND)
 
 ALL_LOGS = LOGS_DIR + "/logs"
 #We might end up generating gigas of log files. So, at each new experiments, we delete previous logs
-shutil.rmtree(ALL_LOGS, ignore_errors=True)
+if not EXTEND:
+    shutil.rmtree(ALL_LOGS, ignore_errors=True)
 LOG_DIR = ALL_LOGS + "/" + EXP_ID
-os.makedirs(LOG_DIR)
+os.makedirs(LOG_DIR, exist_ok=EXTEND)
+
+PROFILE_DIR = BASE_DIR + "/profiles"
+if PROFILE is not None:
+    os.makedirs(PROFILE_DIR, exist_ok=EXTEND)
 
 CONTROLLER_PID = "CONTROLLER_PID"
 
@@ -436,36 +811,257 @@ CPUS = 3
 TIMEOUT_SUT_START_MINUTES = 20
 
 
+### Content-addressed cache of the JAR files ###
+
+# Name of the file in ARTIFACT_CACHE with the hashes of all files seen so far, to avoid re-reading
+# large files when they have not changed since the last time
+HASH_INDEX = "index.json"
+
+
+def loadHashIndex():
+    if ARTIFACT_CACHE is None:
+        return {}
+    path = os.path.join(ARTIFACT_CACHE, HASH_INDEX)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except ValueError:
+        # a corrupted index just means hashes need to be computed again
+        return {}
+
+
+def saveHashIndex(index):
+    if ARTIFACT_CACHE is None:
+        return
+    path = os.path.join(ARTIFACT_CACHE, HASH_INDEX)
+    tmp = path + "." + str(os.getpid())
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, path)
+
+
+def contentHash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def fileHash(path, index):
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    entry = index.get(path)
+    if entry is not None and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime_ns:
+        return entry["sha256"]
+
+    sha = contentHash(path)
+    index[path] = {"size": st.st_size, "mtime": st.st_mtime_ns, "sha256": sha}
+    return sha
+
+
+def reflink(src, dst):
+    # FICLONE ioctl, supported by file systems like Btrfs and XFS. Not available on Windows/Mac
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    FICLONE = 0x40049409
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+def placeArtifact(src, destDir, index, name=None):
+    dst = os.path.join(destDir, os.path.basename(src) if name is None else name)
+
+    if EXTEND and os.path.exists(dst):
+        # runs added to the folder must use the same files as the ones already there
+        return
+
+    if ARTIFACT_CACHE is None:
+        shutil.copy(src, dst)
+        return
+
+    sha = fileHash(src, index)
+    cached = os.path.join(ARTIFACT_CACHE, sha)
+    if os.path.exists(cached) and os.stat(cached).st_mode & 0o222 != 0 and contentHash(cached) != sha:
+        # cached before it was made read-only, and then written through one of its links
+        print("WARN: replacing modified file in cache: " + cached)
+        os.remove(cached)
+    if not os.path.exists(cached):
+        # copy and rename, so a cached file is never seen half-written
+        tmp = cached + "." + str(os.getpid())
+        shutil.copy(src, tmp)
+        os.replace(tmp, cached)
+    # the links in the experiment folders share the content of the cached file
+    os.chmod(cached, 0o444)
+
+    if reflink(cached, dst):
+        return
+    try:
+        os.link(cached, dst)
+    except OSError:
+        shutil.copy(cached, dst)
+
+
+def artifactHashes():
+    # hashes of all JAR files needed in the cluster jobs, computed once here when creating the scripts
+    index = loadHashIndex()
+    paths = [os.path.join(EVOMASTER_DIR, "evomaster.jar")]
+    if any(isJava(sut) for sut in SUTS):
+        paths.append(os.path.join(CASESTUDY_DIR, AGENT))
+    for sut in SUTS:
+        if isJava(sut):
+            paths.append(os.path.join(CASESTUDY_DIR, sut.name + EM_POSTFIX))
+            paths.append(os.path.join(CASESTUDY_DIR, sut.name + SUT_POSTFIX))
+    if BASELINE is not None:
+        paths.append(BASELINE)
+    hashes = {p: fileHash(p, index) for p in paths}
+    saveHashIndex(index)
+    return hashes
+
+
+# Bash function to copy a file into the cache of the node, unless some other job already did it,
+# and then link it in the current folder. The content of the cached file is checked against its hash, so a file
+# that is partial (eg, the node crashed while copying it) or modified is copied again. If the copy has a different
+# hash (ie, the file was changed after the scripts were generated), it is not used, and nothing is linked.
+# Parameters: path of the file, its hash, name of the link
+NODE_CACHE_FUNCTION = """cacheOnNode() {
+    ( flock -x 9
+      [ -f "$NODE_CACHE/$2" ] && [ "$(sha256sum < "$NODE_CACHE/$2" | cut -d ' ' -f 1)" = "$2" ] && exit 0
+      cp "$1" "$NODE_CACHE/$2.$$" && [ "$(sha256sum < "$NODE_CACHE/$2.$$" | cut -d ' ' -f 1)" = "$2" ] \\
+        && chmod 444 "$NODE_CACHE/$2.$$" && mv -f "$NODE_CACHE/$2.$$" "$NODE_CACHE/$2" \\
+        || { rm -f "$NODE_CACHE/$2.$$"; echo "ERROR: $1 does not have the expected hash $2"; exit 1; }
+    ) 9>"$NODE_CACHE/$2.lock" || return 1
+    ln -sf "$NODE_CACHE/$2" "$3"
+}
+"""
+
+
+### Node-local staging of the outputs of the runs ###
+
+# Bash function to move all the outputs of a run from its staging folder into the experiment folder.
+# Parameters: staging folder of the run, unique name of the run
+PUBLISH_RUN_FUNCTION = """publishRun() {
+    local tmp="__BASE_DIR__/.staging/$2"
+    mkdir -p "$tmp" && cp -r "$1"/. "$tmp"/ || { echo "ERROR: failed to copy outputs of $2 from $1"; return 1; }
+    rm -rf "$1"
+    ( cd "$tmp" && find . -type d -exec mkdir -p "__BASE_DIR__/{}" \\; && find . -type f -exec mv -f {} "__BASE_DIR__/{}" \\; )
+    rm -rf "$tmp"
+}
+"""
+
+
+def nodeLocalArtifact(src, name=None):
+    return "cacheOnNode " + src + " " + ARTIFACT_HASHES[src] + " " + (os.path.basename(src) if name is None else name) + " \n"
+
+
+if ARTIFACT_CACHE is not None:
+    os.makedirs(ARTIFACT_CACHE, exist_ok=True)
+
+ARTIFACT_HASHES = {}
+if (CLUSTER and ARTIFACT_CACHE is not None) or RESULT_STORE is not None:
+    ARTIFACT_HASHES = artifactHashes()
+
+
+### Cross-experiment store of run results ###
+
+# Bash function to save the results of a completed run into the store, unless already there.
+# Parameters: folder of the run in the store, followed by the files to save
+STORE_RESULT_FUNCTION = """storeResult() {
+    local dir="$1"
+    shift
+    [ -d "$dir" ] && return 0
+    for f in "$@"; do
+        [ -f "$f" ] || { echo "Not storing results in $dir, as missing $f"; return 0; }
+    done
+    local tmp="$dir.$$"
+    mkdir -p "$tmp" && cp "$@" "$tmp"/ && mv "$tmp" "$dir" || rm -rf "$tmp"
+}
+"""
+
+
+def resultKey(sut, runParams):
+    # only the parameters defining the run, sorted, as their order has no impact
+    key = {
+        "evomaster": ARTIFACT_HASHES[os.path.join(EVOMASTER_DIR, "evomaster.jar")],
+        "agent": ARTIFACT_HASHES[os.path.join(CASESTUDY_DIR, AGENT)],
+        "runner": ARTIFACT_HASHES[os.path.join(CASESTUDY_DIR, sut.name + EM_POSTFIX)],
+        "sut": ARTIFACT_HASHES[os.path.join(CASESTUDY_DIR, sut.name + SUT_POSTFIX)],
+        "platform": sut.platform,
+        "params": sorted(p for p in runParams.split(" --") if p.strip() != ""),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def resultFiles(identifier):
+    return ["statistics" + identifier + ".csv", "snapshot" + identifier + ".csv", "covered_target_file" + identifier + ".txt"]
+
+
+def reuseStoredResult(sut, seed, setting, configName):
+    if RESULT_STORE is None or not isJava(sut):
+        return False
+    label, identifier, runParams = getRunParams(sut, seed, setting, configName)
+    stored = os.path.join(RESULT_STORE, resultKey(sut, runParams))
+    if not os.path.isdir(stored):
+        return False
+    for f in resultFiles(identifier):
+        shutil.copy(os.path.join(stored, f), os.path.join(REPORT_DIR, f))
+    return True
+
+
 if not CLUSTER:
     REPORT_DIR = str(pathlib.PurePath(REPORT_DIR).as_posix())
+    PROFILE_DIR = str(pathlib.PurePath(PROFILE_DIR).as_posix())
     SCRIPT_DIR = str(pathlib.PurePath(SCRIPT_DIR).as_posix())
     TEST_DIR = str(pathlib.PurePath(TEST_DIR).as_posix())
     LOG_DIR = str(pathlib.PurePath(LOG_DIR).as_posix())
 
-    #Due to Windows limitations (ie crappy FS), we need to copy JARs over
-    for sut in SUTS:
+    #Due to Windows limitations (ie crappy FS), we need to copy JARs over (or link them from the cache)
+    hashIndex = loadHashIndex() if ARTIFACT_CACHE is not None else {}
+    for sut in ([] if FAKE is not None else SUTS):
         if isJava(sut):
             # copy jar files
-            shutil.copy(os.path.join(CASESTUDY_DIR, sut.name + EM_POSTFIX), BASE_DIR)
-            shutil.copy(os.path.join(CASESTUDY_DIR, sut.name + SUT_POSTFIX), BASE_DIR)
+            placeArtifact(os.path.join(CASESTUDY_DIR, sut.name + EM_POSTFIX), BASE_DIR, hashIndex)
+            placeArtifact(os.path.join(CASESTUDY_DIR, sut.name + SUT_POSTFIX), BASE_DIR, hashIndex)
         elif sut.platform == JS or sut.platform == DOTNET_3:
             # copy folders, which include both SUT and EM Controller
             # Note: if this fails when running on Windows, you need to increase the max path for
             # files (default is 260 characters) by enabling "Enable Win32 long paths".
             # See https://helpdeskgeek.com/how-to/how-to-fix-filename-is-too-long-issue-in-windows/
-            shutil.copytree(os.path.join(CASESTUDY_DIR, sut.name), os.path.join(BASE_DIR, sut.name))
+            if not (EXTEND and os.path.exists(os.path.join(BASE_DIR, sut.name))):
+                shutil.copytree(os.path.join(CASESTUDY_DIR, sut.name), os.path.join(BASE_DIR, sut.name))
         else:
             raise Exception("Unexpected platform" + sut.platform)
 
-    shutil.copy(os.path.join(CASESTUDY_DIR, AGENT), BASE_DIR)
-    shutil.copy(os.path.join(EVOMASTER_DIR, "evomaster.jar"), BASE_DIR)
+    if FAKE is None:
+        placeArtifact(os.path.join(CASESTUDY_DIR, AGENT), BASE_DIR, hashIndex)
+        placeArtifact(os.path.join(EVOMASTER_DIR, "evomaster.jar"), BASE_DIR, hashIndex)
+    if BASELINE is not None:
+        placeArtifact(BASELINE, BASE_DIR, hashIndex, BASELINE_JAR)
+    if ARTIFACT_CACHE is not None:
+        saveHashIndex(hashIndex)
+
+if USAGE:
+    shutil.copy(os.path.join(os.path.dirname(os.path.abspath(__file__)), "usage.py"), BASE_DIR)
+
+if FAKE is not None:
+    shutil.copy(os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake.py"), BASE_DIR)
 
 
 
 # We could end up with many scripts, up to the max number of jobs we can run in parallel, eg. 400.
 # But those scripts still need to be submitted. So, we create a script to do that.
 def createRunallScript():
-    script_path = BASE_DIR + "/runall.sh"
+    script_path = CAMPAIGN_DIR + "/runall.sh"
     script = open(script_path, "w")
 
     script.write("#!/bin/bash \n\n")
@@ -487,8 +1083,8 @@ def createRunallScript():
 
 def writeScript(code, port, sut):
     script_path = SCRIPT_DIR + "/evomaster_" + str(port) + "_" + sut.name + ".sh"
-    script = open(script_path, "w")
-    script.write(code)
+    with open(script_path, "w") as script:
+        script.write(code)
 
     st = os.stat(script_path)
     os.chmod(script_path, st.st_mode | stat.S_IEXEC)
@@ -514,6 +1110,10 @@ def createJobHead(port, sut, timeoutMinutes):
 
     script.write(getScriptHead(timeoutMinutes))
 
+    if EXTEND and not CLUSTER:
+        # scripts are in an extend<K> folder, but they use the files in the experiment folder
+        script.write("cd \"" + str(pathlib.PurePath(BASE_DIR).as_posix()) + "\" \n")
+
     sut_log = LOG_DIR + "/log_sut_" + sut.name + "_" + str(port) + ".txt"
 
     # Start SUT as background process on the given port
@@ -530,31 +1130,51 @@ def createJobHead(port, sut, timeoutMinutes):
 
         # To speed-up I/O, copy files over to SCRATCH folder
         script.write("cd $SCRATCH \n")
-        script.write("cp " + EVOMASTER_DIR + "/evomaster.jar . \n")
 
+        paths = [os.path.join(EVOMASTER_DIR, "evomaster.jar")]
         # Not sure if great idea to copy 1000s of files for JS intro SCRATCH
         if isJava(sut):
-            sut_em_path = os.path.join(CASESTUDY_DIR, sut.name + EM_POSTFIX)
-            sut_jar_path = os.path.join(CASESTUDY_DIR, sut.name + SUT_POSTFIX)
-            agent_path = os.path.join(CASESTUDY_DIR, AGENT)
-            script.write("cp " + sut_em_path + " . \n")
-            script.write("cp " + sut_jar_path + " . \n")
-            script.write("cp " + agent_path + " . \n")
+            paths.append(os.path.join(CASESTUDY_DIR, sut.name + EM_POSTFIX))
+            paths.append(os.path.join(CASESTUDY_DIR, sut.name + SUT_POSTFIX))
+            paths.append(os.path.join(CASESTUDY_DIR, AGENT))
+
+        if ARTIFACT_CACHE is None:
+            for path in paths:
+                script.write("cp " + path + " . \n")
+            if BASELINE is not None:
+                script.write("cp " + BASELINE + " " + BASELINE_JAR + " \n")
+        else:
+            # jobs running on same node share a single copy of each file
+            script.write("NODE_CACHE=${EM_NODE_CACHE:-/tmp/evomaster-artifacts-$USER} \n")
+            script.write("mkdir -p $NODE_CACHE \n")
+            script.write(NODE_CACHE_FUNCTION)
+            for path in paths:
+                script.write(nodeLocalArtifact(path))
+            if BASELINE is not None:
+                script.write(nodeLocalArtifact(BASELINE, BASELINE_JAR))
 
         script.write("\n")
 
     script.write("\n")
 
+    if STAGING is not None:
+        script.write(PUBLISH_RUN_FUNCTION.replace("__BASE_DIR__", BASE_DIR) + "\n")
+    if RESULT_STORE is not None:
+        script.write(STORE_RESULT_FUNCTION + "\n")
+
     timeoutStart = TIMEOUT_SUT_START_MINUTES * 60
 
     command = ""
 
-    if isJava(sut):
+    if FAKE is not None:
+        command = "python3 \"" + BASE_DIR + "/fake.py\" driver " + str(FAKE_MEMORY) + " > " + sut_log + " 2>&1 &"
+
+    elif isJava(sut):
         params = " " + controllerPort + " " + sutPort + " " + sut.name + SUT_POSTFIX + " " + str(timeoutStart) + " " + getJavaCommand(sut)
 
-        # Note: this is for the process of the Driver. The Xmx settings of the SUTs will need to be specified directly
-        #       in the Java/Kotlin code of the External Driver, under getJVMParameters(), if the default is not enough.
-        jvm = " -Xms1G -Xmx2G -Dem.muteSUT=true -Devomaster.instrumentation.jar.path="+AGENT
+        # Note: this is for the process of the Driver, see DRIVER_HEAP_OPTIONS
+        jvm = DRIVER_HEAP_OPTIONS + " -Dem.muteSUT=true -Devomaster.instrumentation.jar.path="+AGENT
+        jvm += profileOptions(sut, "driver", "driver__" + sut.name + "__" + str(port))
         JAVA = getJavaCommand(sut)
         command = JAVA + jvm + " -jar " + sut.name + EM_POSTFIX + " " + params + " > " + sut_log + " 2>&1 &"
 
@@ -582,10 +1202,11 @@ def createJobHead(port, sut, timeoutMinutes):
     # directly and not NPM
     script.write(CONTROLLER_PID + "=$! \n\n")  # store pid of process, so can kill it
 
-    if sut.platform == JS:
+    if sut.platform == JS and FAKE is None:
         script.write("popd\n\n")
 
-    script.write("sleep 20 \n\n")  # wait a bit to be sure the SUT handler can respond
+    # wait a bit to be sure the SUT handler can respond
+    script.write(("sleep 1" if FAKE is not None else "sleep 20") + " \n\n")
 
     return script.getvalue()
 
@@ -654,16 +1275,74 @@ class State:
         return self.jobsLeft > self.sutsLeft
 
 
-def writeWithHeadAndFooter(code, port, sut, timeout):
+def writeWithHeadAndFooter(code, port, sut, timeout, weight):
     head = createJobHead(port, sut, timeout)
     footer = closeJob(port, sut)
     code = head + code + footer
-    writeScript(code, port, sut)
+    script = writeScript(code, port, sut)
+    MANIFEST.append([os.path.basename(script.name), sut.name, int(round(weight / sut.timeWeight)), weight, timeout])
+
+
+# Each generated script, with its SUT, number of runs, their total weight and timeout.
+# This is saved in BASE_DIR/manifest.csv, eg, to estimate how long the experiments would take with simulate.py
+MANIFEST = []
+
+
+def budgetMinutes():
+    # expected duration of a single run with weight 1, when time is used as stopping criterion
+    if ("s" in BUDGET) or ("m" in BUDGET) or ("h" in BUDGET):
+        units = {"h": 60, "m": 1, "s": 1 / 60}
+        return sum(int(n) * units[u] for n, u in re.findall("([0-9]+)([hms])", BUDGET))
+    if TIMEOUT_MINUTES > 0:
+        return TIMEOUT_MINUTES
+    return None
+
 
+def writeManifest():
+    with open(os.path.join(CAMPAIGN_DIR, "manifest.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["script", "sut", "runs", "weight", "timeoutMinutes", "runMinutes", "cpus"])
+        for row in MANIFEST:
+            writer.writerow(row + [budgetMinutes(), CPUS])
+
+
+
+# All runs in the experiment folder, with their SUT, seed, config, label, port and external service IP, and whether
+# their results were reused from the result store (in which case there is no job for them, so no port nor IP).
+# This is saved in BASE_DIR/runs.csv, to know which runs are already there when extending the folder
+RUNS_FILE = BASE_DIR + "/runs.csv"
+RUNS_COLUMNS = ["sut", "seed", "config", "label", "port", "ip", "reused"]
+RUNS = []
+
+
+def readRuns():
+    if not os.path.exists(RUNS_FILE):
+        print("ERROR: cannot extend " + BASE_DIR + ", as it has no runs.csv")
+        exit(1)
+    with open(RUNS_FILE, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def writeRuns():
+    exists = os.path.exists(RUNS_FILE)
+    with open(RUNS_FILE, "a", newline="") as f:
+        writer = csv.writer(f)
+        if not exists:
+            writer.writerow(RUNS_COLUMNS)
+        writer.writerows(RUNS)
+
+
+def addRun(state, sut, seed, setting, configName):
+    RUNS.append([sut.name, seed, configName, settingLabel(setting), state.port, last_generated_ip, "false"])
+
+
+def addReusedRun(sut, seed, setting, configName):
+    RUNS.append([sut.name, seed, configName, settingLabel(setting), "", "", "true"])
 
 
 def createOneJob(state, sut, seed, setting, configName):
     code = addJobBody(state.port, sut, seed, setting, configName)
+    addRun(state, sut, seed, setting, configName)
     state.updateBudget(sut.timeWeight)
     state.jobsLeft -= 1
     state.opened = True
@@ -738,32 +1417,44 @@ def generate_ip():
     last_generated_ip = ip
     return ip
 
-def addJobBody(port, sut, seed, setting, configName):
-    script = io.StringIO()
+# label used for the given setting in the statistics files (ie, labelForExperiments)
+def settingLabel(setting):
+    ### default, no parameter configuration
+    if len(setting) == 0:
+        return "default"
+    label = ""
+    for ps in setting:
+        ### set label based on each value of the parameter
+        if is_float(str(ps[1])) and float(ps[1]) <= 1.0:
+            label += "_" + str(int(float(ps[1]) * 100))
+        else:
+            label += "_" + str(ps[1])
+    return label
+
+
+# whether the run is done with the baseline build, see BASELINE
+def isBaseline(configName):
+    return BASELINE is not None and configName.endswith(BASELINE_SUFFIX)
 
-    em_log = LOG_DIR + "/log_em_" + sut.name + "_" + str(port) + ".txt"
 
+# label, identifier and EM parameters defining a run, ie, excluding how and where it is run (eg, ports and output files)
+def getRunParams(sut, seed, setting, configName):
     params = ""
-    label = ""
+    label = settingLabel(setting)
 
-    ### default, no parameter configuration
-    if len(setting) == 0:
-        label = "default"
-    else :
-        ### set parameter based on the setting
-        for ps in setting:
-            params += " --" + str(ps[0]) + "=" + str(ps[1])
-            ### set label based on each value of the parameter
-            if is_float(str(ps[1])) and float(ps[1]) <= 1.0:
-                label += "_" + str(int(float(ps[1]) * 100))
-            else:
-                label += "_" + str(ps[1])
+    ### set parameter based on the setting
+    for ps in setting:
+        params += " --" + str(ps[0]) + "=" + str(ps[1])
 
-    params += " --testSuiteFileName=EM_" + sut.name.replace("-","_") + label + "_" + str(seed) + "_Test"
+    params += " --testSuiteFileName=EM_" + sut.name.replace("-","_") + label + "_" + str(seed) \
+              + (BASELINE_SUFFIX if isBaseline(configName) else "") + "_Test"
     params += " --labelForExperiments=" + label
     params += " --labelForExperimentConfigs=" + configName
 
     identifier = "_" + sut.name  + "_" + label + "_" + str(seed)
+    if isBaseline(configName):
+        # both builds are run with same SUT, seed and setting
+        identifier += BASELINE_SUFFIX
 
     ### standard
     if ("s" in BUDGET) or ("m" in BUDGET) or ("h" in BUDGET):
@@ -775,49 +1466,260 @@ def addJobBody(port, sut, seed, setting, configName):
 
     params += " --statisticsColumnId=" + sut.name
     params += " --seed=" + str(seed)
-    params += " --sutControllerPort=" + str(port)
-    params += " --outputFolder=" + TEST_DIR + "/" + sut.name
-    params += " --statisticsFile=" + REPORT_DIR + "/statistics" + identifier + ".csv"
     params += " --snapshotInterval=5"
-    params += " --snapshotStatisticsFile=" + REPORT_DIR + "/snapshot" + identifier + ".csv"
     params += " --appendToStatisticsFile=true"
     params += " --writeStatistics=true"
     params += " --showProgress=false"
-    params += " --testSuiteSplitType=NONE"
+    params += " --testSuiteSplitType=" + TESTSPLIT
     params += " --exportCoveredTarget=true"
-    params += " --coveredTargetFile="+REPORT_DIR+"/covered_target_file" + identifier + ".txt"
-    params += " --externalServiceIP=" + generate_ip()
     params += " --probOfHarvestingResponsesFromActualExternalServices=0"  # this adds way too much noise to results
     params += " --createConfigPathIfMissing=false"
-    params += " --javaCommand=\""+str(pathlib.PurePath(getJavaExe(sut)).as_posix())+"\""
+
+    if JACOCO:
+        params += " --enableBasicAssertions=false" # TODO remove once dealt with flakiness
+
+    return label, identifier, params
+
+
+def addJobBody(port, sut, seed, setting, configName):
+    script = io.StringIO()
+
+    em_log = LOG_DIR + "/log_em_" + sut.name + "_" + str(port) + ".txt"
+
+    label, identifier, runParams = getRunParams(sut, seed, setting, configName)
+
+    params = runParams
+    params += " --sutControllerPort=" + str(port)
+    testDir = TEST_DIR
+    reportDir = REPORT_DIR
+    if STAGING is not None:
+        # same structure as in BASE_DIR, so that outputs can be then moved there as they are
+        runName = "run" + identifier + "_" + str(port)
+        stage = STAGING + "/" + os.path.basename(BASE_DIR) + "/" + runName
+        testDir = stage + "/tests"
+        reportDir = stage + "/reports"
+        script.write("mkdir -p \"" + testDir + "/" + sut.name + "\" \"" + reportDir + "\"\n")
+
+    params += " --outputFolder=" + testDir + "/" + sut.name
+    params += " --statisticsFile=" + reportDir + "/statistics" + identifier + ".csv"
+    params += " --snapshotStatisticsFile=" + reportDir + "/snapshot" + identifier + ".csv"
+    params += " --coveredTargetFile="+reportDir+"/covered_target_file" + identifier + ".txt"
+    params += " --externalServiceIP=" + generate_ip()
+    if FAKE is None:
+        params += " --javaCommand=\""+str(pathlib.PurePath(getJavaExe(sut)).as_posix())+"\""
 
 
     if JACOCO:
         params += " --jaCoCoAgentLocation="+str(pathlib.PurePath(os.path.abspath(JACOCO_AGENT)).as_posix())
         params += " --jaCoCoCliLocation="+str(pathlib.PurePath(os.path.abspath(JACOCO_CLI)).as_posix())
         params += " --jaCoCoOutputFile="+str(pathlib.PurePath(os.path.abspath("./exec/"+sut.name+"__wb"+configName+"__"+str(port)+"__jacoco.exec")).as_posix())
-        params += " --enableBasicAssertions=false" # TODO remove once dealt with flakiness
 
 
-    JAVA = getJavaCommand(sut)
-    command = JAVA + EVOMASTER_JAVA_OPTIONS + params + " >> " + em_log + " 2>&1"
+    if FAKE is not None:
+        # EM parameters are given as they are, so that the fake EM writes them in its statistics file
+        JAVA = "python3 \"" + BASE_DIR + "/fake.py\" em " + str(FAKE * sut.timeWeight) + " " + str(FAKE_CPU) + " " \
+               + str(FAKE_MEMORY) + " " + str(FAKE_FAIL) + " -- "
+    else:
+        JAVA = getJavaCommand(sut) + profileOptions(sut, "em", "em__" + sut.name + "__" + configName + "_" + label + "_" + str(seed))
+    if USAGE:
+        # resources used by EM, and by the driver/SUT while EM is running
+        usageFile = reportDir + "/usage" + identifier + ".csv"
+        JAVA = "python3 \"" + BASE_DIR + "/usage.py\" \"" + usageFile + "\" " + sut.name + " " + str(seed) \
+               + " " + label + " " + configName + " " + BUDGET + " $" + CONTROLLER_PID + " -- " + JAVA
+    sized = None if FAKE is not None else sizedEvoMasterJavaOptions(sut)
+    options = EVOMASTER_JAVA_OPTIONS if sized is None else sized
+    if FAKE is not None:
+        options = " "
+    if isBaseline(configName):
+        options = options.replace("-jar evomaster.jar", "-jar " + BASELINE_JAR)
+        sized = None if sized is None else options
+    command = JAVA + options + params + " >> " + em_log + " 2>&1"
 
     if not CLUSTER:
         script.write("\n\necho \"Starting EvoMaster with: " + command + "\"\n")
         script.write("echo\n\n")
 
+    onTimeout = ""
     if CLUSTER:
         timeout = int(math.ceil(1.1 * sut.timeWeight * TIMEOUT_MINUTES * 60))
         errorMsg = "ERROR: timeout for " + sut.name
-        command = "timeout " +str(timeout) + "  " + command \
-                  + " || ([ $? -eq 124 ] && echo " + errorMsg + " >> " + em_log + " 2>&1" + ")"
+        command = "timeout " +str(timeout) + "  " + command
+        onTimeout = " || ([ $? -eq 124 ] && echo " + errorMsg + " >> " + em_log + " 2>&1" + ")"
+
+    if sized is None:
+        script.write(command + onTimeout + " \n\n")
+    else:
+        # heap might had been not enough, eg, due to randomness of the search. If so, repeat with default heap
+        fallback = command.replace(sized, EVOMASTER_JAVA_OPTIONS.replace("-jar evomaster.jar", "-jar " + BASELINE_JAR)
+                                   if isBaseline(configName) else EVOMASTER_JAVA_OPTIONS, 1)
+        if CLUSTER:
+            # the walltime of the job only accounts for one run, so the repetition gets the time left of it
+            script.write("EM_START=$SECONDS \n")
+        script.write(command + " \n")
+        script.write("EM_EXIT=$? \n")
+        if CLUSTER:
+            script.write("[ $EM_EXIT -eq 124 ] && echo " + errorMsg + " >> " + em_log + " 2>&1 \n")
+        script.write("if [ $EM_EXIT -eq " + str(OOM_EXIT_CODE) + " ]; then \n")
+        script.write("    echo \"Out of memory with" + re.sub("-jar \\S+", "", sized).rstrip()
+                     + ", repeating with default heap\" >> " + em_log + " 2>&1 \n")
+        if CLUSTER:
+            fallback = fallback.replace("timeout " + str(timeout) + " ", "timeout $EM_LEFT ", 1)
+            script.write("    EM_LEFT=$((" + str(timeout) + " - (SECONDS - EM_START))) \n")
+            script.write("    if [ $EM_LEFT -gt 0 ]; then \n")
+            script.write("        " + fallback + onTimeout + " \n")
+            script.write("    else \n")
+            script.write("        echo " + errorMsg + " >> " + em_log + " 2>&1 \n")
+            script.write("    fi \n")
+        else:
+            script.write("    " + fallback + onTimeout + " \n")
+        script.write("fi \n\n")
+
+    if STAGING is not None:
+        # done even if the run failed or timed out, as there might still be some useful output
+        script.write("publishRun \"" + stage + "\" " + runName + " >> " + em_log + " 2>&1 \n\n")
 
-    script.write(command + " \n\n")
+    if RESULT_STORE is not None and isJava(sut):
+        stored = RESULT_STORE + "/" + resultKey(sut, runParams)
+        files = " ".join("\"" + REPORT_DIR + "/" + f + "\"" for f in resultFiles(identifier))
+        script.write("storeResult \"" + stored + "\" " + files + " >> " + em_log + " 2>&1 \n\n")
 
     return script.getvalue()
 
 
-def createJobs():
+### Racing of the settings ###
+
+def readRaceResults(folders):
+    # for each block (ie, SUT and seed), the result of each setting (ie, config name and label)
+    blocks = {}
+    for folder in folders:
+        reports = os.path.join(folder, "reports")
+        if not os.path.isdir(reports):
+            print("ERROR: no reports folder in " + folder)
+            exit(1)
+        for name in os.listdir(reports):
+            if not (name.startswith("statistics") and name.endswith(".csv")):
+                continue
+            with open(os.path.join(reports, name), newline="") as f:
+                for row in csv.DictReader(f):
+                    # runs of a baseline build are not settings in the race
+                    if row["labelForExperimentConfigs"].endswith(BASELINE_SUFFIX):
+                        continue
+                    key = (row["labelForExperimentConfigs"], row["labelForExperiments"])
+                    score = (float(row["coveredTargets"]), float(row["potentialFaults"]))
+                    blocks.setdefault((row["id"], row["seed"]), {})[key] = score
+    return blocks
+
+
+def readRaceSurvivors(folder):
+    path = os.path.join(folder, RACE_SURVIVORS_FILE)
+    if not os.path.isfile(path):
+        return None
+    with open(path, newline="") as f:
+        return set((row["config"], row["label"]) for row in csv.DictReader(f))
+
+
+def writeRaceSurvivors(survivors):
+    with open(os.path.join(BASE_DIR, RACE_SURVIVORS_FILE), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["config", "label"])
+        for survivor in sorted(survivors):
+            writer.writerow(survivor)
+
+
+# probability of a chi-squared value at least x with the given degrees of freedom, ie, the regularized upper
+# incomplete gamma function Q(df/2, x/2), computed as in Numerical Recipes (ie, with a series or a continued fraction)
+def chiSquaredSurvival(x, df):
+    a = df / 2
+    x = x / 2
+    if x <= 0:
+        return 1.0
+    logPrefix = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1 / a
+        n = a
+        while abs(term) > abs(total) * 1e-15:
+            n += 1
+            term *= x / n
+            total += term
+        return max(0.0, 1 - total * math.exp(logPrefix))
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    i = 0
+    while True:
+        i += 1
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        h *= d * c
+        if abs(d * c - 1) < 1e-15:
+            break
+    return min(1.0, h * math.exp(logPrefix))
+
+
+# ranks of the given scores, from 1 (worst) to their number (best), where ties get the average of their positions
+def averageRanks(scores):
+    ordered = sorted(scores)
+    return [(ordered.index(s) + len(ordered) - ordered[::-1].index(s) + 1) / 2 for s in scores]
+
+
+# Friedman test on the ranks (from averageRanks) of k settings in each of n blocks: statistic and p-value
+def friedman(ranks):
+    n = len(ranks)
+    k = len(ranks[0])
+    sums = [sum(r[j] for r in ranks) for j in range(k)]
+    statistic = 12 / (n * k * (k + 1)) * sum(rs * rs for rs in sums) - 3 * n * (k + 1)
+    # correction for ties
+    ties = sum(t ** 3 - t for r in ranks for t in collections.Counter(r).values())
+    correction = 1 - ties / (n * (k ** 3 - k))
+    if correction <= 0:
+        # all settings are tied in all blocks
+        return 0.0, 1.0
+    statistic /= correction
+    return statistic, chiSquaredSurvival(statistic, k - 1)
+
+
+# settings to run in the new round, ie, the survivors of the previous rounds which are not significantly worse
+def raceSurvivors():
+    blocks = readRaceResults(RACE)
+    withResults = set(k for results in blocks.values() for k in results)
+
+    survivors = readRaceSurvivors(RACE[-1])
+    if survivors is None:
+        survivors = set(k for results in readRaceResults([RACE[-1]]).values() for k in results)
+    for k in sorted(survivors - withResults):
+        print("Race dropping " + k[0] + " " + k[1] + ": no results")
+    survivors = sorted(survivors & withResults)
+
+    # only blocks with results for all the survivors can be used to compare them
+    complete = [results for results in blocks.values() if all(k in results for k in survivors)]
+    if len(survivors) < 2 or len(complete) < 2:
+        print("Race keeping all " + str(len(survivors)) + " survivors, as not enough runs to compare them")
+        return set(survivors)
+
+    ranks = [averageRanks([results[k] for k in survivors]) for results in complete]
+    meanRanks = {k: statistics.mean(r[j] for r in ranks) for j, k in enumerate(survivors)}
+    statistic, p = friedman(ranks)
+    print("Race Friedman test on " + str(len(survivors)) + " survivors in " + str(len(complete)) + " blocks: statistic "
+          + "{:.3f}".format(statistic) + ", p-value " + "{:.4f}".format(p))
+
+    ranked = sorted(survivors, key=lambda k: -meanRanks[k])
+    keep = len(ranked)
+    if p < RACE_ALPHA:
+        keep = max(1, int(math.ceil(RACE_KEEP * len(ranked))))
+    for i, k in enumerate(ranked):
+        print("Race " + ("keeping " if i < keep else "dropping ") + k[0] + " " + k[1]
+              + ": average rank " + "{:.3f}".format(meanRanks[k]) + " of " + str(len(ranked)))
+    return set(ranked[:keep])
+
+
+def getFilteredConfigs():
 
     CONFIGS = getConfigs()
 
@@ -832,73 +1734,141 @@ def createJobs():
 
         CONFIGS = filteredconfigs
 
+    return CONFIGS
+
+
+def createJobs():
+    global last_generated_ip
+
+    CONFIGS = getFilteredConfigs()
+
+    if BASELINE is not None and any(c.name.endswith(BASELINE_SUFFIX) for c in CONFIGS):
+        raise Exception("ERROR: config names cannot end with " + BASELINE_SUFFIX + " when comparing with a baseline build")
 
     NRUNS_PER_SUT = (1 + MAX_SEED - MIN_SEED) * sum(map(lambda o: o.numOfSettings, CONFIGS))
-    SUT_WEIGHTS = sum(map(lambda x: x.timeWeight, SUTS))
+
+    survivors = None
+    if RACE is not None:
+        # settings eliminated in previous rounds, or never run in them, are not run
+        survivors = raceSurvivors()
+        survivors = set((c.name, settingLabel(s)) for c in CONFIGS for s in c.generateAllSettings()
+                        if (c.name, settingLabel(s)) in survivors)
+        writeRaceSurvivors(survivors)
+        NRUNS_PER_SUT = (1 + MAX_SEED - MIN_SEED) * len(survivors)
+
+    SUTS.sort(key=lambda x: -x.timeWeight)
+
+    # when extending, runs already in the folder, and first free port and IP
+    existing = set()
+    if EXTEND:
+        previous = readRuns()
+        existing = set((r["sut"], int(r["seed"]), r["config"], r["label"]) for r in previous)
+        # reused runs had no job, so no port nor IP
+        jobs = [r for r in previous if r["port"] != ""]
+        if len(jobs) > 0:
+            State.port = max(BASE_SEED, max(int(r["port"]) for r in jobs) + 10)
+            last_generated_ip = jobs[-1]["ip"]
+
+    # runs for which a job is needed, ie, the ones whose results are not already stored
+    runsPerSut = {}
+    reused = 0
+    already = 0
+    for sut in SUTS:
+        runs = []
+        for seed in range(MIN_SEED, MAX_SEED + 1):
+
+            random.shuffle(CONFIGS)
+
+            for config in CONFIGS:
+
+                # when comparing builds, each run is done with both of them, alternating which one goes first
+                names = [config.name]
+                if BASELINE is not None:
+                    names = [config.name, config.name + BASELINE_SUFFIX]
+                    if seed % 2 == 1:
+                        names.reverse()
+
+                for setting in config.generateAllSettings():
+                    if survivors is not None and (config.name, settingLabel(setting)) not in survivors:
+                        continue
+                    for configName in names:
+                        if (sut.name, seed, configName, settingLabel(setting)) in existing:
+                            already += 1
+                            continue
+                        if reuseStoredResult(sut, seed, setting, configName):
+                            addReusedRun(sut, seed, setting, configName)
+                            reused += 1
+                        else:
+                            runs.append((seed, setting, configName))
+        runsPerSut[sut.name] = runs
+
+    SUT_WEIGHTS = sum(map(lambda x: x.timeWeight * len(runsPerSut[x.name]), SUTS))
     # For example, if we have 30 runs and 5 SUTs, the total budget
     # to distribute among the different jobs/scripts is 150.
     # However, some SUTs might have weights greater than 1 (ie, they run slower, so
     # need more budget)
-    TOTAL_BUDGET = NRUNS_PER_SUT * SUT_WEIGHTS
-    TOTAL_NRUNS = NRUNS_PER_SUT * len(SUTS)
+    TOTAL_BUDGET = SUT_WEIGHTS
+    TOTAL_NRUNS = NRUNS_PER_SUT * len(SUTS) * (1 if BASELINE is None else 2)
 
     state = State(TOTAL_BUDGET)
-
-    SUTS.sort(key=lambda x: -x.timeWeight)
+    state.sutsLeft = len([sut for sut in SUTS if len(runsPerSut[sut.name]) > 0])
 
     for sut in SUTS:
 
+        runs = runsPerSut[sut.name]
+        if len(runs) == 0:
+            continue
+
         state.sutsLeft -= 1
         state.resetTmpForNewRun()
 
         code = ""
         completedForSut = 0
 
-        for seed in range(MIN_SEED, MAX_SEED + 1):
-
-            random.shuffle(CONFIGS)
-
-            for config in CONFIGS:
+        for (seed, setting, configName) in runs:
+
+            # first run in current script: we need to create all the initializing preambles
+            if state.counter == 0:
+                code = createOneJob(state, sut, seed, setting, configName)
+
+            # can we add this new run to the current opened script?
+            elif(
+                    # we need to check if we would not exceed the budget limit per job
+                    (state.counter + sut.timeWeight) <= state.perJob
+                    # however, that check must be ignored if we cannot open/create any new script file
+                    # for the current SUT
+                    or not state.hasSpareJobs() or
+                    # this case is bit more tricky... let's say only few runs are left that
+                    # we need to allocate in a script, but they are so few that they would need
+                    # only a small percentage of a new script capacity (eg, less than 30%).
+                    # In such a case, to avoid getting very imbalanced execution times,
+                    # we could just add those few runs to the current script.
+                    (len(runs) - completedForSut < 0.3 * state.perJob / sut.timeWeight)
+            ):
+                code += addJobBody(state.port, sut, seed, setting, configName)
+                addRun(state, sut, seed, setting, configName)
+                state.updateBudget(sut.timeWeight)
 
-                for setting in config.generateAllSettings():
+            else:
+                writeWithHeadAndFooter(code, state.port, sut, state.getTimeoutMinutes(), state.counter)
+                state.resetTmpForNewRun()
+                code = createOneJob(state, sut, seed, setting, configName)
 
-                    # first run in current script: we need to create all the initializing preambles
-                    if state.counter == 0:
-                        code = createOneJob(state, sut, seed, setting, config.name)
-
-                    # can we add this new run to the current opened script?
-                    elif(
-                            # we need to check if we would not exceed the budget limit per job
-                            (state.counter + sut.timeWeight) <= state.perJob
-                            # however, that check must be ignored if we cannot open/create any new script file
-                            # for the current SUT
-                            or not state.hasSpareJobs() or
-                            # this case is bit more tricky... let's say only few runs are left that
-                            # we need to allocate in a script, but they are so few that they would need
-                            # only a small percentage of a new script capacity (eg, less than 30%).
-                            # In such a case, to avoid getting very imbalanced execution times,
-                            # we could just add those few runs to the current script.
-                            (NRUNS_PER_SUT - completedForSut < 0.3 * state.perJob / sut.timeWeight)
-                    ):
-                        code += addJobBody(state.port, sut, seed, setting, config.name)
-                        state.updateBudget(sut.timeWeight)
-
-                    else:
-                        writeWithHeadAndFooter(code, state.port, sut, state.getTimeoutMinutes())
-                        state.resetTmpForNewRun()
-                        code = createOneJob(state, sut, seed, setting, config.name)
-
-                    # keep track that a new run has been handled
-                    completedForSut += 1
+            # keep track that a new run has been handled
+            completedForSut += 1
 
         if state.opened:
-            writeWithHeadAndFooter(code, state.port, sut, state.getTimeoutMinutes())
+            writeWithHeadAndFooter(code, state.port, sut, state.getTimeoutMinutes(), state.counter)
 
     print("Number of used SUTs: " + str(len(SUTS)))
     print("Total number of experiments: " + str(TOTAL_NRUNS))
+    if RESULT_STORE is not None:
+        print("Experiments reusing stored results: " + str(reused))
+    if EXTEND:
+        print("Experiments already in the folder: " + str(already))
     print("Generated scripts: " + str(state.generated))
 
-    if TIMEOUT_MINUTES > 0:
+    if TIMEOUT_MINUTES > 0 and len(state.waits) > 0:
         print("Max wait for a job: " + str(max(state.waits)) + " minutes")
         print("Median wait for a job: " + str(statistics.median(state.waits)) + " minutes")
         print("Total wait time: " + str(sum(state.waits) / 60) + " hours")
@@ -906,6 +1876,49 @@ def createJobs():
         print("Budget left: " + str(state.budget))
 
 
+### Canary runs ###
+
+CANARY_DIR = CAMPAIGN_DIR + "/canary"
+
+
+def createCanaryJobs():
+    # canary runs are generated like all other runs, but with their own budget and output folders
+    global BUDGET, REPORT_DIR, TEST_DIR, LOG_DIR, SCRIPT_DIR, JACOCO, STAGING, RESULT_STORE
+    saved = (BUDGET, REPORT_DIR, TEST_DIR, LOG_DIR, SCRIPT_DIR, JACOCO, STAGING, RESULT_STORE)
+    BUDGET = CANARY
+    REPORT_DIR, TEST_DIR, LOG_DIR, SCRIPT_DIR = [str(pathlib.PurePath(CANARY_DIR + "/" + d).as_posix())
+                                                 for d in ["reports", "tests", "logs", "scripts"]]
+    for d in [REPORT_DIR, TEST_DIR, LOG_DIR, SCRIPT_DIR]:
+        os.makedirs(d)
+    JACOCO = False
+    STAGING = None
+    RESULT_STORE = None
+
+    # for each canary run, what to check once completed, see schedule.py
+    rows = []
+    port = BASE_SEED
+    for sut in SUTS:
+        timeout = TIMEOUT_SUT_START_MINUTES + int(math.ceil(1.1 * sut.timeWeight * max(1, budgetMinutes() or 1)))
+        for config in getFilteredConfigs():
+            setting = next(config.generateAllSettings())
+            label, identifier, _ = getRunParams(sut, MIN_SEED, setting, config.name)
+            code = createJobHead(port, sut, timeout) + addJobBody(port, sut, MIN_SEED, setting, config.name) + closeJob(port, sut)
+            script = writeScript(code, port, sut)
+            rows.append([os.path.relpath(script.name, BASE_DIR), sut.name, config.name, label,
+                         LOG_DIR + "/log_em_" + sut.name + "_" + str(port) + ".txt",
+                         REPORT_DIR + "/statistics" + identifier + ".csv"])
+            port += 10
+
+    with open(os.path.join(CANARY_DIR, "canary.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["script", "sut", "config", "label", "emLog", "statistics"])
+        writer.writerows(rows)
+
+    print("Generated canary scripts: " + str(len(rows)))
+
+    BUDGET, REPORT_DIR, TEST_DIR, LOG_DIR, SCRIPT_DIR, JACOCO, STAGING, RESULT_STORE = saved
+
+
 class ParameterSetting:
     # name is the same name used in the EM parameters
     # values is an array of configured values regarding the parameter
@@ -920,31 +1933,120 @@ class ParameterSetting:
             exit("a value at the index "+ str(index) + " does not exist")
         return (self.name, self.values[index])
 
+### Designs of experiments, ie, which combinations of the parameter settings of a Config are run
+# all combinations (ie, the full Cartesian product)
+DESIGN_FULL = "full"
+# k combinations sampled uniformly at random, without repetitions
+DESIGN_RANDOM = "random"
+# Latin hypercube of k points: for each parameter, its values are used (roughly) the same number of times,
+# and those are randomly matched with the values of the other parameters.
+# Points that end up identical are run only once.
+DESIGN_LHS = "lhs"
+# Regular fraction of the full factorial, where the values of the last k parameters are not varied
+# independently, but derived from the ones of the other parameters (ie, their sum, modulo the number of values).
+# With 2 values per parameter, this is a standard 2^(n-k) fractional factorial design.
+DESIGN_FRACTIONAL = "fractional"
+DESIGNS = [DESIGN_FULL, DESIGN_RANDOM, DESIGN_LHS, DESIGN_FRACTIONAL]
+
+
 # Each Config object has a list of ParameterSetting objects
 class Config:
     # settings is an array of ParameterSetting objects
-    def __init__(self, settings, name="exp"):
+    # design is one of DESIGNS, where k is the number of combinations to sample for DESIGN_RANDOM and DESIGN_LHS,
+    # or the number of derived parameters for DESIGN_FRACTIONAL.
+    # seed is used for the sampling, so that the same combinations are run each time the scripts are generated
+    def __init__(self, settings, name="exp", design=DESIGN_FULL, k=None, seed=0):
         if " " in name:
             raise Exception("Config name must have no space. Wrong value: " + name)
+        if design not in DESIGNS:
+            raise Exception("Unrecognized design " + str(design) + " for config " + name + ". Valid values: " + str(DESIGNS))
+        if design != DESIGN_FULL and (k is None or k < 1):
+            raise Exception("Config " + name + " with design " + design + " needs a positive k")
+        if design == DESIGN_FRACTIONAL and (k >= len(settings) or (k > 1 and k > len(settings) - k)):
+            raise Exception("Config " + name + " cannot derive " + str(k) + " out of " + str(len(settings)) + " parameters")
         self.name = name
         self.settings = settings
-        self.numOfSettings = 1
+        self.design = design
+        self.k = k
+        self.seed = seed
+        self.numOfCombinations = 1
         for s in self.settings:
-            self.numOfSettings *= s.count
+            self.numOfCombinations *= s.count
+        # index of the value of each parameter, for each sampled combination. None means all combinations
+        self.sampled = None
+        if design == DESIGN_RANDOM and k < self.numOfCombinations:
+            rand = random.Random(seed)
+            self.sampled = [self.decode(i) for i in sorted(rand.sample(range(self.numOfCombinations), k))]
+        elif design == DESIGN_LHS:
+            self.sampled = self.latinHypercube()
+        if design == DESIGN_FRACTIONAL:
+            base = 1
+            for s in self.settings[:len(self.settings) - k]:
+                base *= s.count
+            self.numOfSettings = base
+        elif self.sampled is not None:
+            self.numOfSettings = len(self.sampled)
+        else:
+            self.numOfSettings = self.numOfCombinations
 
-    # generate all settings for configured parameters
+    # generate the settings for configured parameters, one at a time, based on the chosen design
     def generateAllSettings(self):
         if len(self.settings) == 0:
-            return [[]]
-        all = []
+            yield []
+            return
+        if self.sampled is not None:
+            for lst in self.sampled:
+                yield self.toSetting(lst)
+            return
+        if self.design == DESIGN_FRACTIONAL:
+            nbase = len(self.settings) - self.k
+            lst = [0] * nbase
+            while lst is not None:
+                yield self.toSetting(lst + self.derived(lst))
+                lst = self.plus1(lst)
+            return
         lst = [0] * len(self.settings)
         while lst is not None:
-            e = []
-            for i in range(len(lst)):
-                e.append(self.settings[i].pvalue(lst[i]))
-            all.append(e)
+            yield self.toSetting(lst)
             lst = self.plus1(lst)
-        return all
+
+    def toSetting(self, lst):
+        return [self.settings[i].pvalue(lst[i]) for i in range(len(lst))]
+
+    # index of the value of each parameter in the n-th combination of the full design
+    def decode(self, n):
+        lst = []
+        for s in self.settings:
+            lst.append(n % s.count)
+            n = n // s.count
+        return lst
+
+    def latinHypercube(self):
+        rand = random.Random(self.seed)
+        columns = []
+        for s in self.settings:
+            strata = list(range(self.k))
+            rand.shuffle(strata)
+            columns.append([(j * s.count) // self.k for j in strata])
+        points = []
+        seen = set()
+        for row in range(self.k):
+            lst = [columns[i][row] for i in range(len(self.settings))]
+            if tuple(lst) not in seen:
+                seen.add(tuple(lst))
+                points.append(lst)
+        return points
+
+    # values of the derived parameters in a fractional design, given the ones of the base parameters
+    def derived(self, lst):
+        nbase = len(lst)
+        values = []
+        for j in range(self.k):
+            # with a single derived parameter, it is based on all others (ie, highest resolution).
+            # otherwise, each derived parameter leaves out a different base one, so no two are aliased
+            used = [lst[i] for i in range(nbase) if self.k == 1 or i != j]
+            values.append(sum(used) % self.settings[nbase + j].count)
+        return values
 
     # next setting
     def plus1(self, lst):
@@ -996,6 +2098,9 @@ def getConfigs():
     # foo = Config([ALGO_MIO, PR5], "foo")
     # bar = Config([ALGO_RANDOM, PR], "bar")
 
+    ### Example (optional) on sampling only some combinations of the settings, when there are too many to run them all
+    # tuning = Config([ALGO_MIO, PR, ...], "tuning", design=DESIGN_LHS, k=50, seed=42)
+
     ### Example (step3) on employing Config objects for the experiments
     # CONFIGS.append(foo)
     # CONFIGS.append(bar)
@@ -1015,5 +2120,15 @@ def getConfigs():
 # Create the actual job scripts
 createJobs()
 
+# Create the scripts of the canary runs, to check the set up before running all jobs
+if CANARY is not None:
+    createCanaryJobs()
+
 # Create a single ./runall.sh script to submit all the job scripts
 createRunallScript()
+
+# Save info on the generated scripts, to be able to estimate how long running them will take
+writeManifest()
+
+# Save which runs are in the folder, to be able to extend it later
+writeRuns()
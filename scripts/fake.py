@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+# Stand-in for EvoMaster and for the driver of a SUT, used in the scripts generated by exp.py with fake=<seconds>,
+# to benchmark the generation and the scheduling of the scripts at scale, without any JDK, SUT nor EMB_DIR.
+#
+# The fake EM keeps busy the given fraction of a CPU and allocates the given memory, for a duration sampled
+# around the given mean (log-normal, based on the seed of the run, so runs can be repeated). It then writes
+# statistics, snapshot and covered target files in the same format as EM (ie, the columns of Statistics.kt,
+# followed by the given EM parameters), with values depending on the SUT, the setting and the seed, so that
+# the usual analyses (eg, racing in exp.py, or regression.py) can be done on them.
+# With the given probability, the run rather fails: it logs an [ERROR] (see triage.py), and writes no file.
+#
+# The fake driver just allocates the given memory, and waits until it is killed (as done at the end of each script).
+#
+# Usage:
+#
+#   fake.py em <SECONDS> <CPU> <MB> <FAIL> -- <EM parameters>
+#   fake.py driver <MB>
+
+import math
+import os
+import random
+import sys
+import time
+
+MB = 1024 * 1024
+
+# variability of the duration of the runs, ie, sigma of the log-normal distribution
+DURATION_SIGMA = 0.25
+# a busy CPU is checked (and the process sleeps) in slices of this length
+SLICE_SECONDS = 0.1
+
+# main columns of the statistics files, see Statistics.kt
+COLUMNS = ["evaluatedTests", "individualsWithSqlFailedWhere", "evaluatedActions", "elapsedSeconds", "generatedTests",
+           "generatedTestTotalSize", "coveredTargets", "lastActionImprovement", "distinctActions", "endpoints",
+           "covered2xx", "gqlNoErrors", "gqlErrors", "errors5xx", "distinct500Faults", "potentialFaults",
+           "numberOfBranches", "numberOfLines", "coveredLines", "coveredBranches", "bootTimeCoveredTargets",
+           "bootTimeCoveredLines", "bootTimeCoveredBranches", "searchTimeCoveredTargets", "searchTimeCoveredLines",
+           "searchTimeCoveredBranches", "coverageFailures", "id"]
+
+
+def allocate(mb):
+    block = bytearray(mb * MB)
+    # touch each page, otherwise it would not be actually used
+    block[::4096] = b"\x01" * len(range(0, len(block), 4096))
+    return block
+
+
+def busy(seconds, cpu):
+    end = time.time() + seconds
+    while time.time() < end:
+        sliceEnd = min(end, time.time() + SLICE_SECONDS)
+        busyEnd = time.time() + cpu * SLICE_SECONDS
+        while time.time() < min(busyEnd, sliceEnd):
+            pass
+        time.sleep(max(0, sliceEnd - time.time()))
+
+
+def parseParams(args):
+    # eg, --seed=1 -> seed:1
+    params = {}
+    for a in args:
+        if a.startswith("--") and "=" in a:
+            k, v = a[2:].split("=", 1)
+            params[k] = v.strip("\"")
+    return params
+
+
+def results(params, elapsed, fraction):
+    # values of the statistics columns after the given fraction of the search
+    sut = params.get("statisticsColumnId", "sut")
+    setting = params.get("labelForExperimentConfigs", "") + params.get("labelForExperiments", "")
+    # size of the SUT, and how good the setting is on it, are the same in all its runs
+    sutRandom = random.Random(sut)
+    settingRandom = random.Random(sut + setting)
+    runRandom = random.Random(sut + setting + params.get("seed", "0"))
+
+    lines = sutRandom.randint(1000, 20000)
+    branches = lines // 3
+    endpoints = sutRandom.randint(5, 100)
+    quality = settingRandom.uniform(0.7, 1.0) * runRandom.uniform(0.95, 1.0)
+    # coverage grows quickly at the beginning of the search, and then slower
+    progress = quality * fraction ** 0.3
+    bootLines = int(0.1 * lines)
+
+    coveredLines = max(bootLines, int(0.8 * lines * progress))
+    coveredBranches = int(0.6 * branches * progress)
+    covered2xx = int(endpoints * progress)
+    faults = int(0.2 * endpoints * progress)
+    coveredTargets = coveredLines + coveredBranches + covered2xx + faults + endpoints
+    actions = int(runRandom.uniform(50, 150) * elapsed)
+    tests = actions // 5
+    generated = int(min(tests, 2 * endpoints * progress))
+
+    values = {
+        "evaluatedTests": tests, "individualsWithSqlFailedWhere": 0, "evaluatedActions": actions,
+        "elapsedSeconds": int(elapsed), "generatedTests": generated, "generatedTestTotalSize": 3 * generated,
+        "coveredTargets": coveredTargets, "lastActionImprovement": int(actions * runRandom.uniform(0.5, 1.0)),
+        "distinctActions": endpoints, "endpoints": endpoints, "covered2xx": covered2xx, "gqlNoErrors": 0,
+        "gqlErrors": 0, "errors5xx": faults, "distinct500Faults": faults, "potentialFaults": faults,
+        "numberOfBranches": branches, "numberOfLines": lines, "coveredLines": coveredLines,
+        "coveredBranches": coveredBranches, "bootTimeCoveredTargets": bootLines, "bootTimeCoveredLines": bootLines,
+        "bootTimeCoveredBranches": 0, "searchTimeCoveredTargets": coveredTargets - bootLines,
+        "searchTimeCoveredLines": coveredLines - bootLines, "searchTimeCoveredBranches": coveredBranches,
+        "coverageFailures": 0, "id": sut,
+    }
+    # followed by the EM parameters, as done with the whole configuration in EM
+    return [(c, values[c]) for c in COLUMNS] + [(k, v) for k, v in params.items() if k not in values]
+
+
+def write(path, header, rows, append):
+    if os.path.dirname(path) != "":
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    exists = os.path.exists(path) and append
+    with open(path, "a" if exists else "w") as f:
+        if not exists:
+            f.write(header + "\n")
+        for row in rows:
+            f.write(row + "\n")
+
+
+def em(seconds, cpu, mb, fail, params):
+    print("EvoMaster version: fake", flush=True)
+    rng = random.Random(params.get("statisticsColumnId", "") + params.get("labelForExperimentConfigs", "")
+                        + params.get("labelForExperiments", "") + params.get("seed", "0"))
+    # log-normal with the given mean
+    duration = rng.lognormvariate(0, DURATION_SIGMA) * seconds / math.exp(DURATION_SIGMA ** 2 / 2)
+    failed = rng.random() < fail
+    if failed:
+        duration = rng.uniform(0, duration)
+    print("Fake run of " + "{:.1f}".format(duration) + " seconds, with seed " + params.get("seed", ""), flush=True)
+
+    block = allocate(mb)
+    busy(duration, cpu)
+    del block
+
+    if failed:
+        print("[ERROR] Fake failure after " + "{:.1f}".format(duration) + " seconds", flush=True)
+        exit(1)
+
+    append = params.get("appendToStatisticsFile", "false").lower() == "true"
+    final = results(params, duration, 1)
+    if params.get("writeStatistics", "false").lower() == "true" and "statisticsFile" in params:
+        write(params["statisticsFile"], ",".join(c for c, _ in final), [",".join(str(v) for _, v in final)], append)
+
+    if "snapshotStatisticsFile" in params:
+        interval = float(params.get("snapshotInterval", "5"))
+        rows = []
+        step = interval
+        while step <= 100:
+            values = results(params, duration * step / 100, step / 100)
+            rows.append(str(step) + "," + ",".join(str(v) for _, v in values))
+            step += interval
+        write(params["snapshotStatisticsFile"], "interval," + ",".join(c for c, _ in final), rows, append)
+
+    if params.get("exportCoveredTarget", "false").lower() == "true" and "coveredTargetFile" in params:
+        values = dict(final)
+        targets = ["Line_at_org.fake.Sut_" + str(i).zfill(5) for i in range(values["coveredLines"])] \
+                  + ["Branch_at_org.fake.Sut_at_line_" + str(i).zfill(5) + "_position_0_trueBranch" for i in range(values["coveredBranches"])] \
+                  + ["200:GET:/api/fake/" + str(i) for i in range(values["covered2xx"])]
+        write(params["coveredTargetFile"], "description", targets, False)
+
+    print("Fake run completed, covered targets: " + str(dict(final)["coveredTargets"]), flush=True)
+
+
+def driver(mb):
+    print("Fake driver started", flush=True)
+    block = allocate(mb)
+    # until killed
+    while True:
+        time.sleep(60)
+
+
+if len(sys.argv) < 2 or sys.argv[1] not in ["em", "driver"]:
+    print("Usage:\nfake.py em <SECONDS> <CPU> <MB> <FAIL> -- <EM parameters>\nfake.py driver <MB>")
+    exit(1)
+
+if sys.argv[1] == "driver":
+    driver(int(sys.argv[2]))
+else:
+    em(float(sys.argv[2]), float(sys.argv[3]), int(sys.argv[4]), float(sys.argv[5]), parseParams(sys.argv[7:]))
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+
+# Summarize where time and memory go in the runs of an experiment folder (FOLDER) generated by exp.py with
+# profile=em|driver|all, based on the JFR recordings and GC logs in FOLDER/profiles.
+# For each SUT and profiled process (ie, EM or the driver), recordings of all its runs are aggregated into:
+#
+#   - hot methods: methods at the top of the stack in the execution samples, ie, where CPU time is spent
+#   - allocations: classes of the allocated objects, weighted by their allocated bytes
+#   - GC pauses: number, total, mean and max duration of the GC pauses, from the GC logs
+#
+# JFR recordings are read with the jfr tool of the JDK (JDK 14 or later), found in JAVA_HOME, or else in the PATH.
+# Results are written in a CSV file, and the top entries of each summary are printed.
+#
+# Usage:
+#
+#   hotspots.py <FOLDER> named_param=? ... named_param=?
+#
+# Named parameters:
+#
+#   top=<N>             how many hot methods and allocated classes to print for each SUT. Default is 20.
+#   njobs=<N>           how many recordings to read in parallel. Default is the number of CPUs.
+#   output=<file>       where to write the results. Default is FOLDER/hotspots.csv.
+
+import concurrent.futures
+import csv
+import json
+import os
+import re
+import subprocess
+import sys
+
+if len(sys.argv) < 2:
+    print("Usage:\nhotspots.py <FOLDER> named_param=? ... named_param=?")
+    exit(1)
+
+# Location of experiment folder
+FOLDER = sys.argv[1]
+
+TOP = 20
+NJOBS = os.cpu_count() or 1
+OUTPUT = os.path.join(FOLDER, "hotspots.csv")
+
+kv = dict(x.split("=", 1) for x in sys.argv[2:])
+for k in kv:
+    if k not in ["top", "njobs", "output"]:
+        print("Unrecognized named parameter: " + k)
+        exit(1)
+
+if "top" in kv:
+    TOP = int(kv["top"])
+if "njobs" in kv:
+    NJOBS = int(kv["njobs"])
+if "output" in kv:
+    OUTPUT = kv["output"]
+
+PROFILE_DIR = os.path.join(FOLDER, "profiles")
+
+JFR = os.path.join(os.environ["JAVA_HOME"], "bin", "jfr") if os.environ.get("JAVA_HOME", "") != "" else "jfr"
+
+HOT_METHOD = "method"
+ALLOCATION = "allocation"
+GC_PAUSE = "gcPause"
+
+EXECUTION_SAMPLE = "jdk.ExecutionSample"
+# event type -> field with the allocated bytes. Which ones are available depends on the JDK version
+ALLOCATION_EVENTS = {
+    "jdk.ObjectAllocationSample": "weight",
+    "jdk.ObjectAllocationInNewTLAB": "tlabSize",
+    "jdk.ObjectAllocationOutsideTLAB": "allocationSize",
+}
+
+# pauses in GC logs, ie, unified logging (JDK 9+), eg,
+#   [1.234s][info][gc] GC(3) Pause Young (Normal) (G1 Evacuation Pause) 24M->4M(256M) 3.456ms
+# and JDK 8, eg,
+#   2023-01-01T10:00:00.000+0100: 1.234: [GC (Allocation Failure) [PSYoungGen: ...] ..., 0.0034560 secs] [Times: ...]
+UNIFIED_PAUSE = re.compile(r"\bPause\b.*?(\d+(?:\.\d+)?)ms\s*$")
+JDK8_PAUSE = re.compile(r"\[(?:GC|Full GC)\b.*?, (\d+\.\d+) secs\]")
+
+
+def nameOf(fileName, prefix=""):
+    # <process>__<sut>__<run>, see profileOptions in exp.py
+    tokens = fileName[len(prefix):].split("__")
+    if len(tokens) < 3:
+        return None
+    return tokens[0], tokens[1]
+
+
+def className(recordedClass):
+    return recordedClass["name"].replace("/", ".")
+
+
+def readRecording(path):
+    # hot methods and allocated classes in a JFR recording, with their number of samples and allocated bytes
+    events = ",".join([EXECUTION_SAMPLE] + list(ALLOCATION_EVENTS.keys()))
+    result = subprocess.run([JFR, "print", "--json", "--stack-depth", "1", "--events", events, path],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise Exception(result.stderr.decode("utf-8", "replace").strip())
+    methods = {}
+    allocations = {}
+    for event in json.loads(result.stdout.decode("utf-8", "replace"))["recording"]["events"]:
+        values = event["values"]
+        if event["type"] == EXECUTION_SAMPLE:
+            frames = (values.get("stackTrace") or {}).get("frames") or []
+            if len(frames) == 0:
+                continue
+            method = frames[0]["method"]
+            name = className(method["type"]) + "." + method["name"]
+            methods[name] = methods.get(name, 0) + 1
+        elif event["type"] in ALLOCATION_EVENTS and values.get("objectClass") is not None:
+            name = className(values["objectClass"])
+            allocations[name] = allocations.get(name, 0) + int(values[ALLOCATION_EVENTS[event["type"]]])
+    return methods, allocations
+
+
+def readGcPauses(path):
+    # durations in milliseconds
+    pauses = []
+    with open(path, errors="replace") as f:
+        for line in f:
+            m = UNIFIED_PAUSE.search(line)
+            if m is not None:
+                pauses.append(float(m.group(1)))
+                continue
+            m = JDK8_PAUSE.search(line)
+            if m is not None:
+                pauses.append(1000 * float(m.group(1)))
+    return pauses
+
+
+def add(totals, values):
+    for k, v in values.items():
+        totals[k] = totals.get(k, 0) + v
+
+
+if not os.path.isdir(PROFILE_DIR):
+    print("ERROR: no profiles folder in " + FOLDER)
+    exit(1)
+
+# (sut, process) -> summaries
+methods = {}
+allocations = {}
+pauses = {}
+
+recordings = {}
+for name in sorted(os.listdir(PROFILE_DIR)):
+    path = os.path.join(PROFILE_DIR, name)
+    if name.startswith("gc__"):
+        # rotated logs have a postfix after .log, eg, .0 or .1.current
+        key = nameOf(name.split(".log")[0], "gc__")
+        if key is not None:
+            pauses.setdefault(key, []).extend(readGcPauses(path))
+    elif name.endswith(".jfr"):
+        key = nameOf(name[:-len(".jfr")])
+        if key is not None:
+            recordings[path] = key
+
+print("JFR recordings: " + str(len(recordings)), flush=True)
+
+with concurrent.futures.ThreadPoolExecutor(max_workers=NJOBS) as executor:
+    futures = {executor.submit(readRecording, path): path for path in recordings}
+    for future in concurrent.futures.as_completed(futures):
+        path = futures[future]
+        key = recordings[path]
+        try:
+            m, a = future.result()
+        except Exception as e:
+            # eg, if the process was killed before the recording was dumped
+            print("WARN: cannot read " + path + ": " + str(e), flush=True)
+            continue
+        add(methods.setdefault(key, {}), m)
+        add(allocations.setdefault(key, {}), a)
+
+rows = []
+for key in sorted(set(methods) | set(allocations) | set(pauses)):
+    sut, process = key[1], key[0]
+    print("\n### " + sut + " (" + process + ")")
+
+    for kind, values, unit in [(HOT_METHOD, methods.get(key, {}), "samples"), (ALLOCATION, allocations.get(key, {}), "MB")]:
+        total = sum(values.values())
+        if total == 0:
+            continue
+        print(("Hot methods" if kind == HOT_METHOD else "Allocations") + ", total " +
+              (str(total) if kind == HOT_METHOD else "{:.1f}".format(total / (1024 * 1024))) + " " + unit + ":")
+        ranked = sorted(values.items(), key=lambda x: -x[1])
+        for i, (name, value) in enumerate(ranked):
+            rows.append([sut, process, kind, name, value, "{:.4f}".format(value / total)])
+            if i < TOP:
+                print("  " + "{:5.1f}".format(100 * value / total) + "%  " + name)
+
+    p = pauses.get(key, [])
+    if len(p) > 0:
+        summary = {"count": len(p), "totalMs": sum(p), "meanMs": sum(p) / len(p), "maxMs": max(p)}
+        for name, value in summary.items():
+            rows.append([sut, process, GC_PAUSE, name, "{:.3f}".format(value), ""])
+        print("GC pauses: " + str(len(p)) + ", total " + "{:.1f}".format(sum(p)) + "ms, mean "
+              + "{:.1f}".format(sum(p) / len(p)) + "ms, max " + "{:.1f}".format(max(p)) + "ms")
+
+with open(OUTPUT, "w", newline="") as f:
+    writer = csv.writer(f)
+    writer.writerow(["sut", "process", "kind", "name", "value", "share"])
+    writer.writerows(rows)
+
+print("\nResults written to " + OUTPUT)
@@ -0,0 +1,386 @@
+#!/usr/bin/env python
+
+# Run the Bash scripts of an experiment folder (FOLDER) generated with exp.py on several machines,
+# without a cluster scheduler like SLURM.
+# A coordinator holds the queue of scripts, and any number of workers (on any machine) take scripts
+# from it, running up to N of them in parallel (like schedule.py does on a single machine).
+#
+#   pool.py coordinator <FOLDER> [PORT] [LEASE_MINUTES] [ADDRESS]
+#   pool.py worker <HOST> <N> [PORT]
+#
+# The coordinator listens only on ADDRESS (default 127.0.0.1, ie, only workers on the same machine).
+# To use workers on other machines, give the address of a network interface reachable by them
+# (or 0.0.0.0 for all interfaces), on a trusted network only.
+# Every message must contain the shared secret in the EM_POOL_TOKEN environment variable, which must
+# be the same in the coordinator and in all workers. If not set in the coordinator, a random one is
+# created and printed.
+#
+# As the generated scripts use absolute paths, each worker needs a copy of FOLDER at the same location
+# (eg, copied with rsync before starting the worker, or on a shared file system).
+# Once a script is completed, the worker sends back to the coordinator, one at a time, the files written by
+# that script (ie, referenced in it) in the output folders (reports, tests, logs, exec and profiles), which
+# are then saved in FOLDER. Files in any other folder (eg, the scripts themselves) are never accepted.
+# This is skipped when the worker uses the very same FOLDER as the coordinator, eg, when running on the same machine.
+#
+# A script given to a worker is leased for LEASE_MINUTES (default 10), and workers renew the leases
+# of their running scripts periodically. If a worker crashes or gets disconnected, its leases expire, and
+# those scripts are given to other workers.
+# The coordinator terminates once all scripts are completed.
+
+import hmac
+import json
+import os
+import platform
+import random
+import re
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+# Note: here we for flush on ALL prints, otherwise we would end up with messed up logs
+
+DEFAULT_PORT = 7071
+DEFAULT_ADDRESS = "127.0.0.1"
+
+# environment variable with the secret shared by coordinator and workers
+TOKEN_VARIABLE = "EM_POOL_TOKEN"
+
+COORDINATOR = "coordinator"
+WORKER = "worker"
+
+# requests from the workers
+LEASE = "lease"
+RENEW = "renew"
+UPLOAD = "upload"
+COMPLETE = "complete"
+
+# folders whose files are sent back to the coordinator, see exp.py
+OUTPUT_FOLDERS = ["reports", "tests", "logs", "exec", "profiles"]
+
+# a client that does not send (or read) anything for this long is dropped, so it cannot block the coordinator
+CONNECTION_TIMEOUT_SECONDS = 60
+# longest accepted message (excluding the content of uploaded files)
+MAX_MESSAGE_BYTES = 1024 * 1024
+# uploaded files are received in chunks of this size
+CHUNK_BYTES = 1024 * 1024
+
+SHELL = platform.system() == 'Windows'
+
+
+def usage():
+    print("Usage:\npool.py " + COORDINATOR + " <FOLDER> [PORT] [LEASE_MINUTES] [ADDRESS]\npool.py " + WORKER + " <HOST> <N> [PORT]", flush=True)
+    exit(1)
+
+
+def readMessage(stream):
+    line = stream.readline(MAX_MESSAGE_BYTES)
+    if not line.endswith(b"\n"):
+        raise ConnectionError("Incomplete message")
+    return json.loads(line.decode("utf-8"))
+
+
+def writeMessage(connection, message):
+    connection.sendall((json.dumps(message) + "\n").encode("utf-8"))
+
+
+### Coordinator ###
+
+def outputPath(folder, relative):
+    """Where to save an uploaded file, or None if it is not in one of the output folders of FOLDER"""
+    relative = os.path.normpath(relative)
+    if os.path.isabs(relative) or relative.split(os.sep)[0] not in OUTPUT_FOLDERS:
+        return None
+    path = os.path.join(folder, relative)
+    # output folders might be (or contain) symbolic links pointing anywhere
+    root = os.path.realpath(os.path.join(folder, relative.split(os.sep)[0]))
+    parent = os.path.realpath(os.path.dirname(path))
+    if os.path.commonpath([parent, root]) != root or os.path.islink(path):
+        return None
+    return path
+
+
+def receiveFile(stream, path, size):
+    """Save the next size bytes of the stream in path, or just skip them if path is None"""
+    if path is not None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = os.devnull if path is None else path + ".upload"
+    with open(tmp, "wb") as out:
+        left = size
+        while left > 0:
+            chunk = stream.read(min(CHUNK_BYTES, left))
+            if not chunk:
+                raise Exception("Incomplete file: " + str(path))
+            out.write(chunk)
+            left -= len(chunk)
+    if path is not None:
+        os.replace(tmp, path)
+
+
+class Queue:
+    """State of the coordinator, ie, which scripts are waiting, leased or completed"""
+
+    def __init__(self, folder, scripts, leaseMinutes, token):
+        self.folder = folder
+        self.waiting = list(scripts)
+        self.total = len(scripts)
+        self.leaseMinutes = leaseMinutes
+        self.token = token
+        # lease id -> (script, worker, expiration time)
+        self.leases = {}
+        # lease id -> script, for all leases ever given, as results can still come after a lease expired
+        self.issued = {}
+        self.completed = set()
+        self.failed = 0
+        # used by workers to check if they use the same folder, in which case there is no need to send back any file
+        self.marker = ".pool_" + str(uuid.uuid4())
+
+    def isDone(self):
+        return len(self.completed) == self.total
+
+    def expire(self):
+        for lease, (script, worker, expiration) in list(self.leases.items()):
+            if expiration < time.time():
+                print("Lease expired for " + script + " on " + worker + ", requeued", flush=True)
+                del self.leases[lease]
+                self.waiting.append(script)
+
+    def handle(self, request, stream):
+        if not hmac.compare_digest(str(request.get("token", "")).encode("utf-8"), self.token.encode("utf-8")):
+            print("Rejected request with invalid token", flush=True)
+            return {"error": "Invalid token"}
+        command = request["command"]
+        reply = {}
+        if command == LEASE:
+            if len(self.waiting) > 0:
+                script = self.waiting.pop(0)
+                lease = str(uuid.uuid4())
+                self.leases[lease] = (script, request["worker"], time.time() + self.leaseMinutes * 60)
+                self.issued[lease] = script
+                reply = {"script": script, "lease": lease, "leaseMinutes": self.leaseMinutes, "folder": self.folder,
+                         "marker": self.marker}
+                print("Running script " + str(len(self.completed) + len(self.leases)) + "/" + str(self.total) + ": "
+                      + script + " on " + request["worker"], flush=True)
+            else:
+                reply = {"script": None}
+        elif command == RENEW:
+            # leases that are no longer valid, eg, as expired and given to other workers
+            lost = []
+            for lease in request["leases"]:
+                if lease in self.leases:
+                    script, worker, _ = self.leases[lease]
+                    self.leases[lease] = (script, worker, time.time() + self.leaseMinutes * 60)
+                else:
+                    lost.append(lease)
+            reply = {"lost": lost}
+        elif command == UPLOAD:
+            script = self.issued.get(request["lease"])
+            path = outputPath(self.folder, request["path"])
+            if script is None or script in self.completed:
+                reply = {"error": "No running script for lease " + str(request["lease"])}
+            elif path is None:
+                reply = {"error": "Not an output file: " + str(request["path"])}
+            # if rejected, the file is still read, so that the worker can get the reply
+            receiveFile(stream, path if "error" not in reply else None, int(request["size"]))
+        elif command == COMPLETE:
+            script = self.issued.get(request["lease"])
+            self.leases.pop(request["lease"], None)
+            if script is None:
+                reply = {"error": "Unknown lease " + str(request["lease"])}
+            elif script in self.completed:
+                print("Ignoring results of " + script + " from " + request["worker"] + ", as already completed", flush=True)
+            else:
+                # might had expired, but it is completed now
+                if script in self.waiting:
+                    self.waiting.remove(script)
+                self.completed.add(script)
+                if request["code"] != 0:
+                    print("Process terminated with code: " + str(request["code"]), flush=True)
+                    self.failed += 1
+        else:
+            reply = {"error": "Unrecognized command: " + str(command)}
+        reply["done"] = self.isDone()
+        return reply
+
+
+def coordinator(folder, port, leaseMinutes, address, token):
+    scripts_folder = os.path.join(folder, "scripts")
+    scripts = [f for f in os.listdir(scripts_folder) if os.path.isfile(os.path.join(scripts_folder, f)) and f.endswith(".sh")]
+    random.shuffle(scripts)
+    queue = Queue(folder, scripts, leaseMinutes, token)
+
+    print("There are " + str(queue.total) + " Bash script files", flush=True)
+
+    open(os.path.join(folder, queue.marker), "w").close()
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind((address, port))
+    server.listen()
+    server.settimeout(5)
+    print("Coordinator listening on " + address + ":" + str(port), flush=True)
+
+    while not queue.isDone():
+        queue.expire()
+
+        try:
+            connection, _ = server.accept()
+        except socket.timeout:
+            continue
+
+        with connection:
+            connection.settimeout(CONNECTION_TIMEOUT_SECONDS)
+            try:
+                with connection.makefile("rb") as stream:
+                    reply = queue.handle(readMessage(stream), stream)
+                writeMessage(connection, reply)
+            except Exception as e:
+                print("ERROR: failed to handle request: " + str(e), flush=True)
+
+    server.close()
+    if os.path.exists(os.path.join(folder, queue.marker)):
+        os.remove(os.path.join(folder, queue.marker))
+    print("All jobs are completed, failed: " + str(queue.failed), flush=True)
+
+
+### Worker ###
+
+def send(host, port, request, file=None):
+    with socket.create_connection((host, port), timeout=CONNECTION_TIMEOUT_SECONDS) as connection:
+        writeMessage(connection, request)
+        if file is not None:
+            with open(file, "rb") as f:
+                connection.sendfile(f)
+        with connection.makefile("rb") as stream:
+            return readMessage(stream)
+
+
+def scriptOutputs(folder, script, since):
+    """
+    Output files written by the given script, ie, referenced in it (eg, statistics and log files), possibly with
+    suffixes (eg, rotated GC logs), or test suites with its name in its output folder.
+    Files written by other scripts running at the same time in the same folders are not included.
+    """
+    with open(os.path.join(folder, "scripts", script)) as f:
+        content = f.read()
+    outputs = "|".join(re.escape(o) for o in OUTPUT_FOLDERS)
+    referenced = set(re.findall(re.escape(folder) + r"/(?:" + outputs + r")/[^\s\"'`;&|<>(),:=]+", content))
+    suites = [name.split(".")[-1] for name in re.findall(r"--testSuiteFileName=([^\s\"']+)", content)]
+
+    files = set()
+    for path in referenced:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.update(os.path.join(root, n) for n in names if any(n.startswith(s) for s in suites))
+        elif os.path.isdir(os.path.dirname(path)):
+            name = os.path.basename(path)
+            files.update(os.path.join(os.path.dirname(path), n) for n in os.listdir(os.path.dirname(path))
+                         if n.startswith(name))
+    return sorted(f for f in files if os.path.isfile(f) and os.path.getmtime(f) >= since)
+
+
+def worker(host, n, port, token):
+    name = socket.gethostname() + ":" + str(os.getpid())
+    # lease id -> (script, process, start time)
+    running = {}
+    done = False
+    lastRenew = time.time()
+    leaseMinutes = None
+    folder = None
+    shared = False
+
+    print("Worker " + name + " running at most " + str(n) + " scripts in parallel", flush=True)
+
+    while not done or len(running) > 0:
+        try:
+            for lease, (script, handler, start) in list(running.items()):
+                handler.poll()
+                if handler.returncode is None:
+                    continue
+                if not shared:
+                    for path in scriptOutputs(folder, script, start):
+                        reply = send(host, port, {"command": UPLOAD, "token": token, "worker": name, "lease": lease,
+                                                  "path": os.path.relpath(path, folder),
+                                                  "size": os.path.getsize(path)}, path)
+                        if "error" in reply:
+                            print("Cannot send " + path + ": " + reply["error"], flush=True)
+                reply = send(host, port, {"command": COMPLETE, "token": token, "worker": name, "lease": lease,
+                                          "code": handler.returncode})
+                del running[lease]
+                done = reply.get("done", False)
+
+            while not done and len(running) < n:
+                reply = send(host, port, {"command": LEASE, "token": token, "worker": name})
+                if "error" in reply:
+                    print("Rejected by coordinator: " + reply["error"], flush=True)
+                    break
+                done = reply["done"]
+                if reply.get("script") is None:
+                    break
+                script = reply["script"]
+                leaseMinutes = reply["leaseMinutes"]
+                folder = reply["folder"]
+                shared = os.path.exists(os.path.join(folder, reply["marker"]))
+                print("Running script " + script, flush=True)
+                command = ["bash", os.path.join("scripts", script)]
+                handler = subprocess.Popen(command, shell=SHELL, cwd=folder, start_new_session=True)
+                running[reply["lease"]] = (script, handler, time.time())
+
+            if len(running) > 0 and time.time() - lastRenew > leaseMinutes * 60 / 3:
+                reply = send(host, port, {"command": RENEW, "token": token, "worker": name, "leases": list(running.keys())})
+                lastRenew = time.time()
+                for lease in reply.get("lost", []):
+                    script, handler, _ = running.pop(lease)
+                    print("Lease lost for " + script + ", stopping it", flush=True)
+                    if SHELL:
+                        handler.kill()
+                    else:
+                        os.killpg(handler.pid, signal.SIGKILL)
+        except (OSError, ValueError) as e:
+            if folder is not None and len(running) == 0:
+                # the coordinator terminates once all scripts are completed
+                print("Coordinator is no longer reachable", flush=True)
+                break
+            print("Cannot connect to coordinator: " + str(e), flush=True)
+
+        if not done or len(running) > 0:
+            time.sleep(5)
+
+    print("All jobs are completed", flush=True)
+
+
+def main():
+    if len(sys.argv) < 2:
+        usage()
+
+    token = os.environ.get(TOKEN_VARIABLE, "")
+
+    if sys.argv[1] == COORDINATOR:
+        if len(sys.argv) not in [3, 4, 5, 6]:
+            usage()
+        if token == "":
+            token = secrets.token_hex(16)
+            print("No " + TOKEN_VARIABLE + " given, set this in the workers: " + TOKEN_VARIABLE + "=" + token, flush=True)
+        coordinator(os.path.abspath(sys.argv[2]),
+                    int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_PORT,
+                    float(sys.argv[4]) if len(sys.argv) > 4 else 10,
+                    sys.argv[5] if len(sys.argv) > 5 else DEFAULT_ADDRESS,
+                    token)
+
+    elif sys.argv[1] == WORKER:
+        if len(sys.argv) not in [4, 5]:
+            usage()
+        if token == "":
+            print("Missing " + TOKEN_VARIABLE + ", with the same secret used by the coordinator", flush=True)
+            exit(1)
+        worker(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]) if len(sys.argv) > 4 else DEFAULT_PORT, token)
+
+    else:
+        usage()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+
+# Check for performance regressions of an EvoMaster build, from an experiment folder (FOLDER) generated by exp.py
+# with baseline=<jar>, where each run is done with both the new build and the baseline one.
+# For each SUT (and setting), the two builds are compared on how many actions they evaluate per second,
+# how many tests they evaluate within the same --maxTime, and, if the folder was generated with usage=true,
+# on the resources used by EM (CPU time, peak memory, peak heap and GC time).
+#
+# For each metric, the new build fails if its median is worse than the baseline one by more than the given
+# tolerance (relative to the baseline), and if the difference is not negligible based on the Vargha-Delaney A12
+# effect size (ie, at least a small effect, where A12 is the probability that a run of the new build gives a
+# higher value than a run of the baseline one).
+# Results are written in a CSV file, and the script terminates with exit code 1 if any metric failed.
+#
+# Usage:
+#
+#   regression.py <FOLDER> named_param=? ... named_param=?
+#
+# Named parameters:
+#
+#   tolerance=<fraction>    how much worse the new build can be, eg, 0.05 for 5%. Default is 0.05.
+#   output=<file>           where to write the results. Default is FOLDER/regression.csv.
+
+import csv
+import os
+import statistics
+import sys
+
+# see BASELINE_SUFFIX in exp.py
+BASELINE_SUFFIX = "_baseline"
+
+NEW = "new"
+BASELINE = "baseline"
+
+# metric -> whether higher values are better
+METRICS = {
+    "actionsPerSecond": True,
+    "evaluatedTests": True,
+    "emCpuSeconds": False,
+    "emPeakRssMB": False,
+    "emPeakHeapMB": False,
+    "emGcSeconds": False,
+}
+
+# Vargha-Delaney threshold for a negligible effect size, ie, |A12 - 0.5| < 0.06
+NEGLIGIBLE = 0.06
+
+
+def readCsvFiles(folder, prefix):
+    # rows of all the CSV files in the reports folder with the given prefix, with the seed in their file name
+    reports = os.path.join(folder, "reports")
+    rows = []
+    for name in sorted(os.listdir(reports)):
+        if not (name.startswith(prefix) and name.endswith(".csv")):
+            continue
+        # see identifier in exp.py, ie, _<sut>_<label>_<seed>[_baseline]
+        seed = name[:-len(".csv")].replace(BASELINE_SUFFIX, "").split("_")[-1]
+        with open(os.path.join(reports, name), newline="") as f:
+            for row in csv.DictReader(f):
+                row["seed"] = seed
+                rows.append(row)
+    return rows
+
+
+def collect(folder):
+    # (sut, label, config) -> build -> metric -> seed -> value
+    groups = {}
+
+    def add(row, metric, value):
+        config = row["labelForExperimentConfigs"]
+        build = BASELINE if config.endswith(BASELINE_SUFFIX) else NEW
+        if build == BASELINE:
+            config = config[:-len(BASELINE_SUFFIX)]
+        key = (row["id"], row["labelForExperiments"], config)
+        builds = groups.setdefault(key, {NEW: {}, BASELINE: {}})
+        builds[build].setdefault(metric, {})[row["seed"]] = value
+
+    for row in readCsvFiles(folder, "statistics"):
+        elapsed = float(row["elapsedSeconds"])
+        if elapsed > 0:
+            add(row, "actionsPerSecond", float(row["evaluatedActions"]) / elapsed)
+        add(row, "evaluatedTests", float(row["evaluatedTests"]))
+
+    for row in readCsvFiles(folder, "usage"):
+        for metric in METRICS:
+            if row.get(metric, "") != "":
+                add(row, metric, float(row[metric]))
+
+    return groups
+
+
+def measureA(a, b):
+    # Vargha-Delaney A12, as in analyze.R
+    if len(a) == 0 and len(b) == 0:
+        return 0.5
+    if len(a) == 0:
+        return 0
+    if len(b) == 0:
+        return 1
+    values = sorted(a + b)
+    # average ranks, for ties
+    ranks = {}
+    for v in set(values):
+        first = values.index(v) + 1
+        last = len(values) - values[::-1].index(v)
+        ranks[v] = (first + last) / 2
+    r1 = sum(ranks[v] for v in a)
+    return (r1 / len(a) - (len(a) + 1) / 2) / len(b)
+
+
+def compare(new, base, higherIsBetter, tolerance):
+    # (new median, baseline median, relative change, A12, whether the new build is worse)
+    newMedian = statistics.median(new)
+    baseMedian = statistics.median(base)
+    change = 0 if baseMedian == 0 else (newMedian - baseMedian) / abs(baseMedian)
+    a12 = measureA(new, base)
+    if higherIsBetter:
+        worse = change < -tolerance and a12 <= 0.5 - NEGLIGIBLE
+    else:
+        worse = change > tolerance and a12 >= 0.5 + NEGLIGIBLE
+    return newMedian, baseMedian, change, a12, worse
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage:\nregression.py <FOLDER> named_param=? ... named_param=?")
+        exit(1)
+
+    # Location of experiment folder
+    folder = sys.argv[1]
+
+    tolerance = 0.05
+    output = os.path.join(folder, "regression.csv")
+
+    kv = dict(x.split("=", 1) for x in sys.argv[2:])
+    for k in kv:
+        if k not in ["tolerance", "output"]:
+            print("Unrecognized named parameter: " + k)
+            exit(1)
+
+    if "tolerance" in kv:
+        tolerance = float(kv["tolerance"])
+    if "output" in kv:
+        output = kv["output"]
+
+    groups = collect(folder)
+    if len(groups) == 0:
+        print("ERROR: no statistics files in " + os.path.join(folder, "reports"))
+        exit(1)
+
+    rows = []
+    failures = 0
+    for (sut, label, config), builds in sorted(groups.items()):
+        for metric, higherIsBetter in METRICS.items():
+            new = list(builds[NEW].get(metric, {}).values())
+            base = list(builds[BASELINE].get(metric, {}).values())
+            if len(new) == 0 or len(base) == 0:
+                continue
+            newMedian, baseMedian, change, a12, worse = compare(new, base, higherIsBetter, tolerance)
+            if worse:
+                failures += 1
+            verdict = "FAIL" if worse else "PASS"
+            rows.append([sut, label, config, metric, len(new), len(base), "{:.3f}".format(newMedian),
+                         "{:.3f}".format(baseMedian), "{:.3f}".format(change), "{:.3f}".format(a12), verdict])
+            print(verdict + " " + sut + " " + config + " " + label + " " + metric + ": median " + "{:.3f}".format(newMedian)
+                  + " vs " + "{:.3f}".format(baseMedian) + " (" + "{:+.1f}".format(100 * change) + "%), A12 "
+                  + "{:.3f}".format(a12) + ", runs " + str(len(new)) + "/" + str(len(base)))
+
+    with open(output, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["sut", "labelForExperiments", "labelForExperimentConfigs", "metric", "newRuns", "baselineRuns",
+                         "newMedian", "baselineMedian", "relativeChange", "A12", "verdict"])
+        writer.writerows(rows)
+
+    print("Results written to " + output)
+
+    if failures > 0:
+        print("ERROR: " + str(failures) + " metrics are worse than the baseline by more than " + str(tolerance))
+        exit(1)
+
+    print("No performance regression with tolerance " + str(tolerance))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,8 +4,38 @@
 # with K generated bash scripts, we can use this schedule.py to run all these scripts
 # with N of them in parallel. The others (assuming N << K) will be started as soon as
 # one current running job is completed
+#
+# On a machine shared by several people, rather than each one starting its own schedule.py
+# (which would run more scripts in parallel than the machine can handle), a single scheduler
+# can be started as a daemon, which will run at most N scripts in parallel, among all the experiment
+# folders submitted to it:
+#
+#   schedule.py daemon <N> [PORT]
+#   schedule.py submit <FOLDER> [WEIGHT] [PORT]
+#   schedule.py status [PORT]
+#
+# Scripts of the different folders are interleaved, where each folder gets a share of the N parallel jobs
+# proportional to its weight (default 1). For example, a folder with weight 2 gets twice as many running
+# scripts as a folder with weight 1, as long as it has scripts left to run.
+# The daemon only accepts connections from the local machine, and each request must contain the shared secret in the
+# EM_POOL_TOKEN environment variable (as for pool.py), as the scripts of the submitted folders are run by the user
+# who started the daemon. If not set when starting the daemon, a random one is created and printed, to be given only
+# to the people allowed to submit.
+#
+# If the folder was generated with canary runs (see canary in exp.py), those can be run first with:
+#
+#   schedule.py canary <N> <FOLDER>
+#
+# Once all canary runs are completed, their EM logs and statistics files are checked, and all the other scripts
+# are run only if none of them failed, eg, because the SUT did not start, or EM did not accept a parameter setting.
 
+import csv
+import hmac
+import json
 import random
+import re
+import secrets
+import socket
 import sys
 import os
 import subprocess
@@ -14,74 +44,289 @@ import platform
 
 # Note: here we for flush on ALL prints, otherwise we would end up with messed up logs
 
-if len(sys.argv) != 3:
-    print("Usage:\nschedule.py <N> <FOLDER>", flush=True)
-    exit(1)
+DEFAULT_PORT = 7070
+
+# environment variable with the secret shared by the daemon and the users submitting to it, see pool.py
+TOKEN_VARIABLE = "EM_POOL_TOKEN"
+# a client that does not send its request in time is disconnected, so it cannot block the scheduling of the scripts
+CONNECTION_TIMEOUT_SECONDS = 5
+MAX_REQUEST_BYTES = 64 * 1024
+
+DAEMON = "daemon"
+SUBMIT = "submit"
+STATUS = "status"
+CANARY = "canary"
 
-# The number of jobs to run in parallel
-N = int(sys.argv[1])
 
-if N < 1:
-    print("Invalid value for N: " + str(N), flush=True)
+def usage():
+    print("Usage:\nschedule.py <N> <FOLDER>\nschedule.py " + DAEMON + " <N> [PORT]\nschedule.py " + SUBMIT
+          + " <FOLDER> [WEIGHT] [PORT]\nschedule.py " + STATUS + " [PORT]\nschedule.py " + CANARY + " <N> <FOLDER>", flush=True)
     exit(1)
 
-# Location of experiment folder
-FOLDER = sys.argv[2]
 
 SHELL = platform.system() == 'Windows'
 
-SCRIPTS_FOLDER = os.path.join(FOLDER, "scripts")
 
-buffer = []
+# An experiment folder, with its Bash scripts to run
+class Campaign:
+    def __init__(self, folder, weight, scripts="scripts"):
+        self.folder = folder
+        self.weight = weight
+        # relative to folder, which is where the scripts are run from
+        self.scripts_folder = scripts
+        scripts_folder = os.path.join(folder, scripts)
+        # collect name of all bash files
+        self.scripts = [f for f in os.listdir(scripts_folder) if os.path.isfile(os.path.join(scripts_folder, f)) and f.endswith(".sh")]
+        # and f.startswith("evomaster")
+        # as we might want to use this script for BB experiments, let's not bind it to EvoMaster
+        random.shuffle(self.scripts)
+        self.total = len(self.scripts)
+        self.running = []
+        self.failed = 0
 
-#collect name of all bash files
-scripts = [f for f in os.listdir(SCRIPTS_FOLDER) if os.path.isfile(os.path.join(SCRIPTS_FOLDER, f))  and f.endswith(".sh")]
-# and f.startswith("evomaster")
-# as we might want to use this script for BB experiments, let's not bind it to EvoMaster
+    def done(self):
+        return len(self.scripts) == 0 and len(self.running) == 0
 
-print("There are " + str(len(scripts)) + " Bash script files", flush=True)
 
-random.shuffle(scripts)
+campaigns = []
 
-k = 1
 
-def runScript(s):
-    global k
-    print("Running script " + str(k)+ "/"+ str(len(scripts)) +": " + s, flush=True)
-    k = k + 1
+def runScript(c):
+    s = c.scripts.pop(0)
+    k = c.total - len(c.scripts)
+    print("Running script " + str(k) + "/" + str(c.total) + ": " + s
+          + ("" if len(campaigns) == 1 else " in " + c.folder), flush=True)
 
-    command = ["bash", os.path.join("scripts", s)]
+    command = ["bash", os.path.join(c.scripts_folder, s)]
 
-    handler = subprocess.Popen(command, shell=SHELL, cwd=FOLDER, start_new_session=True)
-    buffer.append(handler)
+    handler = subprocess.Popen(command, shell=SHELL, cwd=c.folder, start_new_session=True)
+    c.running.append(handler)
 
-for s in scripts:
-    if len(buffer) < N:
-       runScript(s)
-    else:
-        while len(buffer) == N:
-            for h in buffer:
-                h.poll()
-                if h.returncode is not None and h.returncode != 0:
-                    print("Process terminated with code: " + str(h.returncode), flush=True)
-
-            # keep the ones running... those have return code not set yet
-            buffer = [h for h in buffer if h.returncode is None]
-            if len(buffer) == N :
-                time.sleep(5)
-            else:
-                runScript(s)
+
+def checkRunning():
+    for c in campaigns:
+        for h in c.running:
+            h.poll()
+            if h.returncode is not None and h.returncode != 0:
+                print("Process terminated with code: " + str(h.returncode), flush=True)
+                c.failed += 1
+        # keep the ones running... those have return code not set yet
+        c.running = [h for h in c.running if h.returncode is None]
+
+
+def nextCampaign(campaigns):
+    # fair share: next script is taken from the campaign with the fewest running scripts, relative to its weight
+    waiting = [c for c in campaigns if len(c.scripts) > 0]
+    if len(waiting) == 0:
+        return None
+    return min(waiting, key=lambda c: len(c.running) / c.weight)
+
+
+def startScripts(n):
+    while sum(len(c.running) for c in campaigns) < n:
+        c = nextCampaign(campaigns)
+        if c is None:
+            return
+        runScript(c)
+
+
+def runAll(n, folder, scripts="scripts"):
+    c = Campaign(folder, 1, scripts)
+    campaigns.append(c)
+
+    print("There are " + str(c.total) + " Bash script files", flush=True)
+
+    while len(c.scripts) > 0:
+        checkRunning()
+        startScripts(n)
+        if len(c.scripts) > 0:
+            time.sleep(5)
+
+    print("Waiting for last scripts to end", flush=True)
+
+    for h in c.running:
+        h.wait()
+        if h.returncode != 0:
+            print("Process terminated with code: " + str(h.returncode), flush=True)
+
+    print("All jobs are completed", flush=True)
+
+    #TODO how to make sure no subprocess is left hanging?
+
+
+def canaryFailures(folder):
+    # a canary run failed if EM logged any error, or if it did not complete with some covered targets
+    failures = []
+    with open(os.path.join(folder, "canary", "canary.csv"), newline="") as f:
+        for row in csv.DictReader(f):
+            run = row["sut"] + " " + row["config"] + " " + row["label"] + " (" + row["script"] + ")"
+            if os.path.exists(row["emLog"]):
+                with open(row["emLog"], errors="replace") as log:
+                    # without color codes
+                    errors = [re.sub("\x1b\\[[0-9;]*m", "", line).strip() for line in log if "[ERROR]" in line]
+                if len(errors) > 0:
+                    failures.append(run + ": " + errors[0])
+                    continue
+            if not os.path.exists(row["statistics"]):
+                failures.append(run + ": no statistics file, see " + row["emLog"])
+                continue
+            with open(row["statistics"], newline="") as stats:
+                rows = list(csv.DictReader(stats))
+            if len(rows) == 0 or float(rows[-1]["coveredTargets"]) == 0:
+                failures.append(run + ": no covered target, see " + row["emLog"])
+    return failures
+
+
+def status():
+    return [{"folder": c.folder, "weight": c.weight, "total": c.total, "waiting": len(c.scripts),
+             "running": len(c.running), "failed": c.failed} for c in campaigns]
+
+
+def handle(request, token):
+    if not hmac.compare_digest(str(request.get("token", "")).encode("utf-8"), token.encode("utf-8")):
+        print("Rejected request with invalid token", flush=True)
+        return {"ok": False, "error": "Invalid token"}
+    if request["command"] == SUBMIT:
+        c = Campaign(request["folder"], float(request["weight"]))
+        campaigns.append(c)
+        print("Submitted " + c.folder + " with " + str(c.total) + " Bash script files and weight "
+              + str(c.weight), flush=True)
+        return {"ok": True, "scripts": c.total}
+    if request["command"] == STATUS:
+        return {"ok": True, "campaigns": status()}
+    return {"ok": False, "error": "Unrecognized command: " + str(request["command"])}
+
+
+def handleRequest(connection, token):
+    with connection:
+        connection.settimeout(CONNECTION_TIMEOUT_SECONDS)
+        try:
+            with connection.makefile("rb") as stream:
+                data = stream.readline(MAX_REQUEST_BYTES)
+            if not data.endswith(b"\n"):
+                raise ValueError("Incomplete or too large request")
+            request = json.loads(data.decode("utf-8"))
+            reply = handle(request, token)
+        except socket.timeout:
+            print("Closed connection with no request", flush=True)
+            return
+        except Exception as e:
+            reply = {"ok": False, "error": str(e)}
+        try:
+            connection.sendall((json.dumps(reply) + "\n").encode("utf-8"))
+        except OSError:
+            pass
+
+
+def daemon(n, port, token):
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(("127.0.0.1", port))
+    server.listen()
+    server.settimeout(5)
+    print("Scheduler listening on port " + str(port) + ", running at most " + str(n) + " scripts in parallel", flush=True)
+
+    while True:
+        try:
+            connection, _ = server.accept()
+            handleRequest(connection, token)
+        except socket.timeout:
+            pass
+        checkRunning()
+        startScripts(n)
+        for c in [c for c in campaigns if c.done()]:
+            print("All jobs are completed in " + c.folder + ", failed: " + str(c.failed), flush=True)
+            campaigns.remove(c)
+
+
+def send(request, port):
+    token = os.environ.get(TOKEN_VARIABLE, "")
+    if token == "":
+        print("Missing " + TOKEN_VARIABLE + ", with the same secret used by the daemon", flush=True)
+        exit(1)
+    request["token"] = token
+    with socket.create_connection(("127.0.0.1", port), timeout=60) as connection:
+        connection.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = connection.recv(4096)
+            if not chunk:
                 break
+            data += chunk
+    reply = json.loads(data.decode("utf-8"))
+    if not reply["ok"]:
+        print("ERROR: " + reply["error"], flush=True)
+        exit(1)
+    return reply
+
+
+def parseN(value):
+    # The number of jobs to run in parallel
+    n = int(value)
+    if n < 1:
+        print("Invalid value for N: " + str(n), flush=True)
+        exit(1)
+    return n
 
-print("Waiting for last scripts to end", flush=True)
 
-for h in buffer:
-    h.wait()
-    if h.returncode != 0:
-        print("Process terminated with code: " + str(h.returncode), flush=True)
+def main():
+    if len(sys.argv) < 2:
+        usage()
 
-print("All jobs are completed", flush=True)
+    if sys.argv[1] == DAEMON:
+        if len(sys.argv) not in [3, 4]:
+            usage()
+        token = os.environ.get(TOKEN_VARIABLE, "")
+        if token == "":
+            token = secrets.token_hex(16)
+            print("No " + TOKEN_VARIABLE + " given, set this to submit: " + TOKEN_VARIABLE + "=" + token, flush=True)
+        daemon(parseN(sys.argv[2]), int(sys.argv[3]) if len(sys.argv) == 4 else DEFAULT_PORT, token)
 
-#TODO how to make sure no subprocess is left hanging?
+    elif sys.argv[1] == SUBMIT:
+        if len(sys.argv) not in [3, 4, 5]:
+            usage()
+        weight = float(sys.argv[3]) if len(sys.argv) > 3 else 1
+        if weight <= 0:
+            print("Invalid value for WEIGHT: " + str(weight), flush=True)
+            exit(1)
+        reply = send({"command": SUBMIT, "folder": os.path.abspath(sys.argv[2]), "weight": weight},
+                     int(sys.argv[4]) if len(sys.argv) == 5 else DEFAULT_PORT)
+        print("Submitted " + str(reply["scripts"]) + " Bash script files", flush=True)
+
+    elif sys.argv[1] == STATUS:
+        if len(sys.argv) not in [2, 3]:
+            usage()
+        reply = send({"command": STATUS}, int(sys.argv[2]) if len(sys.argv) == 3 else DEFAULT_PORT)
+        for c in reply["campaigns"]:
+            print(c["folder"] + " (weight " + str(c["weight"]) + "): " + str(c["running"]) + " running, "
+                  + str(c["waiting"]) + " waiting, " + str(c["total"] - c["waiting"] - c["running"]) + " completed, "
+                  + str(c["failed"]) + " failed", flush=True)
+
+    elif sys.argv[1] == CANARY:
+        if len(sys.argv) != 4:
+            usage()
+        n = parseN(sys.argv[2])
+        if not os.path.exists(os.path.join(sys.argv[3], "canary", "canary.csv")):
+            print("ERROR: no canary runs in " + sys.argv[3] + ", see canary in exp.py", flush=True)
+            exit(1)
+        print("Running canary scripts", flush=True)
+        runAll(n, sys.argv[3], os.path.join("canary", "scripts"))
+        failures = canaryFailures(sys.argv[3])
+        if len(failures) > 0:
+            for f in failures:
+                print("Canary failed for " + f, flush=True)
+            print("ERROR: " + str(len(failures)) + " canary runs failed, not running the other scripts", flush=True)
+            exit(1)
+        print("All canary runs passed", flush=True)
+        campaigns.clear()
+        runAll(n, sys.argv[3])
+
+    else:
+        if len(sys.argv) != 3:
+            usage()
+        # Location of experiment folder
+        runAll(parseN(sys.argv[1]), sys.argv[2])
 
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+
+# Estimate how long it would take to run the Bash scripts of an experiment folder (FOLDER)
+# generated with exp.py, before actually running them, eg, to choose how many jobs N to run in parallel
+# with schedule.py, or to decide on which machine to run the experiments.
+# This is a discrete-event simulation of running the scripts listed in FOLDER/manifest.csv
+# on N parallel slots, reporting the predicted makespan (ie, the time until all scripts are completed),
+# the utilization of the slots, and the tail (ie, the time at the end when no further script is left to start,
+# and slots become idle while waiting for the last scripts to complete).
+#
+# Usage:
+#
+#   simulate.py <N> <FOLDER> named_param=? ... named_param=?
+#
+# N can be a comma-separated list (eg, 4,8,16), to compare different numbers of parallel jobs.
+#
+# Named parameters:
+#
+#   policy=random|lpt|resource  in which order scripts are started. "random" is what schedule.py does,
+#                               "lpt" starts the longest scripts first, whereas "resource" also
+#                               never starts a script if its CPUs are not available (see cores).
+#                               Default is random.
+#   cores=<K>                   number of CPU cores of the machine. Each script uses the number of CPUs
+#                               specified in the manifest. If more CPUs are used than available, all running
+#                               scripts slow down proportionally. Default is no limit.
+#   durations=<file>            CSV file with columns "sut" and "minutes", with the estimated duration of a single
+#                               run for each SUT, eg, taken from previous experiments. For SUTs not there,
+#                               the duration is derived from the search budget (see runMinutes in manifest.csv).
+#   startup=<minutes>           time needed by a script before its first run, eg, to start the SUT. Default is 1.
+#   repetitions=<R>             how many times to repeat the simulation with the "random" policy. Default is 30.
+
+import csv
+import math
+import os
+import random
+import statistics
+import sys
+
+if len(sys.argv) < 3:
+    print("Usage:\nsimulate.py <N> <FOLDER> named_param=? ... named_param=?")
+    exit(1)
+
+# The number(s) of jobs to run in parallel
+SLOTS = [int(n) for n in sys.argv[1].split(",")]
+
+if any(n < 1 for n in SLOTS):
+    print("Invalid value for N: " + sys.argv[1])
+    exit(1)
+
+# Location of experiment folder
+FOLDER = sys.argv[2]
+
+POLICY_RANDOM = "random"
+POLICY_LPT = "lpt"
+POLICY_RESOURCE = "resource"
+POLICIES = [POLICY_RANDOM, POLICY_LPT, POLICY_RESOURCE]
+
+POLICY = POLICY_RANDOM
+CORES = None
+DURATIONS = None
+STARTUP = 1
+REPETITIONS = 30
+
+kv = dict(x.split("=", 1) for x in sys.argv[3:])
+for k in kv:
+    if k not in ["policy", "cores", "durations", "startup", "repetitions"]:
+        print("Unrecognized named parameter: " + k)
+        exit(1)
+
+if "policy" in kv:
+    POLICY = kv["policy"]
+    if POLICY not in POLICIES:
+        print("Unrecognized policy " + POLICY + ". Valid values: " + str(POLICIES))
+        exit(1)
+if "cores" in kv:
+    CORES = int(kv["cores"])
+if "durations" in kv:
+    DURATIONS = kv["durations"]
+if "startup" in kv:
+    STARTUP = float(kv["startup"])
+if "repetitions" in kv:
+    REPETITIONS = int(kv["repetitions"])
+
+if POLICY == POLICY_RESOURCE and CORES is None:
+    print("Policy " + POLICY_RESOURCE + " requires the number of cores")
+    exit(1)
+
+
+def readDurations():
+    if DURATIONS is None:
+        return {}
+    with open(DURATIONS, newline="") as f:
+        return {row["sut"]: float(row["minutes"]) for row in csv.DictReader(f)}
+
+
+def readScripts():
+    durations = readDurations()
+    scripts = []
+    with open(os.path.join(FOLDER, "manifest.csv"), newline="") as f:
+        for row in csv.DictReader(f):
+            if row["sut"] in durations:
+                minutes = int(row["runs"]) * durations[row["sut"]]
+            elif row["runMinutes"] != "":
+                minutes = float(row["weight"]) * float(row["runMinutes"])
+            else:
+                print("ERROR: no duration estimate for SUT " + row["sut"]
+                      + ", as the budget is not time based. Specify it with durations=<file>")
+                exit(1)
+            scripts.append((row["script"], STARTUP + minutes, int(row["cpus"])))
+    return scripts
+
+
+# Simulate running the scripts in the given order, returning makespan, busy slot time and time when last one started.
+# Each script is defined by its name, duration in minutes (when running on its own) and number of used CPUs
+def simulate(scripts, slots):
+    queue = list(scripts)
+    # script -> work (in minutes) left to complete it
+    running = {}
+    now = 0
+    busy = 0
+    lastStart = 0
+
+    while len(queue) > 0 or len(running) > 0:
+        # start as many scripts as possible
+        while len(queue) > 0 and len(running) < slots:
+            if POLICY == POLICY_RESOURCE and len(running) > 0 \
+                    and sum(s[2] for s in running) + queue[0][2] > CORES:
+                break
+            s = queue.pop(0)
+            running[s] = s[1]
+            lastStart = now
+
+        # with more used CPUs than available, each script only gets its share of them
+        speed = 1
+        if CORES is not None:
+            used = sum(s[2] for s in running)
+            speed = min(1, CORES / used)
+
+        # next event is when a running script completes
+        step = min(running.values()) / speed
+        now += step
+        busy += step * len(running)
+        for s in list(running):
+            running[s] -= step * speed
+            if running[s] <= 1e-9:
+                del running[s]
+
+    return now, busy, lastStart
+
+
+def hours(minutes):
+    return "{:.1f}h".format(minutes / 60)
+
+
+scripts = readScripts()
+total = sum(s[1] for s in scripts)
+
+if len(scripts) == 0:
+    # eg, all runs were already done, and so skipped by exp.py
+    print("Scripts: 0, total duration " + hours(0))
+    for slots in SLOTS:
+        print("N=" + str(slots) + ": makespan " + hours(0))
+    exit(0)
+
+print("Scripts: " + str(len(scripts)) + ", total duration " + hours(total) + ", longest " + hours(max(s[1] for s in scripts)))
+print("Policy: " + POLICY + ("" if CORES is None else ", cores: " + str(CORES)))
+
+for slots in SLOTS:
+    results = []
+    if POLICY == POLICY_RANDOM:
+        for i in range(REPETITIONS):
+            order = list(scripts)
+            random.shuffle(order)
+            results.append(simulate(order, slots))
+    else:
+        results.append(simulate(sorted(scripts, key=lambda s: -s[1]), slots))
+
+    makespans = [r[0] for r in results]
+    utilization = statistics.mean(r[1] / (slots * r[0]) for r in results)
+    tail = statistics.mean(r[0] - r[2] for r in results)
+    # lower bound, ie, if work could be perfectly split among the slots
+    bound = max(max(s[1] for s in scripts), total / slots)
+    if CORES is not None:
+        bound = max(bound, sum(s[1] * s[2] for s in scripts) / CORES)
+
+    line = "N=" + str(slots) + ": makespan " + hours(statistics.mean(makespans))
+    if len(makespans) > 1:
+        line += " (max " + hours(max(makespans)) + ")"
+    line += ", utilization " + str(int(math.floor(100 * utilization))) + "%" \
+            + ", tail " + hours(tail) + ", lower bound " + hours(bound)
+    print(line)
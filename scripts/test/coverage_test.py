@@ -0,0 +1,65 @@
+import unittest
+
+import importlib.util
+import os
+
+RESOURCES = os.path.join(os.path.dirname(__file__), "resources", "coverage")
+
+# loaded from its file, as "import coverage" could rather give the coverage.py package (eg, with pytest-cov)
+spec = importlib.util.spec_from_file_location("coverage_script", os.path.join(os.path.dirname(__file__), "..", "coverage.py"))
+coverage = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(coverage)
+
+
+class Coverage_Test(unittest.TestCase):
+
+    def test_read_probes_merging_dumps(self):
+        classes = coverage.readProbes(os.path.join(RESOURCES, "two_dumps.exec"))
+
+        assert sorted(classes) == [1, 2, 3]
+        # covered in any of the dumps
+        assert classes[1] == [True, True, False, False, False, False, False, False, False, True]
+        assert classes[2] == [False, False, True, False]
+        assert classes[3] == [True, True]
+
+
+    def test_read_probes_of_included_packages(self):
+        classes = coverage.readProbes(os.path.join(RESOURCES, "two_dumps.exec"), lambda p: p.startswith("org/foo"))
+
+        assert sorted(classes) == [1, 3]
+        assert coverage.probeCoverages([os.path.join(RESOURCES, "two_dumps.exec")],
+                                       lambda p: p.startswith("org/foo")) == [5 / 12]
+
+
+    def test_read_probes_truncated(self):
+        # the last class was not fully written
+        classes = coverage.readProbes(os.path.join(RESOURCES, "truncated.exec"))
+
+        assert classes == {1: [True, True, False]}
+
+
+    def test_own_packages_of_spring_boot_jar(self):
+        include = coverage.ownPackages("boot", os.path.join(RESOURCES, "boot-sut.jar"))
+
+        assert include("org/foo")
+        assert include("org/foo/bar")
+        assert not include("org/springframework/boot/loader")
+        assert not include("com/lib")
+
+
+    def test_own_packages_given(self):
+        coverage.PACKAGES = {"boot": ["com/lib"]}
+        try:
+            include = coverage.ownPackages("boot", os.path.join(RESOURCES, "boot-sut.jar"))
+            assert include("com/lib")
+            assert include("com/lib/x")
+            assert not include("com/library")
+            assert not include("org/foo")
+            # neither given, nor in a Spring Boot jar
+            assert coverage.ownPackages("other", None) is None
+        finally:
+            coverage.PACKAGES = {}
+
+
+if __name__ == '__main__':
+    unittest.main()
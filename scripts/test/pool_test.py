@@ -0,0 +1,183 @@
+import unittest
+import pool
+
+import io
+import os
+import socket
+import tempfile
+import threading
+import time
+
+TOKEN = "secret"
+
+
+class Pool_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = self.tmp.name
+        os.makedirs(os.path.join(self.folder, "scripts"))
+        for s in ["a.sh", "b.sh"]:
+            with open(os.path.join(self.folder, "scripts", s), "w") as f:
+                f.write("echo " + s + "\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def request(self, queue, request, data=b""):
+        request["token"] = TOKEN
+        request["worker"] = "w"
+        return queue.handle(request, io.BytesIO(data))
+
+
+    def test_lease_and_complete(self):
+        queue = pool.Queue(self.folder, ["a.sh", "b.sh"], 10, TOKEN)
+
+        first = self.request(queue, {"command": pool.LEASE})
+        second = self.request(queue, {"command": pool.LEASE})
+        assert {first["script"], second["script"]} == {"a.sh", "b.sh"}
+        assert self.request(queue, {"command": pool.LEASE})["script"] is None
+
+        reply = self.request(queue, {"command": pool.COMPLETE, "lease": first["lease"], "code": 0})
+        assert not reply["done"]
+        reply = self.request(queue, {"command": pool.COMPLETE, "lease": second["lease"], "code": 1})
+        assert reply["done"]
+        assert queue.failed == 1
+
+
+    def test_invalid_token(self):
+        queue = pool.Queue(self.folder, ["a.sh"], 10, TOKEN)
+
+        reply = queue.handle({"command": pool.LEASE, "worker": "w", "token": "wrong"}, io.BytesIO())
+        assert "error" in reply
+        reply = queue.handle({"command": pool.LEASE, "worker": "w"}, io.BytesIO())
+        assert "error" in reply
+        assert queue.waiting == ["a.sh"]
+
+
+    def test_lease_expiry(self):
+        queue = pool.Queue(self.folder, ["a.sh"], 0.001, TOKEN)
+
+        lease = self.request(queue, {"command": pool.LEASE})["lease"]
+        time.sleep(0.1)
+        queue.expire()
+        assert queue.waiting == ["a.sh"]
+        assert self.request(queue, {"command": pool.RENEW, "leases": [lease]})["lost"] == [lease]
+
+        # given to another worker, but the results of the first one still count
+        other = self.request(queue, {"command": pool.LEASE})["lease"]
+        assert other != lease
+        assert self.request(queue, {"command": pool.COMPLETE, "lease": lease, "code": 0})["done"]
+        reply = self.request(queue, {"command": pool.COMPLETE, "lease": other, "code": 0})
+        assert reply["done"]
+        assert queue.completed == {"a.sh"}
+
+
+    def test_renew(self):
+        queue = pool.Queue(self.folder, ["a.sh"], 10, TOKEN)
+
+        lease = self.request(queue, {"command": pool.LEASE})["lease"]
+        _, _, expiration = queue.leases[lease]
+        time.sleep(0.01)
+        assert self.request(queue, {"command": pool.RENEW, "leases": [lease]})["lost"] == []
+        assert queue.leases[lease][2] > expiration
+
+
+    def test_upload(self):
+        queue = pool.Queue(self.folder, ["a.sh"], 10, TOKEN)
+        lease = self.request(queue, {"command": pool.LEASE})["lease"]
+
+        reply = self.request(queue, {"command": pool.UPLOAD, "lease": lease, "path": "reports/s.csv", "size": 3}, b"1,2")
+        assert "error" not in reply
+        with open(os.path.join(self.folder, "reports", "s.csv")) as f:
+            assert f.read() == "1,2"
+
+        # only output folders
+        for path in ["scripts/b.sh", "reports/../scripts/b.sh", "../x", "/tmp/x", "reports"]:
+            reply = self.request(queue, {"command": pool.UPLOAD, "lease": lease, "path": path, "size": 1}, b"x")
+            assert "error" in reply, path
+        with open(os.path.join(self.folder, "scripts", "b.sh")) as f:
+            assert f.read() == "echo b.sh\n"
+
+        # not for unknown leases, or once completed
+        reply = self.request(queue, {"command": pool.UPLOAD, "lease": "foo", "path": "reports/t.csv", "size": 1}, b"x")
+        assert "error" in reply
+        self.request(queue, {"command": pool.COMPLETE, "lease": lease, "code": 0})
+        reply = self.request(queue, {"command": pool.UPLOAD, "lease": lease, "path": "reports/t.csv", "size": 1}, b"x")
+        assert "error" in reply
+        assert not os.path.exists(os.path.join(self.folder, "reports", "t.csv"))
+
+
+    def test_upload_through_symbolic_link(self):
+        with tempfile.TemporaryDirectory() as outside:
+            os.makedirs(os.path.join(self.folder, "logs"))
+            os.symlink(outside, os.path.join(self.folder, "logs", "x"))
+            assert pool.outputPath(self.folder, "logs/x/a.txt") is None
+            assert pool.outputPath(self.folder, "logs/a.txt") == os.path.join(self.folder, "logs", "a.txt")
+
+
+    def test_script_outputs(self):
+        out = os.path.join(self.folder, "reports")
+        tests = os.path.join(self.folder, "tests", "foo")
+        os.makedirs(out)
+        os.makedirs(tests)
+        with open(os.path.join(self.folder, "scripts", "a.sh"), "w") as f:
+            f.write("fake em --testSuiteFileName=EM_foo_1_Test --outputFolder=" + tests
+                    + " --statisticsFile=" + out + "/statistics_foo_1.csv > " + self.folder + "/logs/log_foo_1.txt 2>&1\n")
+
+        start = time.time() - 1
+        # written by this script, or by another one running at the same time
+        for path in [out + "/statistics_foo_1.csv", out + "/statistics_foo_10.csv", tests + "/EM_foo_1_Test.kt",
+                     tests + "/EM_foo_10_Test.kt", os.path.join(self.folder, "scripts", "b.sh")]:
+            with open(path, "w") as f:
+                f.write("x")
+
+        outputs = pool.scriptOutputs(self.folder, "a.sh", start)
+        assert outputs == sorted([out + "/statistics_foo_1.csv", tests + "/EM_foo_1_Test.kt"])
+
+
+    def test_coordinator_and_upload(self):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+
+        pool.CONNECTION_TIMEOUT_SECONDS = 1
+        thread = threading.Thread(target=pool.coordinator, args=(self.folder, port, 10, "127.0.0.1", TOKEN), daemon=True)
+        thread.start()
+
+        def send(request, file=None):
+            request["token"] = TOKEN
+            request["worker"] = "w"
+            for _ in range(50):
+                try:
+                    return pool.send("127.0.0.1", port, request, file)
+                except ConnectionRefusedError:
+                    time.sleep(0.1)
+
+        try:
+            leases = [send({"command": pool.LEASE})["lease"]]
+            # a silent client must not block the coordinator
+            silent = socket.create_connection(("127.0.0.1", port))
+            leases.append(send({"command": pool.LEASE})["lease"])
+            silent.close()
+
+            report = os.path.join(self.tmp.name, "upload.csv")
+            with open(report, "w") as f:
+                f.write("a,b\n1,2\n")
+            send({"command": pool.UPLOAD, "lease": leases[0], "path": "reports/s.csv", "size": 8}, report)
+            assert "error" in send({"command": pool.UPLOAD, "lease": leases[0], "path": "scripts/a.sh", "size": 8}, report)
+            send({"command": pool.COMPLETE, "lease": leases[0], "code": 0})
+            assert send({"command": pool.COMPLETE, "lease": leases[1], "code": 0})["done"]
+        finally:
+            pool.CONNECTION_TIMEOUT_SECONDS = 60
+
+        thread.join(10)
+        assert not thread.is_alive()
+        with open(os.path.join(self.folder, "reports", "s.csv")) as f:
+            assert f.read() == "a,b\n1,2\n"
+        with open(os.path.join(self.folder, "scripts", "a.sh")) as f:
+            assert f.read() == "echo a.sh\n"
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import regression
+
+import os
+
+RESOURCES = os.path.join(os.path.dirname(__file__), "resources", "regression")
+
+
+class Regression_Test(unittest.TestCase):
+
+    def test_measure_a(self):
+        assert regression.measureA([1, 2, 3], [1, 2, 3]) == 0.5
+        assert regression.measureA([4, 5], [1, 2]) == 1
+        assert regression.measureA([1, 2], [4, 5]) == 0
+        # ties count as half
+        assert regression.measureA([1, 2], [2, 3]) == 0.125
+        assert regression.measureA([], [1]) == 0
+
+
+    def test_compare_worse(self):
+        newMedian, baseMedian, change, a12, worse = regression.compare([80, 85, 90], [100, 110, 120], True, 0.05)
+
+        assert newMedian == 85
+        assert baseMedian == 110
+        assert abs(change + 25 / 110) < 0.0001
+        assert a12 == 0
+        assert worse
+
+
+    def test_compare_within_tolerance(self):
+        assert not regression.compare([96, 97, 98], [100, 101, 102], True, 0.05)[4]
+        # for metrics where lower is better, eg, memory
+        assert not regression.compare([104, 105, 106], [100, 101, 102], False, 0.05)[4]
+        assert regression.compare([104, 105, 106], [100, 101, 102], False, 0.02)[4]
+
+
+    def test_compare_negligible_effect(self):
+        # median 6% worse, but the runs of the two builds overlap
+        newMedian, baseMedian, change, a12, worse = regression.compare([1, 94, 200], [2, 100, 150], True, 0.05)
+
+        assert change < -0.05
+        assert abs(a12 - 0.5) < regression.NEGLIGIBLE
+        assert not worse
+
+
+    def test_collect(self):
+        groups = regression.collect(RESOURCES)
+
+        assert list(groups) == [("foo", "default", "EXP")]
+        builds = groups[("foo", "default", "EXP")]
+        assert builds[regression.NEW]["actionsPerSecond"] == {"1": 80, "2": 85, "3": 90}
+        assert builds[regression.BASELINE]["actionsPerSecond"] == {"1": 100, "2": 110, "3": 120}
+        assert builds[regression.BASELINE]["evaluatedTests"] == {"1": 202, "2": 203, "3": 204}
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import schedule
+
+import json
+import os
+import socket
+import tempfile
+import time
+
+
+class Schedule_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def campaign(self, name, weight, scripts):
+        folder = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.join(folder, "scripts"))
+        for i in range(scripts):
+            with open(os.path.join(folder, "scripts", "s" + str(i) + ".sh"), "w") as f:
+                f.write("echo " + str(i) + "\n")
+        with open(os.path.join(folder, "scripts", "notes.txt"), "w") as f:
+            f.write("not a script\n")
+        return schedule.Campaign(folder, weight)
+
+    def start(self, c):
+        # as done by runScript, but without running anything
+        c.running.append(c.scripts.pop(0))
+
+
+    def test_campaign_scripts(self):
+        c = self.campaign("a", 1, 3)
+
+        assert sorted(c.scripts) == ["s0.sh", "s1.sh", "s2.sh"]
+        assert c.total == 3
+        assert not c.done()
+
+
+    def test_fair_share_by_weight(self):
+        a = self.campaign("a", 2, 10)
+        b = self.campaign("b", 1, 10)
+
+        for _ in range(6):
+            self.start(schedule.nextCampaign([a, b]))
+
+        assert len(a.running) == 4
+        assert len(b.running) == 2
+
+
+    def test_fair_share_when_one_completes(self):
+        a = self.campaign("a", 1, 1)
+        b = self.campaign("b", 1, 5)
+
+        for _ in range(4):
+            self.start(schedule.nextCampaign([a, b]))
+        # nothing left to start in a, so b gets all the free slots
+        assert len(a.running) == 1
+        assert len(b.running) == 3
+
+        a.running.clear()
+        assert a.done()
+        assert schedule.nextCampaign([a, b]) is b
+        self.start(b)
+        self.start(b)
+        assert schedule.nextCampaign([a, b]) is None
+
+
+    def test_submit_requires_token(self):
+        folder = self.campaign("a", 1, 2).folder
+        schedule.campaigns.clear()
+        try:
+            reply = schedule.handle({"command": schedule.SUBMIT, "folder": folder, "weight": 1, "token": "wrong"}, "secret")
+            assert not reply["ok"]
+            reply = schedule.handle({"command": schedule.STATUS}, "secret")
+            assert not reply["ok"]
+            assert schedule.campaigns == []
+
+            reply = schedule.handle({"command": schedule.SUBMIT, "folder": folder, "weight": 1, "token": "secret"}, "secret")
+            assert reply == {"ok": True, "scripts": 2}
+            assert len(schedule.campaigns) == 1
+        finally:
+            schedule.campaigns.clear()
+
+
+    def test_silent_or_large_request(self):
+        schedule.CONNECTION_TIMEOUT_SECONDS = 0.2
+        schedule.MAX_REQUEST_BYTES = 100
+        try:
+            # a client that sends no full line must not block the daemon
+            client, server = socket.socketpair()
+            with client:
+                client.sendall(b"{")
+                start = time.time()
+                schedule.handleRequest(server, "secret")
+                assert time.time() - start < 2
+
+            client, server = socket.socketpair()
+            with client:
+                client.sendall(b"x" * 200 + b"\n")
+                schedule.handleRequest(server, "secret")
+                reply = json.loads(client.makefile("rb").readline())
+                assert not reply["ok"]
+        finally:
+            schedule.CONNECTION_TIMEOUT_SECONDS = 5
+            schedule.MAX_REQUEST_BYTES = 64 * 1024
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import triage
+
+import os
+
+RESOURCES = os.path.join(os.path.dirname(__file__), "resources", "triage")
+
+
+class Triage_Test(unittest.TestCase):
+
+    def test_scan_log_with_repeated_run(self):
+        path, segments, whole = triage.scanLog(os.path.join(RESOURCES, "log_em_retry.txt"))
+
+        # 5 executions of EM, but 3 runs, as 2 of them were repeated after running out of memory
+        assert len(segments) == 3
+        # repeated, and then completed without any error, so the first attempt tells what went wrong (if anything)
+        assert segments[0][0] == triage.OOM
+        assert segments[1][0] == triage.EM_EXCEPTION
+        assert segments[1][1].endswith(" at org.evomaster.core.search.service.Archive.addIfNeeded")
+        # repeated, but failed again for another reason
+        assert segments[2] == (triage.EM_EXCEPTION, "[ERROR] EvoMaster process terminated abruptly. at org.evomaster.core.Main.run")
+        assert whole[0] == triage.OOM
+
+
+    def test_classify_by_priority(self):
+        with open(os.path.join(RESOURCES, "log_timeout.txt"), "rb") as f:
+            log = f.read()
+
+        # also a port already in use and an error, but the run was killed because of the timeout
+        assert triage.classify(log, 0, len(log)) == (triage.TIMEOUT, "ERROR: timeout for foo")
+        start = log.index(b"Caused by")
+        assert triage.classify(log, start, log.index(b"ERROR: timeout")) \
+               == (triage.PORT_BIND, "Caused by: java.net.BindException: Address already in use")
+
+
+    def test_classify_em_exception(self):
+        with open(os.path.join(RESOURCES, "log_em_exception.txt"), "rb") as f:
+            log = f.read()
+
+        # without color codes, and with the first frame of EM
+        assert triage.classify(log, 0, len(log)) == \
+               (triage.EM_EXCEPTION, "[ERROR] Invalid parameter --maxTime at org.evomaster.core.EMConfig.validateOptions")
+
+
+    def test_scan_log_completed(self):
+        path, segments, whole = triage.scanLog(os.path.join(RESOURCES, "log_completed.txt"))
+
+        assert segments == [(None, "")]
+        assert whole == (None, "")
+        assert triage.scanLog(os.path.join(RESOURCES, "missing.txt"))[1:] == ([], (None, ""))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+
+# Find out why runs of an experiment folder (FOLDER) failed, by mining their logs.
+# For folders generated by exp.py, a run failed if it has no statistics file in FOLDER/reports (see runs.csv).
+# For each of those, its EM log (ie, the part of log_em_<sut>_<port>.txt of that run) and the log of the
+# driver/SUT (log_sut_<sut>_<port>.txt) are classified into one of the following (a run whose EM was repeated
+# in the same log, eg, with the default heap after an out of memory error, is classified by its last attempt):
+#
+#   TIMEOUT        killed by timeout (see cluster in exp.py)
+#   OOM            out of memory
+#   PORT_BIND      a port was already in use
+#   SUT_START      the SUT did not start
+#   EM_EXCEPTION   EM failed, with the signature of its error (ie, error message and first EM frame)
+#   LAUNCH         a command could not be started, eg, wrong path of a JDK
+#   UNKNOWN        none of the above, eg, the run was not started yet
+#
+# For other folders (eg, the black-box experiments in docs/exp), all logs in the logs folder are classified,
+# reporting only the ones with a failure.
+# Logs are scanned in parallel with a process pool, reading them with mmap, so that large logs are not
+# loaded in memory.
+#
+# Results are written in FOLDER/triage.csv, mapping each failure to its script, SUT, config and seed, and the
+# scripts with at least a failed run are listed in FOLDER/requeue.txt (relative to FOLDER), eg, to run them again.
+#
+# Usage:
+#
+#   triage.py <FOLDER> named_param=? ... named_param=?
+#
+# Named parameters:
+#
+#   logs=<dir>      folder with the logs. Default is FOLDER/logs (ie, local experiments).
+#   njobs=<N>       how many processes to use. Default is the number of CPUs.
+
+import csv
+import mmap
+import multiprocessing
+import os
+import re
+import sys
+
+TIMEOUT = "TIMEOUT"
+OOM = "OOM"
+PORT_BIND = "PORT_BIND"
+SUT_START = "SUT_START"
+EM_EXCEPTION = "EM_EXCEPTION"
+LAUNCH = "LAUNCH"
+UNKNOWN = "UNKNOWN"
+
+# in order of priority, ie, the first matching one is the cause of the failure
+PATTERNS = [
+    (TIMEOUT, re.compile(rb"ERROR: timeout for[^\n]*|DUE TO TIME LIMIT[^\n]*")),
+    (OOM, re.compile(rb"java\.lang\.OutOfMemoryError[^\n]*|Out of memory with[^\n]*")),
+    (PORT_BIND, re.compile(rb"[^\n]*(?:Address already in use|BindException|Port \d+ (?:was|is) already in use)[^\n]*")),
+    (SUT_START, re.compile(rb"[^\n]*(?:Failed to start the SUT|Failed to start the system under test"
+                           rb"|ERROR related to the system under test|APPLICATION FAILED TO START)[^\n]*")),
+    (EM_EXCEPTION, re.compile(rb"\[ERROR\][^\n]*|Exception in thread[^\n]*")),
+    (LAUNCH, re.compile(rb"[^\n]*(?:No such file or directory|command not found)[^\n]*")),
+]
+
+# each EM run starts by printing its version, see Main.kt
+EM_START = re.compile(rb"EvoMaster version:")
+# printed before running EM again in the same run, eg, after an out of memory error (see exp.py)
+EM_RETRY = re.compile(rb"[^\n]*, repeating with default heap")
+EM_FRAME = re.compile(rb"\n\s+at (org\.evomaster\.[^(\n]*)")
+COLORS = re.compile(r"\x1b\[[0-9;]*m")
+
+# see identifier and BASELINE_SUFFIX in exp.py
+BASELINE_SUFFIX = "_baseline"
+
+
+def classify(mm, start, end):
+    for category, pattern in PATTERNS:
+        m = pattern.search(mm, start, end)
+        if m is None:
+            continue
+        detail = COLORS.sub("", m.group(0).decode("utf-8", "replace")).strip()
+        if category == EM_EXCEPTION:
+            frame = EM_FRAME.search(mm, m.end(), end)
+            if frame is not None:
+                detail += " at " + frame.group(1).decode("utf-8", "replace").strip()
+        return category, detail[:300]
+    return None, ""
+
+
+def runBounds(mm):
+    # (start, start of last attempt, end) of each run in the log, where a repeated EM execution (ie, after
+    # a retry message) is part of the same run
+    starts = [m.start() for m in EM_START.finditer(mm)]
+    bounds = []
+    for s, e in zip(starts, starts[1:] + [len(mm)]):
+        if len(bounds) > 0 and EM_RETRY.search(mm, bounds[-1][1], s) is not None:
+            bounds[-1] = (bounds[-1][0], s, e)
+        else:
+            bounds.append((s, s, e))
+    return bounds
+
+
+def classifyRun(mm, start, last, end):
+    # a run that was repeated failed because of its last attempt, if this shows why
+    category, detail = classify(mm, last, end)
+    if category is None and last != start:
+        category, detail = classify(mm, start, end)
+    return category, detail
+
+
+def scanLog(path):
+    # classification of each EM run in the log (if any), and of the whole log
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return path, [], (None, "")
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return path, [classifyRun(mm, s, l, e) for s, l, e in runBounds(mm)], classify(mm, 0, len(mm))
+
+
+def scriptIndex(folder):
+    # script name -> its path relative to folder, eg, in an extend<K> folder
+    index = {}
+    for root, _, names in os.walk(folder):
+        if os.path.basename(root) != "scripts" or os.path.basename(os.path.dirname(root)) == "canary":
+            continue
+        for name in names:
+            if name.endswith(".sh"):
+                index[name] = os.path.relpath(os.path.join(root, name), folder)
+    return index
+
+
+def readRuns(folder):
+    with open(os.path.join(folder, "runs.csv"), newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def failedRuns(folder, runs):
+    reports = os.path.join(folder, "reports")
+    failed = []
+    for r in runs:
+        identifier = "_" + r["sut"] + "_" + r["label"] + "_" + r["seed"] + (BASELINE_SUFFIX if r["config"].endswith(BASELINE_SUFFIX) else "")
+        stats = os.path.join(reports, "statistics" + identifier + ".csv")
+        if not os.path.exists(stats) or os.path.getsize(stats) == 0:
+            failed.append(r)
+    return failed
+
+
+def triageExp(folder, logs, njobs, scripts):
+    runs = readRuns(folder)
+    failed = failedRuns(folder, runs)
+    print("Runs: " + str(len(runs)) + ", without statistics: " + str(len(failed)), flush=True)
+
+    ports = set((r["sut"], r["port"]) for r in failed)
+    paths = []
+    for sut, port in ports:
+        paths.append(os.path.join(logs, "log_em_" + sut + "_" + port + ".txt"))
+        paths.append(os.path.join(logs, "log_sut_" + sut + "_" + port + ".txt"))
+    with multiprocessing.Pool(njobs) as pool:
+        scanned = {path: (segments, whole) for path, segments, whole in pool.map(scanLog, paths)}
+
+    rows = []
+    for sut, port in sorted(ports):
+        emLog = os.path.join(logs, "log_em_" + sut + "_" + port + ".txt")
+        sutLog = os.path.join(logs, "log_sut_" + sut + "_" + port + ".txt")
+        segments, whole = scanned[emLog]
+        # runs of the same script, in the order they were run
+        inScript = [r for r in runs if r["sut"] == sut and r["port"] == port]
+        for r in [r for r in failed if r["sut"] == sut and r["port"] == port]:
+            i = inScript.index(r)
+            # if some runs did not even start, it is not possible to know which part of the log is of which run
+            category, detail = segments[i] if len(segments) == len(inScript) else whole
+            log = emLog
+            if category is None:
+                category, detail = scanned[sutLog][1]
+                log = sutLog
+            if category is None:
+                category, detail, log = UNKNOWN, "", emLog
+            script = scripts.get("evomaster_" + port + "_" + sut + ".sh", "")
+            rows.append([script, sut, r["config"], r["label"], r["seed"], port, category, detail, log])
+    return rows
+
+
+def triageLogs(folder, logs, njobs, scripts):
+    # eg, tool__<sut>__<tool>__<port>.txt, see docs/exp
+    paths = []
+    for root, _, names in os.walk(logs):
+        paths.extend(os.path.join(root, n) for n in names if n.endswith(".txt"))
+    print("Logs: " + str(len(paths)), flush=True)
+    with multiprocessing.Pool(njobs) as pool:
+        scanned = pool.map(scanLog, paths)
+
+    rows = []
+    for path, _, (category, detail) in sorted(scanned):
+        if category is None:
+            continue
+        tokens = os.path.basename(path)[:-len(".txt")].split("__")
+        sut, config, port = (tokens[1], tokens[2], tokens[3]) if len(tokens) == 4 else ("", "", "")
+        script = scripts.get(config + "_" + sut + "_" + port + ".sh", "")
+        rows.append([script, sut, config, "", "", port, category, detail, path])
+    return rows
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage:\ntriage.py <FOLDER> named_param=? ... named_param=?")
+        exit(1)
+
+    folder = os.path.abspath(sys.argv[1])
+    logs = os.path.join(folder, "logs")
+    njobs = os.cpu_count() or 1
+
+    kv = dict(x.split("=", 1) for x in sys.argv[2:])
+    for k in kv:
+        if k not in ["logs", "njobs"]:
+            print("Unrecognized named parameter: " + k)
+            exit(1)
+    if "logs" in kv:
+        logs = os.path.abspath(kv["logs"])
+    if "njobs" in kv:
+        njobs = int(kv["njobs"])
+
+    scripts = scriptIndex(folder)
+    if os.path.exists(os.path.join(folder, "runs.csv")):
+        rows = triageExp(folder, os.path.join(logs, "evomaster") if os.path.isdir(os.path.join(logs, "evomaster")) else logs,
+                         njobs, scripts)
+    else:
+        rows = triageLogs(folder, logs, njobs, scripts)
+
+    with open(os.path.join(folder, "triage.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["script", "sut", "config", "label", "seed", "port", "category", "detail", "log"])
+        writer.writerows(rows)
+
+    requeue = sorted(set(r[0] for r in rows if r[0] != ""))
+    with open(os.path.join(folder, "requeue.txt"), "w") as f:
+        for s in requeue:
+            f.write(s + "\n")
+
+    # summary, per category and SUT
+    counts = {}
+    for r in rows:
+        counts.setdefault(r[6], {})
+        counts[r[6]][r[1]] = counts[r[6]].get(r[1], 0) + 1
+    for category in sorted(counts, key=lambda c: -sum(counts[c].values())):
+        print(category + ": " + str(sum(counts[category].values())) + " ("
+              + ", ".join(s + " " + str(n) for s, n in sorted(counts[category].items(), key=lambda x: -x[1])) + ")")
+    signatures = {}
+    for r in rows:
+        if r[6] == EM_EXCEPTION:
+            signatures[r[7]] = signatures.get(r[7], 0) + 1
+    for signature, n in sorted(signatures.items(), key=lambda x: -x[1]):
+        print("  " + str(n) + "x " + signature)
+
+    print("Failures: " + str(len(rows)) + ", written to " + os.path.join(folder, "triage.csv"))
+    print("Scripts to run again: " + str(len(requeue)) + ", listed in " + os.path.join(folder, "requeue.txt"))
+
+
+# process pool requires this guard, as on some platforms workers import this module
+if __name__ == '__main__':
+    main()
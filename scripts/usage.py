@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+
+# Run a command (ie, an EvoMaster run in the scripts generated by exp.py), and record the resources
+# it used, together with the ones used in the meantime by an already running process tree (ie, the driver
+# and the SUT it started).
+# For each of the two, this records CPU time, peak memory (RSS), disk I/O and time spent in GC (for JVMs).
+# For EM and the driver JVMs, the peak of their used heap is recorded as well, eg, to choose their -Xmx in exp.py.
+# Results are appended as a row to the given CSV file, together with the SUT name, seed, label and config of
+# the run, so that they can be joined with the statistics files (ie, on id, labelForExperiments and
+# labelForExperimentConfigs, plus the seed that is in the name of the statistics file).
+#
+# Usage:
+#
+#   usage.py <CSV> <ID> <SEED> <LABEL> <CONFIG> <BUDGET> <PID> -- <command>
+#
+# Resources are read from /proc every few seconds, so this works only on Linux. On other systems, the command
+# is just run, without recording anything.
+
+import getpass
+import os
+import signal
+import struct
+import subprocess
+import sys
+import time
+
+INTERVAL_SECONDS = 2
+
+COLUMNS = ["id", "seed", "labelForExperiments", "labelForExperimentConfigs", "elapsedSeconds",
+           "emCpuSeconds", "emPeakRssMB", "emReadMB", "emWriteMB", "emGcSeconds",
+           "driverCpuSeconds", "driverPeakRssMB", "driverReadMB", "driverWriteMB", "driverGcSeconds",
+           "budget", "emPeakHeapMB", "driverPeakHeapMB"]
+
+MB = 1024 * 1024
+
+
+def parents():
+    # pid -> parent pid, for all running processes
+    result = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open("/proc/" + name + "/stat") as f:
+                # command name is in parentheses, and might contain spaces
+                fields = f.read().rsplit(")", 1)[1].split()
+            result[int(name)] = int(fields[1])
+        except (OSError, IndexError):
+            pass
+    return result
+
+
+def tree(root, ppids):
+    pids = [root]
+    for pid in pids:
+        pids.extend(p for p, parent in ppids.items() if parent == pid)
+    return pids
+
+
+def cpuSeconds(pid):
+    with open("/proc/" + str(pid) + "/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime and stime, ie, fields 14 and 15 in proc(5)
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def rssBytes(pid):
+    with open("/proc/" + str(pid) + "/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def ioBytes(pid):
+    values = {}
+    with open("/proc/" + str(pid) + "/io") as f:
+        for line in f:
+            k, v = line.split(":")
+            values[k] = int(v)
+    return values["read_bytes"], values["write_bytes"]
+
+
+def perfCounters(pid):
+    # performance counters that JVMs export by default in hsperfdata files. None if not a JVM
+    try:
+        with open(os.path.join("/tmp", "hsperfdata_" + getpass.getuser(), str(pid)), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < 32 or struct.unpack_from(">I", data, 0)[0] != 0xcafec0c0:
+        return None
+    order = "<" if data[4] == 1 else ">"
+    entryOffset, numEntries = struct.unpack_from(order + "ii", data, 24)
+    counters = {}
+    offset = entryOffset
+    for _ in range(numEntries):
+        length, nameOffset, vectorLength, dataType, _, _, _, dataOffset = struct.unpack_from(order + "iiicccci", data, offset)
+        if dataType == b"J" and vectorLength == 0:
+            end = data.index(b"\0", offset + nameOffset)
+            name = data[offset + nameOffset:end].decode("ascii", "replace")
+            counters[name] = struct.unpack_from(order + "q", data, offset + dataOffset)[0]
+        offset += length
+    return counters
+
+
+def gcSeconds(counters):
+    # total time in GC
+    frequency = counters.get("sun.os.hrt.frequency")
+    if not frequency:
+        return None
+    ticks = sum(v for k, v in counters.items() if k.startswith("sun.gc.collector.") and k.endswith(".time"))
+    return ticks / frequency
+
+
+def heapBytes(counters):
+    # used heap, in all spaces of all generations
+    return sum(v for k, v in counters.items() if k.startswith("sun.gc.generation.") and ".space." in k and k.endswith(".used"))
+
+
+# Resources used by a process tree, sampled over time.
+# As processes might already be running at the beginning, what they used before is subtracted.
+class Usage:
+    def __init__(self, root, ppids):
+        self.root = root
+        self.baseline = {}
+        self.last = {}
+        self.peakRss = 0
+        self.peakHeap = None
+        self.gc = {}
+        self.gcBaseline = {}
+        for pid in tree(root, ppids):
+            values = self.read(pid)
+            if values is not None:
+                self.baseline[pid] = values
+                self.last[pid] = values
+            counters = perfCounters(pid)
+            gc = None if counters is None else gcSeconds(counters)
+            if gc is not None:
+                self.gcBaseline[pid] = gc
+                self.gc[pid] = gc
+
+    def read(self, pid):
+        try:
+            return (cpuSeconds(pid),) + ioBytes(pid)
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def sample(self, ppids):
+        rss = 0
+        for pid in tree(self.root, ppids):
+            values = self.read(pid)
+            if values is not None:
+                self.last[pid] = values
+            try:
+                rss += rssBytes(pid)
+            except OSError:
+                pass
+            counters = perfCounters(pid)
+            if counters is None:
+                continue
+            gc = gcSeconds(counters)
+            if gc is not None:
+                self.gc[pid] = gc
+            if pid == self.root:
+                self.peakHeap = max(self.peakHeap or 0, heapBytes(counters))
+        self.peakRss = max(self.peakRss, rss)
+
+    def totals(self):
+        # cpu, read, write
+        result = [0, 0, 0]
+        for pid, values in self.last.items():
+            base = self.baseline.get(pid, (0, 0, 0))
+            for i in range(3):
+                result[i] += values[i] - base[i]
+        gc = None
+        if len(self.gc) > 0:
+            gc = sum(v - self.gcBaseline.get(pid, 0) for pid, v in self.gc.items())
+        return result, gc
+
+
+def fmt(value):
+    return "" if value is None else "{:.3f}".format(value)
+
+
+def mb(value):
+    return "" if value is None else fmt(value / MB)
+
+
+def main():
+    if len(sys.argv) < 10 or sys.argv[8] != "--":
+        print("Usage:\nusage.py <CSV> <ID> <SEED> <LABEL> <CONFIG> <BUDGET> <PID> -- <command>", flush=True)
+        exit(1)
+
+    csvFile, sutId, seed, label, config, budget, driverPid = sys.argv[1:8]
+    command = sys.argv[9:]
+
+    if not os.path.isdir("/proc"):
+        exit(subprocess.call(command))
+
+    start = time.time()
+    driver = Usage(int(driverPid), parents())
+    process = subprocess.Popen(command)
+    em = Usage(process.pid, {})
+
+    # eg, when killed by timeout, still record what used so far
+    def terminate(signum, frame):
+        process.send_signal(signum)
+    signal.signal(signal.SIGTERM, terminate)
+    signal.signal(signal.SIGINT, terminate)
+
+    rusage = None
+    while rusage is None:
+        ppids = parents()
+        driver.sample(ppids)
+        em.sample(ppids)
+        waited, status, rusage = os.wait4(process.pid, os.WNOHANG)
+        if waited == 0:
+            rusage = None
+            time.sleep(INTERVAL_SECONDS)
+    code = os.waitstatus_to_exitcode(status) if hasattr(os, "waitstatus_to_exitcode") else status >> 8
+
+    (emCpu, emRead, emWrite), emGc = em.totals()
+    # once completed, exact values are available for the process of the command and its children
+    emCpu = max(emCpu, rusage.ru_utime + rusage.ru_stime)
+    emPeak = max(em.peakRss, rusage.ru_maxrss * 1024)
+    (driverCpu, driverRead, driverWrite), driverGc = driver.totals()
+
+    exists = os.path.exists(csvFile)
+    with open(csvFile, "a") as f:
+        if not exists:
+            f.write(",".join(COLUMNS) + "\n")
+        f.write(",".join([sutId, seed, label, config, fmt(time.time() - start),
+                          fmt(emCpu), fmt(emPeak / MB), fmt(emRead / MB), fmt(emWrite / MB), fmt(emGc),
+                          fmt(driverCpu), fmt(driver.peakRss / MB), fmt(driverRead / MB), fmt(driverWrite / MB),
+                          fmt(driverGc), budget, mb(em.peakHeap), mb(driver.peakHeap)]) + "\n")
+
+    exit(code)
+
+
+if __name__ == '__main__':
+    main()
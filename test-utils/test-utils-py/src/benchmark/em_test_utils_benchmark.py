@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+# Micro-benchmarks for the utilities in em_test_utils.py, which is copied next to each
+# generated Python test suite.
+# To compare before/after a change, it reports both the current implementation and the
+# baseline of what generated tests were doing before, ie running the full rfc3986 validator on
+# each call, and parsing the JSON body of a response again in each assertion on it.
+#
+# Usage, from test-utils-py folder:
+#
+#   python src/benchmark/em_test_utils_benchmark.py
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import timeit
+
+RESOURCES = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "main", "resources"))
+sys.path.insert(0, RESOURCES)
+
+import em_test_utils
+
+IMPORT_REPETITIONS = 15
+CALLS = 20000
+
+URIS = [
+    "/a/5",
+    "/api/users/42?expand=true&fields=name",
+    "http://localhost:8080/api/items/17",
+    "https://127.0.0.1:443/a/b/c#x",
+    "a",
+    "http://example.com:port",
+    "//foo.org/a",
+]
+
+
+def _import_time(statement):
+    code = "import time; s = time.perf_counter(); " + statement + "; print(time.perf_counter() - s)"
+    times = []
+    for _ in range(IMPORT_REPETITIONS):
+        out = subprocess.run([sys.executable, "-c", code], cwd=RESOURCES, check=True,
+                             stdout=subprocess.PIPE, universal_newlines=True).stdout
+        times.append(float(out.strip()))
+    return statistics.median(times)
+
+
+def _baseline_is_valid_uri_or_empty(uri):
+    from rfc3986 import validators, uri_reference
+
+    if uri is None or uri.strip() == "":
+        return True
+
+    validated_components = {
+        "scheme": False,
+        "userinfo": False,
+        "host": False,
+        "port": False,
+        "path": False,
+        "query": False,
+        "fragment": False,
+    }
+
+    try:
+        validators.ensure_components_are_valid(uri_reference(uri), validated_components)
+    except Exception:
+        return False
+
+    return True
+
+
+def _per_call(function):
+    loop = lambda: [function(u) for u in URIS]
+    number = CALLS // len(URIS)
+    seconds = timeit.timeit(loop, number=number)
+    return seconds / (number * len(URIS)) * 1_000_000
+
+
+class _FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def json(self):
+        # what requests does, when no encoding is specified
+        return json.loads(self.content)
+
+
+def _json_per_test(body, assertions):
+    """
+    Per-test cost of handling a JSON request body and response, with as many assertions on the response
+    as there are fields in it: before (ie, inline string body, and response.json() in each assertion)
+    and after using encode_json_body/response_json
+    """
+    literal = json.dumps(body)
+    content = literal.encode("utf-8")
+    constant = em_test_utils.encode_json_body(literal)
+
+    def before():
+        data = literal.encode("utf-8")  # done by http.client for each call
+        r = _FakeResponse(content)
+        for _ in range(assertions):
+            r.json()
+
+    def after():
+        data = constant
+        r = _FakeResponse(content)
+        for _ in range(assertions):
+            em_test_utils.response_json(r)
+
+    number = 500
+    return [timeit.timeit(f, number=number) / number * 1_000_000 for f in (before, after)]
+
+
+def main():
+    for u in URIS:
+        assert em_test_utils.is_valid_uri_or_empty(u) == _baseline_is_valid_uri_or_empty(u), u
+
+    before = _import_time("import em_test_utils; from rfc3986 import validators, uri_reference")
+    after = _import_time("import em_test_utils")
+    print("Import time of em_test_utils (median of " + str(IMPORT_REPETITIONS) + " fresh interpreters)")
+    print("  baseline (eager rfc3986): {:.2f} ms".format(before * 1000))
+    print("  current (lazy rfc3986):   {:.2f} ms".format(after * 1000))
+
+    before = _per_call(_baseline_is_valid_uri_or_empty)
+    after = _per_call(em_test_utils.is_valid_uri_or_empty)
+    print("is_valid_uri_or_empty, per call (" + str(CALLS) + " calls on " + str(len(URIS)) + " URIs)")
+    print("  baseline (full validator): {:.2f} us".format(before))
+    print("  current (fast path/cache): {:.2f} us".format(after))
+
+    body = {"items": [{"id": i, "name": "item" + str(i), "tags": ["a", "b"], "price": i * 1.5} for i in range(200)]}
+    before, after = _json_per_test(body, 20)
+    print("JSON body and response handling, per test (" + str(len(json.dumps(body))) + " bytes, 20 assertions, orjson "
+          + ("installed" if em_test_utils.orjson is not None else "not installed") + ")")
+    print("  baseline (parse in each assertion): {:.2f} us".format(before))
+    print("  current (parsed once):              {:.2f} us".format(after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+
+# Benchmark of generated Python test suites (ie, PYTHON_UNITTEST), run against a local HTTP stub served
+# in-process, so that no SUT is needed.
+# Suites of increasing size are generated with the same code patterns written by the Python test writer,
+# for three kinds of tests:
+#
+#   chained   a resource is created with a large JSON body, and then it, and a sub-resource, are accessed
+#             based on the returned locations (ie, resolve_location and is_valid_uri_or_empty)
+#   large     GET of a large JSON array, with many assertions on its fields
+#   auth      login to get cookies, followed by several calls with them
+#
+# Each suite is generated both with the default options of EM, and with the ones meant to speed up the
+# tests (ie, fastJsonInPythonTests and cacheLoginInTests), and it is run with unittest. For each run,
+# it is reported how many tests and HTTP calls (as seen by the stub) are done per second.
+# The largest suite of each kind is also run with cProfile, to report how much of its time is spent in
+# each of the generated code patterns.
+#
+# Usage, from test-utils-py folder:
+#
+#   python src/benchmark/generated_suite_benchmark.py [size ...]
+#
+# where each size is a number of tests in a suite. Default is 10, 100 and 500.
+
+import cProfile
+import http.server
+import importlib.util
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+RESOURCES = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "main", "resources"))
+sys.path.insert(0, RESOURCES)
+
+import em_test_utils
+
+SIZES = [10, 100, 500]
+KINDS = ["chained", "large", "auth"]
+# default options of EM, and fastJsonInPythonTests=true plus cacheLoginInTests=true
+STYLES = ["default", "fast"]
+
+# number of elements in the large JSON array, and on how many of them there are assertions
+LARGE_ITEMS = 200
+LARGE_ASSERTED = 20
+# number of fields of the JSON body used to create a resource
+BODY_FIELDS = 50
+# number of calls done with the cookies, in each auth test
+AUTH_CALLS = 5
+
+SESSION = "JSESSIONID"
+
+# generated code pattern -> functions implementing it, as (file name suffix, function name) in cProfile stats
+PATTERNS = {
+    "HTTP calls (requests)": [("requests/api.py", "request")],
+    "response.json()": [("requests/models.py", "json")],
+    "response_json": [("em_test_utils.py", "response_json")],
+    "resolve_location": [("em_test_utils.py", "resolve_location")],
+    "is_valid_uri_or_empty": [("em_test_utils.py", "is_valid_uri_or_empty")],
+    "dict_from_cookiejar": [("requests/utils.py", "dict_from_cookiejar")],
+}
+
+
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Stub of a REST API with login, resources and sub-resources. Responses only depend on the
+    requested paths, so that no state has to be kept among calls
+    """
+
+    protocol_version = "HTTP/1.1"
+    calls = 0
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self):
+        with _StubHandler.lock:
+            _StubHandler.calls += 1
+
+    def _send(self, status, body=None, headers=None):
+        content = b"" if body is None else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _authenticated(self):
+        return (SESSION + "=") in self.headers.get("Cookie", "")
+
+    def do_POST(self):
+        self._count()
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        path = self.path.split("?")[0]
+        if path == "/api/login":
+            self._send(200, {"logged": True}, {"Set-Cookie": SESSION + "=42; Path=/"})
+            return
+        if not self._authenticated():
+            self._send(401)
+            return
+        m = re.fullmatch(r"/api/items/(\d+)/reviews", path)
+        if m is not None:
+            self._send(201, {"id": 7}, {"Location": path + "/7"})
+        elif path == "/api/items":
+            self._send(201, {"id": 3}, {"Location": "/api/items/3"})
+        else:
+            self._send(404)
+
+    def do_GET(self):
+        self._count()
+        path, _, query = self.path.partition("?")
+        if path == "/api/items":
+            size = int(query.split("=")[1]) if query.startswith("size=") else LARGE_ITEMS
+            self._send(200, [_item(i) for i in range(size)])
+            return
+        if not self._authenticated():
+            self._send(401)
+            return
+        m = re.fullmatch(r"/api/items/(\d+)(?:/reviews/(\d+))?", path)
+        if m is None:
+            self._send(404)
+        elif m.group(2) is not None:
+            self._send(200, {"id": int(m.group(2)), "item": int(m.group(1)), "stars": 4, "text": "fine"})
+        else:
+            self._send(200, _item(int(m.group(1))))
+
+
+def _item(i):
+    return {"id": i, "name": "item" + str(i), "price": i * 1.5, "available": i % 2 == 0,
+            "tags": ["a", "b"], "owner": {"id": i, "name": "owner" + str(i)}}
+
+
+def start_stub():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+### Generation of the test suites, as done by the Python test writer ###
+
+def _body_lines():
+    # JSON body split on several lines, as done for large bodies
+    fields = ["\" \\\"field" + str(i) + "\\\": \\\"value" + str(i) + "\\\"" + ("," if i < BODY_FIELDS - 1 else "") + " \""
+              for i in range(BODY_FIELDS)]
+    return ["\" { \""] + fields + ["\" } \""]
+
+
+def _login_call(lines, receiver):
+    lines.append("        headers = {}")
+    lines.append("        headers[\"content-type\"] = \"application/x-www-form-urlencoded\"")
+    lines.append("        body = \"username=foo&password=bar\"")
+    lines.append("        cookies_foo_jar = requests \\")
+    lines.append("                .post(" + receiver + ".baseUrlOfSut + \"/api/login\", ")
+    lines.append("                    headers=headers, data=body).cookies")
+    lines.append("        cookies_foo = requests.utils.dict_from_cookiejar(cookies_foo_jar)")
+
+
+def _login(lines, style):
+    if style == "fast":
+        lines.append("        cookies_foo = self.auth_cache.get(\"cookies_foo\", self.login_cookies_foo)")
+        return
+    _login_call(lines, "self")
+    lines.append("")
+
+
+def _json(style, res):
+    return "response_json(" + res + ")" if style == "fast" else res + ".json()"
+
+
+def _status(lines, style, res, code):
+    lines.append("")
+    if style == "fast":
+        # as in HttpWsTestCaseWriter, the call is repeated with new cookies if the cached ones are rejected
+        lines.append("        " + res + " = self.auth_cache.check(" + res + ", \"cookies_foo\", self.login_cookies_foo)")
+        lines.append("        cookies_foo = self.auth_cache.get(\"cookies_foo\", self.login_cookies_foo)")
+    lines.append("        assert " + res + ".status_code == " + str(code))
+
+
+def _headers(lines, body=False):
+    lines.append("        headers = {}")
+    lines.append("        headers['Accept'] = \"application/json\"")
+    if body:
+        lines.append("        headers[\"content-type\"] = \"application/json\"")
+
+
+def _request(lines, res, verb, url, cookies=True, body=False):
+    lines.append("        " + res + " = requests \\")
+    lines.append("                ." + verb + "(" + url + ",")
+    lines.append("                    headers=headers" + (", cookies=cookies_foo" if cookies else "") + (", data=body" if body else "") + ")")
+
+
+def _chained_test(lines, style):
+    _login(lines, style)
+    _headers(lines, body=True)
+    if style == "fast":
+        lines.append("        body = BODY_0")
+    else:
+        body = _body_lines()
+        lines.append("        body = " + body[0] + " + \\")
+        for b in body[1:-1]:
+            lines.append("            " + b + " + \\")
+        lines.append("            " + body[-1])
+    lines.append("")
+    _request(lines, "res_0", "post", "self.baseUrlOfSut + \"/api/items\"", body=True)
+    _status(lines, style, "res_0", 201)
+    lines.append("        location_items = res_0.headers['location']")
+    lines.append("        assert is_valid_uri_or_empty(location_items)")
+    lines.append("")
+
+    _headers(lines)
+    _request(lines, "res_1", "get", "resolve_location(location_items, self.baseUrlOfSut + str(\"/api/items/{id}\"))")
+    _status(lines, style, "res_1", 200)
+    lines.append("        assert \"application/json\" in res_1.headers[\"content-type\"]")
+    for field, value in [("id", "3"), ("name", "\"item3\""), ("price", "4.5"), ("available", "False")]:
+        lines.append("        assert " + _json(style, "res_1") + "[\"" + field + "\"] == " + value)
+    lines.append("        assert len(" + _json(style, "res_1") + "[\"tags\"]) == 2")
+    lines.append("        assert " + _json(style, "res_1") + "[\"owner\"][\"name\"] == \"owner3\"")
+    lines.append("")
+
+    _headers(lines, body=True)
+    lines.append("        body = \" { \\\"stars\\\": 4 } \"")
+    lines.append("")
+    _request(lines, "res_2", "post", "resolve_location(location_items, self.baseUrlOfSut + str(\"/api/items/{id}/reviews\"))", body=True)
+    _status(lines, style, "res_2", 201)
+    lines.append("        location_reviews = res_2.headers['location']")
+    lines.append("        assert is_valid_uri_or_empty(location_reviews)")
+    lines.append("")
+
+    _headers(lines)
+    _request(lines, "res_3", "get", "resolve_location(location_reviews, self.baseUrlOfSut + str(\"/api/items/{id}/reviews/{rid}\"))")
+    _status(lines, style, "res_3", 200)
+    lines.append("        assert \"application/json\" in res_3.headers[\"content-type\"]")
+    for field, value in [("id", "7"), ("item", "3"), ("stars", "4"), ("text", "\"fine\"")]:
+        lines.append("        assert " + _json(style, "res_3") + "[\"" + field + "\"] == " + value)
+
+
+def _large_test(lines, style):
+    lines.append("")
+    _headers(lines)
+    _request(lines, "res_0", "get", "self.baseUrlOfSut + \"/api/items?size=" + str(LARGE_ITEMS) + "\"", cookies=False)
+    lines.append("")
+    lines.append("        assert res_0.status_code == 200")
+    lines.append("        assert \"application/json\" in res_0.headers[\"content-type\"]")
+    lines.append("        assert len(" + _json(style, "res_0") + ") == " + str(LARGE_ITEMS))
+    for i in range(LARGE_ASSERTED):
+        lines.append("        assert " + _json(style, "res_0") + "[" + str(i) + "][\"name\"] == \"item" + str(i) + "\"")
+        lines.append("        assert " + _json(style, "res_0") + "[" + str(i) + "][\"owner\"][\"id\"] == " + str(i))
+
+
+def _auth_test(lines, style):
+    _login(lines, style)
+    for i in range(AUTH_CALLS):
+        res = "res_" + str(i)
+        lines.append("")
+        _headers(lines)
+        _request(lines, res, "get", "self.baseUrlOfSut + \"/api/items/" + str(i) + "\"")
+        _status(lines, style, res, 200)
+        lines.append("        assert " + _json(style, res) + "[\"id\"] == " + str(i))
+
+
+GENERATORS = {"chained": _chained_test, "large": _large_test, "auth": _auth_test}
+
+
+def generate_suite(kind, style, size, base_url):
+    lines = ["#!/usr/bin/env python", "", "import json", "import unittest", "import requests",
+             "from em_test_utils import *", ""]
+    if style == "fast" and kind == "chained":
+        body = _body_lines()
+        lines.append("")
+        lines.append("# Request bodies, encoded only once when this module is loaded")
+        lines.append("BODY_0 = encode_json_body(" + body[0] + " + \\")
+        for b in body[1:-1]:
+            lines.append("    " + b + " + \\")
+        lines.append("    " + body[-1] + ")")
+    lines.append("")
+    lines.append("")
+    lines.append("class EvoMaster_" + kind + "_" + style + "_Test(unittest.TestCase):")
+    lines.append("")
+    lines.append("    baseUrlOfSut = \"" + base_url + "\"")
+    if style == "fast" and kind != "large":
+        lines.append("")
+        lines.append("    @classmethod")
+        lines.append("    def setUpClass(cls):")
+        lines.append("        cls.auth_cache = AuthCache()")
+        lines.append("")
+        lines.append("")
+        lines.append("    @classmethod")
+        lines.append("    def login_cookies_foo(cls):")
+        _login_call(lines, "cls")
+        lines.append("        return cookies_foo")
+    for i in range(size):
+        lines.append("")
+        lines.append("")
+        lines.append("    def test_" + str(i) + "(self):")
+        lines.append("        ")
+        GENERATORS[kind](lines, style)
+    lines.append("")
+    return "\n".join(lines)
+
+
+def load_suite(folder, kind, style, size, base_url):
+    name = "EvoMaster_" + kind + "_" + style + "_" + str(size) + "_Test"
+    path = os.path.join(folder, name + ".py")
+    with open(path, "w") as f:
+        f.write(generate_suite(kind, style, size, base_url))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return unittest.defaultTestLoader.loadTestsFromModule(module)
+
+
+def run_suite(suite):
+    calls = _StubHandler.calls
+    start = time.perf_counter()
+    result = unittest.TextTestRunner(stream=io.StringIO(), verbosity=0).run(suite)
+    seconds = time.perf_counter() - start
+    if not result.wasSuccessful():
+        problems = result.failures + result.errors
+        raise Exception(str(len(problems)) + " generated tests failed, eg:\n" + problems[0][1])
+    return result.testsRun, _StubHandler.calls - calls, seconds
+
+
+def pattern_times(stats):
+    # cumulative seconds spent in each of the generated code patterns
+    times = {}
+    for (file, _, function), (_, _, _, cumulative, _) in stats.stats.items():
+        file = file.replace(os.sep, "/")
+        for pattern, functions in PATTERNS.items():
+            if any(file.endswith(f) and function == fn for f, fn in functions):
+                times[pattern] = times.get(pattern, 0) + cumulative
+    return times
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] if len(sys.argv) > 1 else SIZES
+    server = start_stub()
+    base_url = "http://127.0.0.1:" + str(server.server_address[1])
+    print("Stub SUT at " + base_url + ", orjson " + ("installed" if em_test_utils.orjson is not None else "not installed"))
+
+    with tempfile.TemporaryDirectory() as folder:
+        print("{:<8} {:<8} {:>6} {:>7} {:>9} {:>10} {:>10}".format(
+            "kind", "style", "tests", "calls", "seconds", "tests/s", "calls/s"))
+        for kind in KINDS:
+            for size in sizes:
+                for style in STYLES:
+                    suite = load_suite(folder, kind, style, size, base_url)
+                    tests, calls, seconds = run_suite(suite)
+                    print("{:<8} {:<8} {:>6} {:>7} {:>9.3f} {:>10.1f} {:>10.1f}".format(
+                        kind, style, tests, calls, seconds, tests / seconds, calls / seconds))
+
+        size = max(sizes)
+        print("\nTime spent in generated code patterns, on " + str(size) + " tests")
+        for kind in KINDS:
+            for style in STYLES:
+                suite = load_suite(folder, kind, style, size, base_url)
+                profiler = cProfile.Profile()
+                start = time.perf_counter()
+                profiler.runcall(run_suite, suite)
+                seconds = time.perf_counter() - start
+                times = pattern_times(pstats.Stats(profiler))
+                print(kind + " " + style + " (" + "{:.3f}".format(seconds) + " s, profiled): " + ", ".join(
+                    p + " {:.1f}%".format(100 * t / seconds) for p, t in sorted(times.items(), key=lambda x: -x[1])))
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,45 @@
+import csv
+import json
+import os
+import re
+from functools import lru_cache
 from urllib.parse import urlparse, quote
-from rfc3986 import validators, uri_reference
+
+try:
+    # much faster than the json module in the standard library, but optional
+    import orjson
+except ImportError:
+    orjson = None
+
+# Well-formed URIs as commonly seen in HTTP responses, eg in Location headers.
+# These are accepted directly, without needing the full RFC 3986 validator.
+# Anything not matching here (eg, ports with 5 digits, IPv6 hosts or paths without
+# a leading '/') is not necessarily invalid, and it is checked with rfc3986 instead.
+_PCHAR = r"(?:[A-Za-z0-9\-._~!$&'()*+,;=:@]|%[0-9A-Fa-f]{2})"
+_FAST_VALID_URI = re.compile(
+    r"(?:[A-Za-z][A-Za-z0-9+\-.]*://[A-Za-z0-9\-.]+(?::[0-9]{1,4})?)?"
+    r"(?:/" + _PCHAR + r"*)*"
+    r"(?:\?(?:" + _PCHAR + r"|[/?])*)?"
+    r"(?:#(?:" + _PCHAR + r"|[/?])*)?"
+)
+
+# Hosts made only of digits and dots might be IPv4 addresses with out of range octets (eg, 999.999.999.999),
+# which are not checked by the fast path above
+_NUMERIC_HOST = re.compile(r"[A-Za-z][A-Za-z0-9+\-.]*://[0-9.]+(?:[:/?#]|$)")
+
+_VALIDATED_COMPONENTS = ("scheme", "userinfo", "host", "port", "path", "query", "fragment")
+
+# Environment variable specifying where latency reports are saved. If not set, current working directory is used
+LATENCY_REPORT_DIR = "EM_LATENCY_REPORT_DIR"
+
+# (method, path template, status code, latency in ms) for each HTTP call done since last written report
+_latency_records = []
+
+# marker for responses whose JSON body has not been parsed yet
+_NOT_PARSED = object()
+
+_LONG_NUMBER = re.compile(rb"[0-9]{19}")
+
 
 def resolve_location(location_header: str, expected_template: str) -> str:
     if not location_header:
@@ -28,20 +68,167 @@ def is_valid_uri_or_empty(uri: str):
     if uri is None or uri.strip() == "":
         return True
 
-    validated_components = {
-        "scheme": False,
-        "userinfo": False,
-        "host": False,
-        "port": False,
-        "path": False,
-        "query": False,
-        "fragment": False,
-    }
-    
+    # a "//" prefix is a network-path reference, whose authority must be fully checked
+    if not uri.startswith("//") and not _NUMERIC_HOST.match(uri) and _FAST_VALID_URI.fullmatch(uri):
+        return True
+
+    return _is_valid_uri(uri)
+
+
+@lru_cache(maxsize=1024)
+def _is_valid_uri(uri: str) -> bool:
+    # importing rfc3986 is not cheap, and most generated tests never need it
+    from rfc3986 import validators, uri_reference
+
     try:
-        validators.ensure_components_are_valid(uri_reference(uri), validated_components)
+        validators.ensure_components_are_valid(uri_reference(uri), _VALIDATED_COMPONENTS)
     except Exception as e:
         return False
-    
+
     return True
-    
\ No newline at end of file
+
+
+def record_latency(method: str, path_template: str, response):
+    """
+    Keep track of how long the given HTTP call took, based on the elapsed time measured by requests
+    (ie, from sending the request until the response headers are parsed).
+    The response is returned as it is, so this function can wrap the HTTP calls in the tests.
+    """
+    _latency_records.append((method, path_template, response.status_code, response.elapsed.total_seconds() * 1000))
+    return response
+
+
+def _percentile(sorted_values, p):
+    # linear interpolation between closest ranks
+    k = (len(sorted_values) - 1) * p / 100
+    f = int(k)
+    c = min(f + 1, len(sorted_values) - 1)
+    return sorted_values[f] + (sorted_values[c] - sorted_values[f]) * (k - f)
+
+
+def latency_summary(records):
+    """
+    Aggregate latency records per endpoint, ie (method, path template), sorted from the slowest one based on p95
+    """
+    endpoints = {}
+    for method, path, status, latency in records:
+        endpoints.setdefault((method, path), []).append((status, latency))
+
+    summary = []
+    for (method, path), calls in endpoints.items():
+        latencies = sorted(latency for _, latency in calls)
+        statuses = {}
+        for status, _ in calls:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        summary.append({
+            "method": method,
+            "path": path,
+            "calls": len(latencies),
+            "statuses": statuses,
+            "mean_ms": sum(latencies) / len(latencies),
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "p99_ms": _percentile(latencies, 99),
+            "max_ms": latencies[-1],
+        })
+
+    summary.sort(key=lambda e: -e["p95_ms"])
+    return summary
+
+
+def write_latency_report(name: str):
+    """
+    Save the latency summary of all HTTP calls recorded so far into <name>_latency.json and <name>_latency.csv files.
+    Recorded calls are then cleared, so that each test class gets its own report.
+    """
+    global _latency_records
+    records = _latency_records
+    _latency_records = []
+    if len(records) == 0:
+        return
+
+    folder = os.environ.get(LATENCY_REPORT_DIR, ".")
+    os.makedirs(folder, exist_ok=True)
+    summary = latency_summary(records)
+
+    with open(os.path.join(folder, name + "_latency.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+
+    columns = ["method", "path", "calls", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    with open(os.path.join(folder, name + "_latency.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for e in summary:
+            writer.writerow([e[c] for c in columns])
+
+
+class AuthCache:
+    """
+    Credentials (eg, auth tokens or cookies) obtained from login calls, shared among all tests in a class,
+    so that each login is done only once and not in each single test.
+    If a call done with cached credentials is rejected with a 401 (eg, as they expired, or the SUT was
+    restarted), login is done again, and the call is repeated once with the new credentials.
+    """
+
+    def __init__(self):
+        self._credentials = {}
+
+    def get(self, name: str, login):
+        if name not in self._credentials:
+            self._credentials[name] = login()
+        return self._credentials[name]
+
+    def check(self, response, name: str, login, header: str = None):
+        """
+        Return the response of the call, repeated with new credentials if the cached ones were rejected.
+        Tokens are sent in the given header, whereas cookies are used when no header is given.
+        """
+        if response.status_code != 401:
+            return response
+        self._credentials.pop(name, None)
+        credentials = self.get(name, login)
+
+        request = response.request.copy()
+        if header is not None:
+            request.headers[header] = credentials
+        else:
+            # only set by prepare_cookies() if not already present
+            request.headers.pop("Cookie", None)
+            request.prepare_cookies(credentials)
+
+        import requests
+        with requests.Session() as session:
+            return session.send(request)
+
+
+def encode_json_body(body: str) -> bytes:
+    """
+    Encode a JSON body literal into the bytes sent by requests.
+    The body is not parsed, as it might be invalid on purpose.
+    """
+    return body.encode("utf-8")
+
+
+def json_loads(data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    # orjson does not handle integers bigger than 64 bits like the json module (ie, it returns
+    # them as float), so it is not used when there is any number with that many digits
+    if orjson is not None and not _LONG_NUMBER.search(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def response_json(response):
+    """
+    Parsed JSON body of the response. This is computed only once, and then reused in all the following
+    assertions on the same response.
+    """
+    parsed = getattr(response, "_em_json", _NOT_PARSED)
+    if parsed is _NOT_PARSED:
+        parsed = json_loads(response.content)
+        response._em_json = parsed
+    return parsed
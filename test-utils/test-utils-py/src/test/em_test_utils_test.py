@@ -1,7 +1,16 @@
 import unittest
 from src.main.resources.em_test_utils import *
+from src.main.resources.em_test_utils import _is_valid_uri
 
+import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import os
 import re
+import subprocess
+import sys
+import tempfile
+import threading
 
 class EvoMaster_EM_Test_Utils_Test(unittest.TestCase):
 
@@ -60,6 +69,39 @@ class EvoMaster_EM_Test_Utils_Test(unittest.TestCase):
         assert not is_valid_uri_or_empty("http://example.com:port")
 
 
+    def test_is_valid_URI_not_handled_by_fast_path(self):
+        assert is_valid_uri_or_empty("//foo.org/a")
+        assert is_valid_uri_or_empty("http://foo.org:65535/a")
+        assert not is_valid_uri_or_empty("http://foo.org:65536/a")
+        assert not is_valid_uri_or_empty("http://fo o.org/a")
+        assert is_valid_uri_or_empty("http://[::1]:8080/a")
+        assert not is_valid_uri_or_empty("http://999.999.999.999/a")
+        assert not is_valid_uri_or_empty("http://256.1.1.1")
+        assert is_valid_uri_or_empty("http://255.1.1.1:8080/a")
+
+
+    def test_is_valid_URI_same_as_rfc3986(self):
+        # fast path must never change the result of the full validator
+        uris = ["http://999.999.999.999/a", "http://256.1.1.1", "https://1.2.3.4:80/a", "http://1.2.3/a",
+                "http://01.2.3.4", "http://1.2.3.4.5/", "http://1.2.3.4a/", "http://-a.b/", "http://a..b/",
+                "http://12/", "http://300.0.0.1?x=1", "http://1.1.1.999#f", "/a/5", "http://foo.org/a?k=v#f"]
+        for uri in uris:
+            assert is_valid_uri_or_empty(uri) == _is_valid_uri(uri), uri
+
+
+    def test_is_valid_URI_cached(self):
+        _is_valid_uri.cache_clear()
+        assert not is_valid_uri_or_empty("http://example.com:port")
+        assert not is_valid_uri_or_empty("http://example.com:port")
+        assert _is_valid_uri.cache_info().hits == 1
+
+
+    def test_rfc3986_not_imported_at_module_load(self):
+        code = "import sys; import em_test_utils; assert 'rfc3986' not in sys.modules"
+        folder = os.path.join(os.path.dirname(__file__), "..", "main", "resources")
+        subprocess.run([sys.executable, "-c", code], cwd=folder, check=True)
+
+
     def test_resolve_location_null(self):
         template = "http://localhost:12345/a/x"
         location = None
@@ -68,5 +110,165 @@ class EvoMaster_EM_Test_Utils_Test(unittest.TestCase):
         assert res == template
     
 
+    def test_latency_summary(self):
+        records = [("GET", "/a/{id}", 200, float(ms)) for ms in range(1, 101)]
+        records.append(("POST", "/a", 201, 5.0))
+        records.append(("POST", "/a", 400, 7.0))
+
+        summary = latency_summary(records)
+
+        assert len(summary) == 2
+        get = summary[0]
+        assert get["method"] == "GET"
+        assert get["path"] == "/a/{id}"
+        assert get["calls"] == 100
+        assert get["statuses"] == {"200": 100}
+        assert get["p50_ms"] == 50.5
+        assert abs(get["p95_ms"] - 95.05) < 0.0001
+        assert get["max_ms"] == 100.0
+        post = summary[1]
+        assert post["statuses"] == {"201": 1, "400": 1}
+        assert post["p50_ms"] == 6.0
+
+
+    def test_record_and_write_latency_report(self):
+        class FakeResponse:
+            status_code = 200
+            elapsed = datetime.timedelta(milliseconds=20)
+
+        response = FakeResponse()
+        assert record_latency("GET", "/a/{id}", response) is response
+        assert record_latency("GET", "/a/{id}", response) is response
+
+        with tempfile.TemporaryDirectory() as folder:
+            os.environ[LATENCY_REPORT_DIR] = folder
+            try:
+                write_latency_report("Foo")
+            finally:
+                del os.environ[LATENCY_REPORT_DIR]
+
+            with open(os.path.join(folder, "Foo_latency.json")) as f:
+                summary = json.load(f)
+            assert summary[0]["calls"] == 2
+            assert summary[0]["p99_ms"] == 20.0
+            with open(os.path.join(folder, "Foo_latency.csv")) as f:
+                lines = f.read().splitlines()
+            assert lines[0] == "method,path,calls,mean_ms,p50_ms,p95_ms,p99_ms,max_ms"
+            assert lines[1].startswith("GET,/a/{id},2,")
+
+            # records are cleared once written
+            os.remove(os.path.join(folder, "Foo_latency.json"))
+            os.environ[LATENCY_REPORT_DIR] = folder
+            try:
+                write_latency_report("Foo")
+            finally:
+                del os.environ[LATENCY_REPORT_DIR]
+            assert not os.path.exists(os.path.join(folder, "Foo_latency.json"))
+
+
+    def test_auth_cache(self):
+        class FakeResponse:
+            def __init__(self, status_code):
+                self.status_code = status_code
+
+        logins = []
+
+        def login():
+            logins.append(1)
+            return "Bearer " + str(len(logins))
+
+        cache = AuthCache()
+        assert cache.get("token_foo", login) == "Bearer 1"
+        assert cache.get("token_foo", login) == "Bearer 1"
+        assert len(logins) == 1
+
+        response = FakeResponse(200)
+        assert cache.check(response, "token_foo", login, "Authorization") is response
+        assert cache.get("token_foo", login) == "Bearer 1"
+        assert len(logins) == 1
+
+
+    def test_auth_cache_login_again_on_401(self):
+        import requests
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                valid = self.headers.get("Authorization") == "Bearer 2" or self.headers.get("Cookie") == "id=2"
+                self.send_response(200 if valid else 401)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = "http://127.0.0.1:" + str(server.server_port) + "/a"
+        try:
+            logins = []
+
+            def login_token():
+                logins.append(1)
+                return "Bearer " + str(len(logins))
+
+            cache = AuthCache()
+            token = cache.get("token_foo", login_token)
+            res = requests.get(url, headers={"Authorization": token})
+            assert res.status_code == 401
+            # login is done again, and the call repeated with the new token
+            res = cache.check(res, "token_foo", login_token, "Authorization")
+            assert res.status_code == 200
+            assert len(logins) == 2
+            assert cache.get("token_foo", login_token) == "Bearer 2"
+
+            cookies = []
+
+            def login_cookies():
+                cookies.append(1)
+                return {"id": str(len(cookies))}
+
+            res = requests.get(url, cookies=cache.get("cookies_foo", login_cookies))
+            res = cache.check(res, "cookies_foo", login_cookies)
+            assert res.status_code == 200
+            assert len(cookies) == 2
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+    def test_generated_suite_benchmark(self):
+        # the benchmark copies the code written by the Python test writer, so it must keep working with these utils
+        script = os.path.join(os.path.dirname(__file__), "..", "benchmark", "generated_suite_benchmark.py")
+        result = subprocess.run([sys.executable, script, "2"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        assert result.returncode == 0, result.stdout.decode("utf-8", "replace")
+
+
+    def test_encode_json_body(self):
+        assert encode_json_body("{\"name\": \"Æ\"}") == "{\"name\": \"Æ\"}".encode("utf-8")
+        # bodies are not parsed, as they could be invalid on purpose
+        assert encode_json_body("{\"a\":") == b'{"a":'
+
+    def test_json_loads(self):
+        assert json_loads(b'{"a": [1, 2.5, null]}') == {"a": [1, 2.5, None]}
+        # not supported by orjson, if installed
+        assert json_loads(b'{"a": 123456789012345678901234567890}') == {"a": 123456789012345678901234567890}
+
+    def test_response_json_parsed_once(self):
+        class FakeResponse:
+            def __init__(self):
+                self.reads = 0
+
+            @property
+            def content(self):
+                self.reads += 1
+                return b'{"id": 5, "tags": ["x"]}'
+
+        response = FakeResponse()
+        assert response_json(response)["id"] == 5
+        assert response_json(response)["tags"] == ["x"]
+        assert response.reads == 1
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file